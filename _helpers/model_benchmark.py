@@ -0,0 +1,75 @@
+# _helpers/model_benchmark.py
+
+"""
+🏎️ Model Benchmark - Per-Role Probe Runs Behind the "auto" Model Selection
+--------------------------------------------------------------------------
+Technical Overview:
+Command-line front end of `utils.model_benchmark`. Unlike `api_model_tester.py`, where one model is tried by
+hand in a chat window, it runs the fixed probe set of each agent role (classification prompts for AgentOne,
+risk profile conversations for AgentTwo, conversations to summarize for AgentSummarizer) through the real
+agents against every candidate model. It prints p50/p95 latency, output token throughput and validity per
+role and model, and merges the results into `data/model_benchmarks.json`, where the "auto" option of the
+model selection picks them up.
+
+API keys are read from the environment (OPENAI_API_KEY, ANTHROPIC_API_KEY). With `AVA_LLM_BACKEND=mock`
+the deterministic `mock-llm` backend is available for an offline dry run.
+
+Usage (from the repository root):
+    python _helpers/model_benchmark.py --models gpt-4o gpt-3.5-turbo claude-3-sonnet-20240229
+    python _helpers/model_benchmark.py --models gpt-4o --roles agent_one --repeat 3
+    AVA_LLM_BACKEND=mock python _helpers/model_benchmark.py --models mock-llm --output /tmp/bench.json
+"""
+
+import argparse
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from agents.providers import provider_for_model  # noqa: E402
+from utils.model_benchmark import (  # noqa: E402
+    BENCHMARK_RESULTS_PATH, MIN_VALIDITY, PROBES, ModelBenchmark, pick_model, save_results
+)
+
+API_KEY_ENV = {
+    'openai': 'OPENAI_API_KEY',
+    'anthropic': 'ANTHROPIC_API_KEY',
+}
+
+
+def api_key_for_model(model_name):
+    env_name = API_KEY_ENV.get(provider_for_model(model_name))
+    return os.environ.get(env_name) if env_name else None
+
+
+def _print_result(role, model_name, result):
+    print(f"{role:<17} {model_name:<28} p50 {result['p50_ms']} ms · p95 {result['p95_ms']} ms · "
+          f"{result['tokens_per_s']} tok/s · validity {100 * result['validity']:.0f}% ({result['runs']} runs)")
+    for error in result['errors']:
+        print(f"    ! {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark candidate models per agent role.")
+    parser.add_argument('--models', nargs='+', required=True, help="Candidate model names.")
+    parser.add_argument('--roles', nargs='+', choices=list(PROBES), help="Roles to run (default: all).")
+    parser.add_argument('--repeat', type=int, default=1, help="Times each probe is run per model.")
+    parser.add_argument('--min-validity', type=float, default=MIN_VALIDITY,
+                        help="Validity needed to be picked by 'auto' (0-1).")
+    parser.add_argument('--output', default=BENCHMARK_RESULTS_PATH, help="Results file (merged, JSON).")
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT)  # mandates and data files are read relative to the repository root
+    results = ModelBenchmark(repeats=max(args.repeat, 1)).run(
+        args.models, api_key_for_model, roles=args.roles, progress=_print_result
+    )
+    print(f"\nResults merged into {save_results(results, args.output)}\n")
+
+    for role in args.roles or list(PROBES):
+        picked = pick_model(results, role, args.models, args.min_validity)
+        print(f"auto for {role}: {picked[0] if picked else 'no model meets the validity threshold'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+# _helpers/turn_benchmark.py
+
+"""
+⏱️ Turn Benchmark - End-to-End Timing of process_user_input on the Mock Backend
+-------------------------------------------------------------------------------
+Technical Overview:
+Runs main.py headless with Streamlit's AppTest. Every agent is set to the deterministic `mock-llm` backend
+(see `agents.mock_backend`), and one scripted message per intent is sent through the chat input, so each turn
+goes through process_user_input and its intent handler exactly as in the app. For every turn the benchmark
+reports:
+- the wall time of the turn (the root span of its trace) and of the whole rerun;
+- the number of LLM calls and the tokens sent and received during the turn;
+- the calls made afterwards by the background precomputation of the next turn's context.
+Call counts and tokens come from the mock backend's call log, so they do not depend on tracing.
+
+The persistent response cache is switched off (AVA_RESPONSE_CACHE=off) unless set otherwise in the
+environment, so every turn makes its calls.
+
+Data intents (fundamentals, charts, research) still fetch live market data through yfinance. Use `--intents`
+to leave them out when running fully offline.
+
+Usage (from the repository root):
+    python _helpers/turn_benchmark.py
+    python _helpers/turn_benchmark.py --latency 0.5 --token-latency 0.01 --repeat 3
+    python _helpers/turn_benchmark.py --intents general risk_answer --json results.json --trace traces.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.environ.setdefault('AVA_LLM_BACKEND', 'mock')
+# Responses cached by earlier runs would hide the calls being measured
+os.environ.setdefault('AVA_RESPONSE_CACHE', 'off')
+
+from agents.mock_backend import get_mock_backend  # noqa: E402
+from utils.tracing import Tracer  # noqa: E402
+
+# One scripted message per intent, sent in this order within one session
+SCENARIOS = [
+    ('general', "Hi there, how are you today?"),
+    ('risk_answer', "I'm 45, saving for retirement over the next 20 years and can take some risk."),
+    ('investment_advice', "Which stocks would you recommend I invest in for growth?"),
+    ('fundamentals', "Tell me about TSLA"),
+    ('price_chart', "Show me the price chart of AAPL over 1y"),
+    ('compare_price_chart', "Compare the prices of NVDA and AMD over 6mo"),
+    ('radar_chart', "Radar chart of PE and dividend yield for AAPL, MSFT and GOOGL"),
+    ('pe_div_yield_table', "Show me a table of PE and dividend yield for technology stocks"),
+]
+
+BACKGROUND_THREAD_PREFIX = 'ava-precompute'
+
+
+def _find_handler(span):
+    if span['name'].startswith('handler.'):
+        return span['name'][len('handler.'):]
+    for child in span['children']:
+        handler = _find_handler(child)
+        if handler:
+            return handler
+    return None
+
+
+def _summarize_calls(calls):
+    turn = [call for call in calls if not call.thread.startswith(BACKGROUND_THREAD_PREFIX)]
+    background = [call for call in calls if call.thread.startswith(BACKGROUND_THREAD_PREFIX)]
+    return {
+        'llm_calls': len(turn),
+        'tokens_in': sum(call.input_tokens for call in turn),
+        'tokens_out': sum(call.output_tokens for call in turn),
+        'calls_by_role': {role: sum(1 for call in turn if call.role == role) for role in sorted({c.role for c in turn})},
+        'background_calls': len(background),
+        'background_tokens_in': sum(call.input_tokens for call in background),
+    }
+
+
+def run_session(scenarios, timeout):
+    """Sends each scenario's message through one AppTest session; returns (per-turn results, traces)."""
+    from streamlit.testing.v1 import AppTest
+
+    backend = get_mock_backend()
+    app = AppTest.from_file(os.path.join(REPO_ROOT, 'main.py'), default_timeout=timeout)
+    app.run()
+
+    results = []
+    for intent, message in scenarios:
+        backend.wait_idle()
+        first_call = len(backend.calls)
+
+        start = time.perf_counter()
+        app.chat_input[0].set_value(message).run()
+        rerun_seconds = time.perf_counter() - start
+
+        # Let the background precomputation finish so its calls are attributed to this turn
+        backend.wait_idle(timeout)
+        trace = app.session_state['traces'][-1] if app.session_state['traces'] else None
+
+        results.append(dict(
+            intent=intent,
+            handler=_find_handler(trace) if trace else None,
+            turn_ms=round(trace['duration_ms'], 1) if trace else None,
+            rerun_ms=round(1000 * rerun_seconds, 1),
+            errors=[str(exception.value) for exception in app.exception],
+            **_summarize_calls(backend.calls[first_call:])
+        ))
+    return results, app.session_state['traces']
+
+
+def _print_table(results):
+    columns = ['intent', 'handler', 'turn_ms', 'rerun_ms', 'llm_calls', 'tokens_in', 'tokens_out',
+               'background_calls', 'background_tokens_in']
+    widths = {column: max(len(column), *(len(str(row.get(column))) for row in results)) for column in columns}
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    for row in results:
+        print("  ".join(str(row.get(column)).ljust(widths[column]) for column in columns))
+        for error in row['errors']:
+            print(f"    ! {error}")
+
+
+def _median_results(runs):
+    """Per-intent medians of the numeric columns over repeated sessions."""
+    merged = []
+    for rows in zip(*runs):
+        row = dict(rows[0])
+        for column in ('turn_ms', 'rerun_ms', 'llm_calls', 'tokens_in', 'tokens_out',
+                       'background_calls', 'background_tokens_in'):
+            values = [r[column] for r in rows if r[column] is not None]
+            row[column] = round(statistics.median(values), 1) if values else None
+        row['errors'] = sorted({error for r in rows for error in r['errors']})
+        merged.append(row)
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark whole AVA turns on the deterministic mock backend.")
+    parser.add_argument('--intents', nargs='+', choices=[name for name, _ in SCENARIOS],
+                        help="Intents to run (default: all, in scenario order).")
+    parser.add_argument('--latency', type=float, default=None, help="Mock latency per call in seconds.")
+    parser.add_argument('--token-latency', type=float, default=None,
+                        help="Mock latency per output token in seconds.")
+    parser.add_argument('--repeat', type=int, default=1, help="Number of sessions to run (medians are reported).")
+    parser.add_argument('--timeout', type=float, default=120, help="Timeout per rerun in seconds.")
+    parser.add_argument('--json', dest='json_path', help="Write the results to this JSON file.")
+    parser.add_argument('--trace', dest='trace_path', help="Write the last session's traces (Chrome format).")
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT)  # main.py reads data files relative to the repository root
+    backend = get_mock_backend()
+    if args.latency is not None:
+        backend.latency = args.latency
+    if args.token_latency is not None:
+        backend.token_latency = args.token_latency
+
+    scenarios = [s for s in SCENARIOS if not args.intents or s[0] in args.intents]
+    runs, traces = [], []
+    for _ in range(max(args.repeat, 1)):
+        results, traces = run_session(scenarios, args.timeout)
+        runs.append(results)
+    results = _median_results(runs) if len(runs) > 1 else runs[0]
+
+    print(f"Mock backend: {backend.latency:.3f}s per call, {backend.token_latency:.4f}s per token, "
+          f"{len(runs)} session(s)\n")
+    _print_table(results)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'latency': backend.latency, 'token_latency': backend.token_latency,
+                       'sessions': len(runs), 'turns': results}, f, indent=2)
+    if args.trace_path:
+        with open(args.trace_path, 'w') as f:
+            json.dump(Tracer.to_chrome_trace(traces), f, default=str)
+
+
+if __name__ == '__main__':
+    main()
@@ -17,24 +17,243 @@ Attributes:
 - model_name: The name of the LLM model each agent will use.
 - api_key: Access key for LLM model requests.
 - prompter: Instance of the loaded model to manage interactions with user inputs.
+- metrics: Optional PipelineMetrics receiving token usage (input, output and provider-cached tokens).
+  Model calls are also traced as 'llm' spans carrying the prompt size and token usage.
+- last_usage: Token usage of the most recent call.
+- max_output_tokens: Hard cap on the length of the agent's responses (`configs.output_limits`), sent with
+  every provider request and reserved in the token budget.
+- token_budget: TokenBudget sized from the model's context window, used when assembling prompts.
+- hedging: Optional HedgePolicy; when set, provider requests that run long are hedged with a duplicate.
+- response_cache: Persistent exact-match ResponseCache (None when disabled). Completions, structured and
+  streamed responses are looked up by (model, output cap, full prompt) before any provider call, and
+  concurrent identical completions share one call.
 
 Methods:
 - __init__: Initializes model configuration.
-- load_model: Loads the chosen model using LLMWare’s API.
+- load_model: Loads the chosen model using LLMWare’s API (or the local mock backend for `mock-llm`), reusing
+  an already loaded prompter from the process-wide client registry when one exists.
+- prompt_main: Runs a plain prompt through the prompter (calls on a shared prompter are serialized).
+- prompt_cached: Sends an AssembledPrompt with its static mandate prefix marked as cacheable. Provider models
+  are called through the async client layer (pooled keep-alive connections, bounded concurrency).
+- prompt_structured: Like prompt_cached for responses that are a dictionary: the response is streamed through
+  an incremental parser and the generation is cancelled once the first complete dictionary has arrived.
+- stream_main: Yields the model's response chunk by chunk (streaming through the provider SDK).
 - get_mandate: Placeholder for mandate retrieval (to be defined by each agent).
 - process_input: Placeholder for input processing (to be defined by each agent).
 '''
 
+
+from .async_client import get_event_loop_thread
+from .client_registry import client_registry
+from .providers import acomplete, astream_completion, load_prompter, provider_for_model, stream_completion
+from configs.output_limits import max_output_tokens
+from utils.response_cache import get_response_cache, response_key
+from utils.response_parsing import IncrementalDictParser
+from utils.token_budget import TokenBudget
+from utils.token_counter import count_tokens
+from utils.tracing import annotate_span, trace_span
+
 class AgentBase:
-    def __init__(self, model_name, api_key):
+    def __init__(self, model_name, api_key, metrics=None):
         self.model_name = model_name
         self.api_key = api_key
+        self.metrics = metrics
         self.prompter = None
+        self.last_usage = {}
+        # Optional HedgePolicy (agents.hedging); opt-in per agent
+        self.hedging = None
+        self.max_output_tokens = max_output_tokens(self.agent_name)
+        # Process-wide, persistent (SQLite) exact-match response cache
+        self.response_cache = get_response_cache()
+        self.token_budget = TokenBudget(
+            model_name,
+            self.agent_name,
+            output_reserve=self.max_output_tokens,
+            metrics=metrics
+        )
         self.load_model()
 
     def load_model(self):
-        from llmware.prompts import Prompt
-        self.prompter = Prompt().load_model(self.model_name, api_key=self.api_key)
+        # Reuse the process-wide prompter for this model/key instead of loading it on every rerun
+        self.prompter = client_registry.get_or_create('prompt', self.model_name, self.api_key, self._create_prompter)
+
+    def _create_prompter(self):
+        return load_prompter(self.model_name, self.api_key)
+
+    @property
+    def agent_name(self):
+        return type(self).__name__
+
+    def _record_usage(self, usage):
+        self.last_usage = usage or {}
+        if usage:
+            annotate_span(
+                input_tokens=usage.get('input'),
+                output_tokens=usage.get('output'),
+                cached_tokens=usage.get('cached')
+            )
+        if self.metrics is None or not usage:
+            return
+        for field in ('input', 'output', 'cached'):
+            if usage.get(field):
+                self.metrics.increment(f"llm.{self.agent_name}.{field}_tokens", usage[field])
+
+    def prompt_main(self, prompt_text):
+        """
+        Runs `prompt_text` through the LLMWare prompter and returns its response dictionary. Token usage is
+        recorded on the call's span.
+        """
+        with trace_span(f"{self.agent_name}.prompt_main", 'llm', model=self.model_name,
+                        payload_bytes=len(prompt_text.encode('utf-8'))):
+            with client_registry.lock_for(self.prompter):
+                response = self.prompter.prompt_main(prompt_text)
+            self._record_usage(response.get('usage'))
+        return response
+
+    def prompt_cached(self, prompt):
+        """
+        Runs an AssembledPrompt. For OpenAI and Anthropic models the static prefix is sent as the system
+        prompt so the provider can cache it (explicitly marked for Anthropic); other models receive the
+        concatenated text through LLMWare. Returns the stripped response text.
+        """
+        if provider_for_model(self.model_name) is None:
+            def generate():
+                response = self.prompt_main(prompt.text)
+                return response['llm_response'].strip(), response.get('usage')
+
+            if self.response_cache is None:
+                return generate()[0]
+            self.last_usage = {}
+            return self.response_cache.get_or_compute(
+                response_key(self.model_name, prompt.text), self.model_name, generate, metrics=self.metrics
+            )
+        return get_event_loop_thread().run(self.acomplete_cached(prompt))
+
+    def _response_key(self, prompt, kind='complete'):
+        return response_key(self.model_name, prompt.dynamic_suffix, system=prompt.static_prefix,
+                            max_tokens=self.max_output_tokens, kind=kind)
+
+    async def _through_response_cache(self, prompt, generate, kind='complete'):
+        """Runs `generate(prompt)` (a coroutine returning (text, usage)) unless the response cache has it."""
+        if self.response_cache is None:
+            return (await generate(prompt))[0]
+        # Stays empty when the response comes from the cache or from another caller's request
+        self.last_usage = {}
+        return await self.response_cache.aget_or_compute(
+            self._response_key(prompt, kind), self.model_name, lambda: generate(prompt), metrics=self.metrics
+        )
+
+    async def acomplete_cached(self, prompt):
+        """Coroutine behind `prompt_cached` for provider models (runs on the async client layer)."""
+        with trace_span(f"{self.agent_name}.complete", 'llm', model=self.model_name,
+                        payload_bytes=len(prompt.text.encode('utf-8'))):
+            return await self._through_response_cache(prompt, self._acomplete)
+
+    async def _acomplete(self, prompt):
+        if self.hedging is not None:
+            text, usage = await self.hedging.complete(
+                self.model_name, self.api_key, prompt.dynamic_suffix, system=prompt.static_prefix,
+                max_tokens=self.max_output_tokens
+            )
+        else:
+            text, usage = await acomplete(
+                self.model_name, self.api_key, prompt.dynamic_suffix, system=prompt.static_prefix,
+                max_tokens=self.max_output_tokens
+            )
+        self._record_usage(usage)
+        return text.strip(), usage
+
+    def prompt_structured(self, prompt):
+        """
+        Runs an AssembledPrompt whose answer is a dictionary. For provider models the response is streamed
+        through an IncrementalDictParser and the generation is cancelled as soon as the first complete
+        top-level dictionary has arrived, so text the model adds after it costs no generation time. Returns
+        the stripped response text up to the end of that dictionary (the whole response if none completes).
+        """
+        if provider_for_model(self.model_name) is None:
+            return self.prompt_cached(prompt)
+        return get_event_loop_thread().run(self.astream_structured(prompt))
+
+    async def astream_structured(self, prompt):
+        """Coroutine behind `prompt_structured` (runs on the async client layer)."""
+        with trace_span(f"{self.agent_name}.stream_structured", 'llm', model=self.model_name,
+                        payload_bytes=len(prompt.text.encode('utf-8'))):
+            return await self._through_response_cache(prompt, self._astream_until_dict, kind='structured')
+
+    async def _astream_until_dict(self, prompt):
+        parser, usage, stopped_early = IncrementalDictParser(), {}, False
+        if self.hedging is not None:
+            stream = self.hedging.stream(
+                self.model_name, self.api_key, prompt.dynamic_suffix, system=prompt.static_prefix,
+                usage=usage, max_tokens=self.max_output_tokens
+            )
+        else:
+            stream = astream_completion(
+                self.model_name, self.api_key, prompt.dynamic_suffix, max_tokens=self.max_output_tokens,
+                system=prompt.static_prefix, usage=usage
+            )
+        try:
+            async for chunk in stream:
+                if parser.feed(chunk) is not None:
+                    stopped_early = True
+                    break
+        finally:
+            # Cancels the rest of the generation
+            await stream.aclose()
+
+        if stopped_early:
+            annotate_span(early_stop=True)
+            if self.metrics is not None:
+                self.metrics.increment(f"llm.{self.agent_name}.early_stops")
+            if 'input' not in usage:
+                # Providers report usage at the end of a stream; estimate it for a cancelled one
+                usage = {
+                    **usage,
+                    'input': count_tokens(prompt.text, self.model_name),
+                    'output': count_tokens(parser.text, self.model_name),
+                    'cached': 0,
+                }
+        self._record_usage(usage)
+        return parser.consumed_text.strip(), usage
+
+    def stream_main(self, prompt_text, system=None):
+        """
+        Yields the completion for `prompt_text` in chunks as they are generated. Models without a
+        streaming provider fall back to a single chunk from `prompt_main`.
+        """
+        if provider_for_model(self.model_name) is None:
+            full_prompt = f"{system}{prompt_text}" if system else prompt_text
+            response = self.prompt_main(full_prompt)
+            yield response['llm_response']
+            return
+
+        usage = {}
+        payload_bytes = len(prompt_text.encode('utf-8')) + len((system or "").encode('utf-8'))
+        with trace_span(f"{self.agent_name}.stream", 'llm', model=self.model_name, payload_bytes=payload_bytes):
+            # Shares entries with completions of the same request; a cached response arrives as one chunk
+            key = response_key(self.model_name, prompt_text, system=system, max_tokens=self.max_output_tokens)
+            cached = self.response_cache.lookup(key, metrics=self.metrics) if self.response_cache else None
+            if cached is not None:
+                self.last_usage = {}
+                yield cached
+                return
+
+            if self.hedging is not None:
+                stream = get_event_loop_thread().iterate(
+                    self.hedging.stream(self.model_name, self.api_key, prompt_text, system=system, usage=usage,
+                                        max_tokens=self.max_output_tokens)
+                )
+            else:
+                stream = stream_completion(self.model_name, self.api_key, prompt_text,
+                                           max_tokens=self.max_output_tokens, system=system, usage=usage)
+            chunks = []
+            for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+            self._record_usage(usage)
+            # Only complete responses are cached (a stream closed early never gets here)
+            if self.response_cache is not None:
+                self.response_cache.put(key, self.model_name, "".join(chunks).strip(), usage)
 
     def get_mandate(self):
         raise NotImplementedError("Subclasses must implement get_mandate method.")
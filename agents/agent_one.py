@@ -20,31 +20,35 @@ Attributes:
 - Inherits all attributes from AgentBase, including model_name, api_key, and prompter.
 
 Methods:
-- get_mandate: Retrieves the agent’s evaluation criteria from a text file, outlining how user input should 
-  be interpreted.
+- get_mandate: Retrieves the agent’s evaluation criteria from a text file (cached until the file changes), 
+  outlining how user input should be interpreted.
+- build_prompt: Assembles the prompt with the static mandate as a cacheable prefix, followed by the 
+  conversation summary and user input.
 - evaluate_input: Combines the mandate and user input, then prompts the model to generate an evaluation, 
-  which classifies and refines the input for further processing by other agents.
+  which classifies and refines the input for further processing by other agents. The response is 
+  streamed and cut off as soon as the classification dictionary is complete.
 '''
 
 # agents/agent_one.py
 
 from .agent_base import AgentBase
-import os
+from prompts.prompt_assembly import assemble_prompt, mandate_store
 
 class AgentOne(AgentBase):
     def get_mandate(self):
-        with open(os.path.join('prompts', 'agent_one_mandate.txt'), 'r') as f:
-            return f.read()
+        return mandate_store.load('agent_one_mandate.txt')
 
-    def evaluate_input(self, user_input, conversation_summary=None):
-        evaluation_mandate = self.get_mandate()
+    def build_prompt(self, user_input, conversation_summary=None):
+        # Static mandate first (cacheable prefix), volatile context and user input after it
+        sections = []
 
         # Include conversation summary if provided
         if conversation_summary is not None:
-            evaluation_mandate += f"\n\nHere is a summary of the conversation history:\n{conversation_summary}"
+            sections.append(f"\n\nHere is a summary of the conversation history:\n{conversation_summary}")
 
-        evaluation_input = f"{evaluation_mandate}\n\nUser input: {user_input}"
-        response = self.prompter.prompt_main(evaluation_input)
-        llm_response = response['llm_response'].strip()
-        return llm_response
+        return assemble_prompt(self.get_mandate(), sections, f"\n\nUser input: {user_input}")
 
+    def evaluate_input(self, user_input, conversation_summary=None):
+        evaluation_prompt = self.build_prompt(user_input, conversation_summary=conversation_summary)
+        # Only the classification dictionary is needed: stop generating once it is complete
+        return self.prompt_structured(evaluation_prompt)
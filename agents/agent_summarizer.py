@@ -3,47 +3,114 @@
 '''
 📝 AgentSummarizer Class - Summarization Agent for Conversation History and Reports
 ----------------------------------------------------------------------------------
-Problem: LLMs APIs are stateless. They have only memory of the last sent message. 
-Solution: Create summarised conversation trail. 
+Problem: LLMs APIs are stateless. They have only memory of the last sent message.
+Solution: Create summarised conversation trail.
 
 Technical Overview:
 AgentSummarizer is responsible for summarizing the conversation history and reports to maintain context within the token limits of the LLM. It inherits from AgentBase and uses the loaded model to generate concise summaries.
+In incremental mode it keeps a running summary plus a high-water mark into the conversation history, and each turn only folds the messages added since the last fold into the previous summary. When the new messages are below a token threshold the model is not called at all; the new messages are carried verbatim after the running summary until enough have accumulated.
+
+Each method returns the summary; with `with_tokens=True` it returns (summary, estimated input tokens of the
+model call, 0 when no call was made), so concurrent callers get their own counts.
 
 In Simple Terms:
 AgentSummarizer is like a smart note-taker that condenses past conversations and reports into brief summaries. This helps AgentZero stay informed about the previous context without exceeding token limits.
+In incremental mode it keeps one set of running notes and only adds what was said since it last wrote, instead of rewriting the notes from scratch every turn.
 
 Methods:
 - summarize_conversation: Summarizes the conversation history up to a specified number of messages.
 - summarize_reports: Summarizes past reports up to a specified number.
+- update_rolling_summary: Folds messages added since the high-water mark into a running summary.
 '''
 
 from .agent_base import AgentBase
+from prompts.prompt_assembly import assemble_prompt
+from utils.token_counter import count_tokens
 
 class AgentSummarizer(AgentBase):
     def get_mandate(self):
         # Define a simple mandate for summarization
         return "You are a helpful assistant that summarizes conversation history and reports concisely."
 
-    def summarize_conversation(self, conversation_history, num_messages=3):
-        # Get the last num_messages from the conversation history
-        recent_messages = conversation_history[-num_messages*2:]  # Considering user and assistant messages
-
-        # Prepare the text to summarize
+    @staticmethod
+    def format_messages(messages):
         conversation_text = ""
-        for message in recent_messages:
+        for message in messages:
             role = message['role']
             content = message['content']
             conversation_text += f"{role.capitalize()}: {content}\n"
+        return conversation_text
+
+    def _summarize(self, instruction):
+        """Returns (summary, estimated input tokens of the request)."""
+        # The mandate is sent as a stable prefix (system prompt for provider models)
+        prompt = assemble_prompt(self.get_mandate(), closing=instruction)
+        return self.prompt_cached(prompt), count_tokens(prompt.text, self.model_name)
+
+    @staticmethod
+    def _result(summary, input_tokens, with_tokens):
+        return (summary, input_tokens) if with_tokens else summary
+
+    def summarize_conversation(self, conversation_history, num_messages=3, with_tokens=False):
+        # Get the last num_messages from the conversation history
+        recent_messages = conversation_history[-num_messages*2:]  # Considering user and assistant messages
+
+        # Prepare the text to summarize
+        conversation_text = self.format_messages(recent_messages)
 
         # Prepare the prompt for summarization
-        prompt = f"{self.get_mandate()}\n\nPlease provide a concise summary of the following conversation:\n\n{conversation_text}"
+        prompt = f"\n\nPlease provide a concise summary of the following conversation:\n\n{conversation_text}"
 
         # Get the summary from the model
-        response = self.prompter.prompt_main(prompt)
-        summary = response['llm_response'].strip()
-        return summary
+        return self._result(*self._summarize(prompt), with_tokens)
+
+    def update_rolling_summary(self, conversation_history, state, token_threshold=200, with_tokens=False):
+        """
+        Incrementally updates a running conversation summary.
+
+        `state` is a dictionary holding 'summary' (the running summary or None) and 'high_water_mark'
+        (the number of messages of conversation_history already folded into the summary). It is updated
+        in place. Messages past the high-water mark are folded into the summary with one model call; if
+        they amount to fewer than `token_threshold` tokens the call is skipped and they are appended
+        verbatim to the returned context instead.
+
+        Returns:
+            str: The conversation context (running summary plus any not-yet-folded messages), or None.
+                 With `with_tokens`, (context, input tokens of the model call, 0 if none was made).
+        """
+        state.setdefault('summary', None)
+        state.setdefault('high_water_mark', 0)
+
+        # History shrank (e.g. a new session): start over
+        if state['high_water_mark'] > len(conversation_history):
+            state['summary'] = None
+            state['high_water_mark'] = 0
+
+        new_text = self.format_messages(conversation_history[state['high_water_mark']:])
+
+        if not new_text:
+            return self._result(state['summary'], 0, with_tokens)
+
+        if count_tokens(new_text, self.model_name) < token_threshold:
+            # Not worth a model call yet; carry the new messages verbatim
+            if state['summary']:
+                return self._result(f"{state['summary']}\n\nMost recent messages:\n{new_text}".strip(), 0, with_tokens)
+            return self._result(new_text.strip(), 0, with_tokens)
+
+        if state['summary']:
+            prompt = (
+                f"\n\nHere is the running summary of the conversation so far:\n\n{state['summary']}\n\n"
+                f"Update this summary with the following new messages. Keep earlier context that is still relevant "
+                f"and keep the result concise:\n\n{new_text}"
+            )
+        else:
+            prompt = f"\n\nPlease provide a concise summary of the following conversation:\n\n{new_text}"
+
+        state['summary'], input_tokens = self._summarize(prompt)
+        state['high_water_mark'] = len(conversation_history)
+        return self._result(state['summary'], input_tokens, with_tokens)
 
-    def summarize_reports(self, reports, num_reports=3):
+    def summarize_reports(self, reports, num_reports=3, with_tokens=False):
         # Get the last num_reports
         recent_reports = reports[-num_reports:]
 
@@ -51,9 +118,7 @@ class AgentSummarizer(AgentBase):
         reports_text = "\n\n".join(recent_reports)
 
         # Prepare the prompt for summarization
-        prompt = f"{self.get_mandate()}\n\nPlease provide a concise summary of the following reports:\n\n{reports_text}"
+        prompt = f"\n\nPlease provide a concise summary of the following reports:\n\n{reports_text}"
 
         # Get the summary from the model
-        response = self.prompter.prompt_main(prompt)
-        summary = response['llm_response'].strip()
-        return summary
+        return self._result(*self._summarize(prompt), with_tokens)
@@ -24,19 +24,26 @@ Methods:
   conversation history.
 - generate_risk_profile: Combines the mandate with the user’s conversation history, creating a prompt 
   to generate a detailed risk profile report, which informs the app about the user’s risk tolerance.
+  The transcript is trimmed from its oldest end to fit the model's token budget.
+- update_risk_profile: Sends only the current profile slots and the messages since the last update, and
+  returns the fields that changed (a delta to merge) instead of a full profile.
 '''
 
+import json
+
 from .agent_base import AgentBase
-import os
+from prompts.prompt_assembly import assemble_prompt, mandate_store
+from utils.token_budget import PromptSection
 
 class AgentTwo(AgentBase):
     def get_mandate(self):
-        with open(os.path.join('prompts', 'agent_two_mandate.txt'), 'r') as f:
-            return f.read()
+        return mandate_store.load('agent_two_mandate.txt')
 
-    def generate_risk_profile(self, conversation_history):
-        agent_two_mandate = self.get_mandate()
+    def get_delta_mandate(self):
+        return mandate_store.load('agent_two_delta_mandate.txt')
 
+    @staticmethod
+    def format_transcript(conversation_history):
         # Prepare the conversation history as text
         conversation_text = ""
         for message in conversation_history:
@@ -46,12 +53,40 @@ class AgentTwo(AgentBase):
                 conversation_text += f"User: {content}\n"
             elif role == "assistant":
                 conversation_text += f"Assistant: {content}\n"
+        return conversation_text
 
-        # Prepare the input for Agent Two
-        risk_profile_input = f"{agent_two_mandate}\n\nConversation:\n{conversation_text}\n\nGenerate the risk profile report."
+    def generate_risk_profile(self, conversation_history):
+        agent_two_mandate = self.get_mandate()
+        conversation_text = self.format_transcript(conversation_history)
+
+        # Prepare the input for Agent Two (static mandate as a cacheable prefix)
+        # On long sessions the oldest messages are trimmed first to fit the token budget
+        risk_profile_input = assemble_prompt(
+            agent_two_mandate,
+            [PromptSection('conversation', conversation_text, keep='tail', header="\n\nConversation:\n")],
+            "\n\nGenerate the risk profile report.",
+            budget=self.token_budget
+        )
 
         # Get the response from Agent Two
-        response = self.prompter.prompt_main(risk_profile_input)
-        risk_profile_report = response['llm_response'].strip()
-        return risk_profile_report
+        return self.prompt_cached(risk_profile_input)
+
+    def update_risk_profile(self, current_profile, new_messages):
+        """
+        Asks for the changes the new messages make to `current_profile` (a dictionary of profile slots).
 
+        Returns:
+            str: The model's JSON delta (only the changed or added fields).
+        """
+        conversation_text = self.format_transcript(new_messages)
+        risk_profile_input = assemble_prompt(
+            self.get_delta_mandate(),
+            [
+                PromptSection('profile', json.dumps(current_profile, indent=2), priority=1,
+                              header="\n\nCurrent risk profile:\n"),
+                PromptSection('conversation', conversation_text, keep='tail', header="\n\nNew messages:\n"),
+            ],
+            "\n\nReturn the changes to the risk profile.",
+            budget=self.token_budget
+        )
+        return self.prompt_cached(risk_profile_input)
@@ -22,49 +22,73 @@ Attributes:
 
 Methods:
 - get_mandate: Retrieves the agent’s mandate from a text file, defining rules for user interactions.
-- generate_response: Prepares and sends a conversation prompt to the model, incorporating the mandate, 
-  user input, and optional data (e.g., report summaries) to produce a well-rounded, personalized response.
+- build_prompt: Assembles the conversation prompt with the static mandate as a cacheable prefix, followed by 
+  optional data (e.g., report summaries) and the user input. An optional TurnContext supplies summaries already computed during the current turn.
+  Context sections are compacted, lowest priority first, to fit the model's token budget.
+- generate_response: Sends the conversation prompt to the model to produce a well-rounded, personalized response.
+- stream_response: Streaming variant of generate_response that yields tokens as they arrive.
 '''
 
 # agents/agent_zero.py
 
 from .agent_base import AgentBase
-import os
+from prompts.prompt_assembly import assemble_prompt, mandate_store
+from utils.token_budget import PromptSection
 
 class AgentZero(AgentBase):
     def get_mandate(self):
-        with open(os.path.join('prompts', 'agent_zero_mandate.txt'), 'r') as f:
-            return f.read()
+        return mandate_store.load('agent_zero_mandate.txt')
 
-    def generate_response(self, user_input, conversation_summary=None, reports_summary=None, risk_profile_report=None, fundamentals_report=None, price_chart_note=None, radar_chart_note=None):
-        agent_zero_mandate = self.get_mandate()
+    def build_prompt(self, user_input, conversation_summary=None, reports_summary=None, risk_profile_report=None, fundamentals_report=None, price_chart_note=None, radar_chart_note=None, turn_context=None):
+        # Volatile context goes after the static mandate so the mandate stays a stable, cacheable prefix
+        sections = []
 
-        # Include conversation summary if available
+        # Fall back to the summaries already memoized for this turn
+        if turn_context is not None:
+            if conversation_summary is None:
+                conversation_summary = turn_context.conversation_summary
+            if reports_summary is None:
+                reports_summary = turn_context.reports_summary
+
+        # Sections are compacted to the token budget in order of priority (the conversation summary goes first)
         if conversation_summary is not None:
-            agent_zero_mandate += f"\nHere is a summary of your recent conversation:\n{conversation_summary}"
+            sections.append(PromptSection('conversation_summary', conversation_summary, priority=1, keep='tail',
+                                          header="\nHere is a summary of your recent conversation:\n"))
 
-        # Include reports summary if available
         if reports_summary is not None:
-            agent_zero_mandate += f"\nHere is a summary of recent reports:\n{reports_summary}"
+            sections.append(PromptSection('reports_summary', reports_summary, priority=2,
+                                          header="\nHere is a summary of recent reports:\n"))
 
-        # Include other reports as before
         if risk_profile_report is not None:
-            agent_zero_mandate += f"\nYou have access to the following risk profile report:\n{risk_profile_report}\nUse this information to assist the client."
+            sections.append(PromptSection('risk_profile_report', risk_profile_report, priority=3,
+                                          header="\nYou have access to the following risk profile report:\n",
+                                          footer="\nUse this information to assist the client."))
 
         if fundamentals_report is not None:
-            agent_zero_mandate += f"\nYou have access to the following fundamentals report:\n{fundamentals_report}\nUse this information to assist the client."
+            sections.append(PromptSection('fundamentals_report', fundamentals_report, priority=4,
+                                          header="\nYou have access to the following fundamentals report:\n",
+                                          footer="\nUse this information to assist the client."))
 
+        # Chart notes are short and describe what the client is looking at; they are never trimmed
         if price_chart_note is not None:
-            agent_zero_mandate += f"\nYou have generated a price chart for the client. {price_chart_note}."
+            sections.append(f"\nYou have generated a price chart for the client. {price_chart_note}.")
 
         if radar_chart_note is not None:
-            agent_zero_mandate += f"\nYou have generated a radar chart for the client. {radar_chart_note}."
-
+            sections.append(f"\nYou have generated a radar chart for the client. {radar_chart_note}.")
 
         # Prepare conversation input
-        conversation_input = f"{agent_zero_mandate}\nClient: {user_input}\n\nAgent Zero:"
+        return assemble_prompt(self.get_mandate(), sections, f"\nClient: {user_input}\n\nAgent Zero:", budget=self.token_budget)
+
+    def generate_response(self, user_input, **context):
+        conversation_input = self.build_prompt(user_input, **context)
 
         # Get the response from the model
-        response = self.prompter.prompt_main(conversation_input)
-        llm_response = response['llm_response'].strip()
-        return llm_response
+        return self.prompt_cached(conversation_input)
+
+    def stream_response(self, user_input, **context):
+        """
+        Same prompt as generate_response, but yields the response in chunks as the model produces them.
+        The caller is responsible for joining and cleaning the final text.
+        """
+        conversation_input = self.build_prompt(user_input, **context)
+        yield from self.stream_main(conversation_input.dynamic_suffix, system=conversation_input.static_prefix)
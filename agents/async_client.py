@@ -0,0 +1,225 @@
+'''
+⚡ Async Client Layer - Pooled Keep-Alive Connections and Bounded Concurrency per Provider
+-----------------------------------------------------------------------------------------
+Technical Overview:
+Agent calls used to be blocking calls made one at a time from the Streamlit script thread. Calls made through
+LLMWare could also build a fresh SDK client, and with it fresh HTTP/TLS state, on every request. This module
+runs one asyncio event loop per process on a daemon thread. All OpenAI and Anthropic requests are made on that
+loop by `AsyncOpenAI`/`AsyncAnthropic` clients, which share a single `httpx.AsyncClient`. Connections are
+therefore pooled and kept alive across requests, agents, reruns and sessions.
+
+Each provider has an asyncio semaphore (PROVIDER_CONCURRENCY) that bounds how many of its requests are in
+flight at once. Independent calls fan out up to that bound, and bursts queue instead of tripping provider
+rate limits. Synchronous code hands coroutines to the loop with `submit` (which returns a
+`concurrent.futures.Future`, so several calls can overlap) or `run` (which blocks for the result). The request
+logic itself lives in `agents.providers`. Coroutines run with a copy of the submitting thread's context
+variables, and they record the submitting thread's name, so the caller's trace span and thread stay visible
+to code running on the loop.
+
+The SDKs and httpx (an SDK dependency) are imported lazily, so the module can be imported without them.
+
+In Simple Terms:
+Instead of every agent dialling the AI provider from scratch and waiting in line, AVA keeps a few phone lines
+open to each provider and lets several agents talk at the same time, up to a safe limit per provider.
+
+Classes and Functions:
+- EventLoopThread: The background event loop; `submit` and `run` schedule coroutines on it, `iterate`
+  consumes an async iterable on it from synchronous code.
+- get_event_loop_thread: Returns the process-wide EventLoopThread (started on first use).
+- get_http_client: Returns the shared, pooled httpx.AsyncClient.
+- get_async_sdk_client: Returns a (registry-cached) AsyncOpenAI or AsyncAnthropic client using the shared pool.
+- caller_thread_name: Name of the thread that submitted the running coroutine (or the current thread).
+- provider_slot: Async context manager holding one of a provider's concurrency slots.
+- stats: Requests started, in flight and peak concurrency per provider.
+'''
+
+import asyncio
+import contextvars
+import queue
+import threading
+from contextlib import asynccontextmanager
+
+from .client_registry import client_registry
+
+# Maximum requests in flight per provider (shared by all sessions)
+PROVIDER_CONCURRENCY = {
+    'openai': 8,
+    'anthropic': 4,
+    'mock': 8,
+}
+DEFAULT_PROVIDER_CONCURRENCY = 4
+
+# Connection pool shared by all provider clients
+POOL_MAX_CONNECTIONS = 32
+POOL_MAX_KEEPALIVE = 16
+POOL_KEEPALIVE_EXPIRY = 120.0  # seconds an idle connection is kept open
+REQUEST_TIMEOUT = 120.0
+CONNECT_TIMEOUT = 10.0
+
+
+_caller_thread = contextvars.ContextVar('ava_caller_thread', default=None)
+
+
+def caller_thread_name():
+    """The thread that submitted the running coroutine, or the current thread outside the event loop."""
+    return _caller_thread.get() or threading.current_thread().name
+
+
+async def _in_caller_context(coroutine, context, thread_name):
+    # Runs in its own task, so these values never leak into other coroutines
+    for variable, value in context.items():
+        variable.set(value)
+    _caller_thread.set(thread_name)
+    return await coroutine
+
+
+class EventLoopThread:
+    def __init__(self, name='ava-async-llm'):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self):
+        with self._lock:
+            if self._loop is None:
+                ready = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(ready,), name=self.name, daemon=True)
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    def _run(self, ready):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        ready.set()
+        self._loop.run_forever()
+
+    def submit(self, coroutine):
+        """
+        Schedules `coroutine` on the loop, with the caller's context variables, and returns a
+        concurrent.futures.Future for its result.
+        """
+        wrapped = _in_caller_context(coroutine, contextvars.copy_context(), caller_thread_name())
+        return asyncio.run_coroutine_threadsafe(wrapped, self.loop)
+
+    def run(self, coroutine, timeout=None):
+        """Runs `coroutine` on the loop and blocks until it returns."""
+        if self.in_loop():
+            coroutine.close()
+            raise RuntimeError("EventLoopThread.run would block its own event loop; await the coroutine instead.")
+        return self.submit(coroutine).result(timeout)
+
+    def iterate(self, async_iterable):
+        """
+        Synchronous generator over an async iterable consumed on the loop. Items are handed over as they
+        arrive; closing the generator early cancels the consumption (and with it, e.g., a streaming request).
+        """
+        items = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in async_iterable:
+                    items.put((True, item))
+            except Exception as e:
+                items.put((False, e))
+            finally:
+                items.put((False, None))
+
+        future = self.submit(pump())
+        try:
+            while True:
+                ok, item = items.get()
+                if ok:
+                    yield item
+                elif item is None:
+                    return
+                else:
+                    raise item
+        finally:
+            future.cancel()
+
+    def in_loop(self):
+        return self._thread is not None and threading.current_thread() is self._thread
+
+
+_loop_thread = EventLoopThread()
+
+
+def get_event_loop_thread():
+    return _loop_thread
+
+
+# -----------------------------------------------------------------------------
+# Shared connection pool and SDK clients
+# -----------------------------------------------------------------------------
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Returns the process-wide httpx.AsyncClient (keep-alive pool) shared by all provider clients."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            import httpx
+            _http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=POOL_KEEPALIVE_EXPIRY
+                ),
+                timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT)
+            )
+        return _http_client
+
+
+def get_async_sdk_client(provider, api_key):
+    """Returns a (registry-cached) AsyncOpenAI or AsyncAnthropic client for the API key, on the shared pool."""
+    def create_client():
+        if provider == 'openai':
+            from openai import AsyncOpenAI
+            return AsyncOpenAI(api_key=api_key, http_client=get_http_client())
+        from anthropic import AsyncAnthropic
+        return AsyncAnthropic(api_key=api_key, http_client=get_http_client())
+
+    return client_registry.get_or_create(f"{provider}_async_sdk", None, api_key, create_client)
+
+
+# -----------------------------------------------------------------------------
+# Bounded concurrency per provider
+# -----------------------------------------------------------------------------
+
+# Semaphores belong to the background loop and are only touched from it
+_semaphores = {}
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+@asynccontextmanager
+async def provider_slot(provider):
+    """Holds one of the provider's concurrency slots for the duration of the block (run on the loop)."""
+    semaphore = _semaphores.get(provider)
+    if semaphore is None:
+        semaphore = _semaphores[provider] = asyncio.Semaphore(
+            PROVIDER_CONCURRENCY.get(provider, DEFAULT_PROVIDER_CONCURRENCY)
+        )
+    async with semaphore:
+        with _stats_lock:
+            entry = _stats.setdefault(provider, {'requests': 0, 'in_flight': 0, 'peak_in_flight': 0})
+            entry['requests'] += 1
+            entry['in_flight'] += 1
+            entry['peak_in_flight'] = max(entry['peak_in_flight'], entry['in_flight'])
+        try:
+            yield
+        finally:
+            with _stats_lock:
+                entry['in_flight'] -= 1
+
+
+def stats():
+    """Returns {provider: {'requests', 'in_flight', 'peak_in_flight'}}."""
+    with _stats_lock:
+        return {provider: dict(entry) for provider, entry in _stats.items()}
@@ -0,0 +1,124 @@
+'''
+🗂️ ClientRegistry Class - Process-Wide Cache of Loaded Model Clients
+--------------------------------------------------------------------
+Technical Overview:
+Streamlit re-executes main.py on every interaction, and each run used to construct every agent from scratch.
+Each construction called `Prompt().load_model(...)`, which sets up the LLMWare workspace, prompt state and model
+card. ClientRegistry keeps loaded clients (LLMWare prompters, provider SDK clients) in a module-level registry.
+Entries are keyed by (kind, model name, API key fingerprint). Because Python modules are imported once per
+process, the registry is shared across reruns and across sessions. Creation is guarded by a per-key lock, so
+concurrent sessions asking for the same client build it once. Entries that have not been used for `idle_ttl`
+seconds are evicted. Only a SHA-256 fingerprint of the API key is kept in the key, never the key itself.
+
+In Simple Terms:
+The registry is a cloakroom for model connections. The first time a model is needed it is set up and handed
+in; every later request, from any user, picks up the same one, and connections nobody has used for a while
+are thrown out.
+
+Notes:
+- LLMWare prompters are used with their default settings (no registered transactions), so sharing one
+  between sessions does not accumulate per-session state.
+- A prompter is not safe to call from two threads at once. Pipeline steps may run concurrently, so calls go
+  through the per-client lock returned by `lock_for`.
+
+Methods:
+- get_or_create: Returns the cached client for a key, creating it with the given factory on a miss.
+- lock_for: Returns the lock serializing calls on a shared client.
+- evict_idle: Drops clients that have been idle for longer than idle_ttl.
+- stats: Returns hit/miss/eviction counts, total setup time and the number of live clients.
+'''
+
+import hashlib
+import threading
+import time
+import weakref
+
+DEFAULT_IDLE_TTL = 30 * 60  # seconds
+
+
+def api_key_fingerprint(api_key):
+    if not api_key:
+        return None
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+
+class ClientRegistry:
+    def __init__(self, idle_ttl=DEFAULT_IDLE_TTL):
+        self.idle_ttl = idle_ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._creation_locks = {}
+        self._client_locks = weakref.WeakKeyDictionary()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'setup_seconds': 0.0}
+
+    def get_or_create(self, kind, model_name, api_key, factory):
+        """
+        Returns the client registered under (kind, model_name, fingerprint(api_key)),
+        calling `factory()` to create it if it is not cached yet.
+        """
+        key = (kind, model_name, api_key_fingerprint(api_key))
+        self.evict_idle()
+
+        client = self._lookup(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            creation_lock = self._creation_locks.setdefault(key, threading.Lock())
+
+        with creation_lock:
+            # Another thread may have created it while we were waiting
+            client = self._lookup(key)
+            if client is not None:
+                return client
+
+            start = time.perf_counter()
+            client = factory()
+            setup_seconds = time.perf_counter() - start
+
+            with self._lock:
+                self._entries[key] = {'client': client, 'last_used': time.monotonic()}
+                self._stats['misses'] += 1
+                self._stats['setup_seconds'] += setup_seconds
+
+        return client
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry['last_used'] = time.monotonic()
+            self._stats['hits'] += 1
+            return entry['client']
+
+    def lock_for(self, client):
+        """Returns the lock that serializes calls on `client` (one lock per client object)."""
+        with self._lock:
+            lock = self._client_locks.get(client)
+            if lock is None:
+                lock = self._client_locks[client] = threading.Lock()
+            return lock
+
+    def evict_idle(self):
+        cutoff = time.monotonic() - self.idle_ttl
+        with self._lock:
+            idle_keys = [key for key, entry in self._entries.items() if entry['last_used'] < cutoff]
+            for key in idle_keys:
+                del self._entries[key]
+                self._creation_locks.pop(key, None)
+            self._stats['evictions'] += len(idle_keys)
+        return len(idle_keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._creation_locks.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, live_clients=len(self._entries))
+
+
+# Process-wide registry shared by all agents, reruns and sessions
+client_registry = ClientRegistry()
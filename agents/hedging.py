@@ -0,0 +1,240 @@
+'''
+🏁 HedgePolicy Class - Hedged LLM Requests Against Slow Provider Responses
+-------------------------------------------------------------------------
+Technical Overview:
+A turn's tail latency is dominated by the occasional provider response that takes several times longer than
+usual. AgentOne's classification and AgentZero's reply both sit on the critical path. Hedging trades a little
+extra cost for a shorter tail. If a request has not returned by a chosen percentile of the recent latency of
+the same agent and model (e.g. p95), a duplicate request is sent, to the same model or to an alternate model.
+The first successful response wins and the other request is cancelled. If one request fails, the other one is
+still awaited. A response won by an alternate model says so in its usage ('model'), so the response cache
+does not store it under the primary model's key.
+
+For streamed responses the race is decided by the first chunk: the stream that starts producing first is
+used, and the other is cancelled.
+
+Latencies of all requests, hedged or not, are tracked per agent, model and kind (completion, or time to first
+chunk of a stream) in a process-wide sliding window (LatencyTracker), so the hedge delay follows what the
+providers are doing right now. No request is hedged until `min_samples` latencies are known. Every hedged call is recorded in PipelineMetrics:
+- `hedge.<agent>.requests`: calls made under the policy;
+- `hedge.<agent>.hedged`: duplicates sent;
+- `hedge.<agent>.hedge_wins`: races the duplicate won;
+- `hedge.<agent>.extra_input_tokens` and `extra_output_tokens`: the extra cost. For a cancelled request the
+  input tokens are counted offline.
+
+In Simple Terms:
+If an AI answer is taking much longer than it usually does, AVA asks again (maybe a different model) and uses
+whichever answer comes back first, then hangs up on the other. It keeps count of how often this happens, how
+often it helps and what it costs.
+
+Classes:
+- LatencyTracker: Recent request latencies per key, with percentiles.
+- HedgePolicy: Runs a completion (`complete`) or a stream (`stream`) with hedging.
+'''
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+
+from utils.instrumentation import PipelineMetrics
+from utils.token_counter import count_tokens
+from utils.tracing import annotate_span
+from .providers import DEFAULT_MAX_OUTPUT_TOKENS, acomplete, astream_completion
+
+DEFAULT_WINDOW = 100
+
+
+class LatencyTracker:
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def record(self, key, seconds):
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def count(self, key):
+        with self._lock:
+            return len(self._samples.get(key, ()))
+
+    def percentile(self, key, percentile):
+        """The `percentile` (0-1) of the recent latencies for `key` (nearest rank), or None without samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+        rank = min(max(math.ceil(percentile * len(samples)), 1), len(samples))
+        return samples[rank - 1]
+
+
+# Shared by all sessions: provider latency is a property of the provider, not of the session
+latency_tracker = LatencyTracker()
+
+
+async def _first_success(tasks):
+    """Waits for the first task that succeeds; returns it and the others. Raises the first error if all fail."""
+    pending, errors = set(tasks), []
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in tasks:
+            if task in done and not task.cancelled() and task.exception() is None:
+                return task, [other for other in tasks if other is not task]
+        errors.extend(task.exception() for task in done if not task.cancelled())
+    raise errors[0]
+
+
+class HedgePolicy:
+    def __init__(self, agent_name, percentile=0.95, alternate_model=None, alternate_api_key=None,
+                 min_samples=10, min_delay=0.5, metrics=None, tracker=None):
+        self.agent_name = agent_name
+        self.percentile = percentile
+        self.alternate_model = alternate_model
+        self.alternate_api_key = alternate_api_key
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+        self.tracker = tracker if tracker is not None else latency_tracker
+
+    def hedge_delay(self, model_name, kind='complete'):
+        """
+        Seconds to wait before sending the duplicate, or None while too few latencies are known. Completions
+        ('complete') and time to first chunk of streams ('stream') are tracked separately.
+        """
+        key = (self.agent_name, model_name, kind)
+        if self.tracker.count(key) < self.min_samples:
+            return None
+        return max(self.tracker.percentile(key, self.percentile), self.min_delay)
+
+    def _hedge_target(self, model_name, api_key):
+        if self.alternate_model:
+            return self.alternate_model, self.alternate_api_key
+        return model_name, api_key
+
+    def _count(self, name, value=1):
+        if value:
+            self.metrics.increment(f"hedge.{self.agent_name}.{name}", value)
+
+    def _record_race(self, winner_is_hedge, hedge_model, loser_usage, prompt_text):
+        """Counts the race outcome and the loser's cost (estimated offline if it was cancelled)."""
+        if winner_is_hedge:
+            self._count('hedge_wins')
+        self._count('extra_input_tokens', loser_usage.get('input') or count_tokens(prompt_text, hedge_model))
+        self._count('extra_output_tokens', loser_usage.get('output'))
+        annotate_span(hedged=True, hedge_winner='hedge' if winner_is_hedge else 'primary', hedge_model=hedge_model)
+
+    # -------------------------------------------------------------------------
+    # Completions
+    # -------------------------------------------------------------------------
+
+    async def complete(self, model_name, api_key, prompt, system=None, max_tokens=DEFAULT_MAX_OUTPUT_TOKENS):
+        """
+        Runs `acomplete` with hedging. Returns (text, usage) of the winning request; when the duplicate wins,
+        usage['model'] names the model it was sent to.
+        """
+        self._count('requests')
+        delay = self.hedge_delay(model_name)
+        start = time.perf_counter()
+        primary = asyncio.ensure_future(acomplete(model_name, api_key, prompt, system=system, max_tokens=max_tokens))
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if primary in done:
+            result = primary.result()
+            self.tracker.record((self.agent_name, model_name, 'complete'), time.perf_counter() - start)
+            return result
+
+        hedge_model, hedge_key = self._hedge_target(model_name, api_key)
+        self._count('hedged')
+        hedge_start = time.perf_counter()
+        hedge = asyncio.ensure_future(acomplete(hedge_model, hedge_key, prompt, system=system, max_tokens=max_tokens))
+        try:
+            winner, losers = await _first_success([primary, hedge])
+        finally:
+            for task in (primary, hedge):
+                task.cancel()
+
+        winner_is_hedge = winner is hedge
+        loser = losers[0]
+        loser_usage = loser.result()[1] if loser.done() and not loser.cancelled() and loser.exception() is None else {}
+        self._record_race(winner_is_hedge, hedge_model, loser_usage, f"{system or ''}{prompt}")
+        if winner_is_hedge:
+            self.tracker.record((self.agent_name, hedge_model, 'complete'), time.perf_counter() - hedge_start)
+            text, usage = winner.result()
+            return text, dict(usage, model=hedge_model)
+        self.tracker.record((self.agent_name, model_name, 'complete'), time.perf_counter() - start)
+        return winner.result()
+
+    # -------------------------------------------------------------------------
+    # Streams
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _open_stream(model_name, api_key, prompt, system, max_tokens):
+        """Consumes a stream in its own task into a queue; returns (queue, task, usage, first-chunk task)."""
+        chunks, usage = asyncio.Queue(), {}
+
+        async def pump():
+            # Queue items are (ok, chunk): None ends the stream, ok=False carries the error
+            try:
+                async for chunk in astream_completion(model_name, api_key, prompt, max_tokens=max_tokens,
+                                                      system=system, usage=usage):
+                    chunks.put_nowait((True, chunk))
+                chunks.put_nowait((True, None))
+            except Exception as e:
+                chunks.put_nowait((False, e))
+
+        async def first_chunk():
+            ok, chunk = await chunks.get()
+            if not ok:
+                raise chunk
+            return chunk
+
+        task = asyncio.ensure_future(pump())
+        return chunks, task, usage, asyncio.ensure_future(first_chunk())
+
+    async def stream(self, model_name, api_key, prompt, system=None, usage=None, max_tokens=DEFAULT_MAX_OUTPUT_TOKENS):
+        """
+        Async generator running `astream_completion` with hedging on the first chunk. `usage` receives the
+        winning stream's token usage, and 'model' when the duplicate won.
+        """
+        self._count('requests')
+        delay = self.hedge_delay(model_name, 'stream')
+        start = time.perf_counter()
+        candidates = [self._open_stream(model_name, api_key, prompt, system, max_tokens)]
+        winner, winner_model = None, model_name
+        try:
+            done, _ = await asyncio.wait({candidates[0][3]}, timeout=delay)
+            if done:
+                winner, winner_model, winner_start = candidates[0], model_name, start
+            else:
+                hedge_model, hedge_key = self._hedge_target(model_name, api_key)
+                self._count('hedged')
+                hedge_start = time.perf_counter()
+                candidates.append(self._open_stream(hedge_model, hedge_key, prompt, system, max_tokens))
+                first, _ = await _first_success([candidate[3] for candidate in candidates])
+                winner = next(candidate for candidate in candidates if candidate[3] is first)
+                loser = next(candidate for candidate in candidates if candidate is not winner)
+                loser[1].cancel()
+                winner_is_hedge = winner is candidates[1]
+                self._record_race(winner_is_hedge, hedge_model, loser[2], f"{system or ''}{prompt}")
+                winner_model, winner_start = (hedge_model, hedge_start) if winner_is_hedge else (model_name, start)
+
+            chunks, _, _, first = winner
+            chunk = first.result()
+            self.tracker.record((self.agent_name, winner_model, 'stream'), time.perf_counter() - winner_start)
+            while chunk is not None:
+                yield chunk
+                ok, chunk = await chunks.get()
+                if not ok:
+                    raise chunk
+        finally:
+            # Stops the losing stream, and every stream if the consumer gave up early
+            for _, task, _, first in candidates:
+                task.cancel()
+                first.cancel()
+            if usage is not None and winner is not None:
+                usage.update(winner[2])
+                if winner_model != model_name:
+                    usage['model'] = winner_model
@@ -0,0 +1,331 @@
+'''
+🧪 MockBackend Class - Deterministic Local Stand-In for the Model Providers
+--------------------------------------------------------------------------
+Technical Overview:
+Every agent call used to go to OpenAI or Anthropic, so the pipeline's own overhead could not be measured or
+compared offline. MockBackend is a local model backend. Its answers are scripted and fully deterministic: the
+same prompt always gets the same response. It recognises the prompt it receives by the agent's mandate and
+answers in the format that agent expects:
+- AgentOne gets a classification dictionary, worked out from keywords, tickers and periods in the user input,
+  followed by a sentence of explanation, as real models tend to add.
+- AgentTwo gets a JSON risk profile, or, when it updates an existing profile, only the fields the new
+  messages give evidence for.
+- The summarizer and the research report summarizer get a short extract of their input.
+- AgentZero gets a short conversational reply.
+Custom scripts can be registered ahead of the built-in ones.
+
+The backend is selected by the model name `mock-llm` (MOCK_MODEL_NAME). Setting the environment variable
+`AVA_LLM_BACKEND=mock` offers it in the model selection and skips the API key prompt for it. The backend acts
+as the 'mock' provider in `agents.providers`, so prompting, cached completions and streaming go through the
+same code paths (AgentBase locks, spans and usage metrics, the async client layer) as real providers. Latency
+is configurable per call (`AVA_MOCK_LATENCY`, seconds) and per output token (`AVA_MOCK_TOKEN_LATENCY`,
+seconds). Responses are cut to the request's `max_tokens` (counted in words). Token usage is counted with
+the offline token counter. Every call is logged with its role, tokens
+and the thread that made it, so benchmarks can count calls and tokens per turn.
+
+In Simple Terms:
+This is a pretend language model that answers instantly (or as slowly as you ask it to) and always says the
+same thing for the same question. It lets us time AVA's own machinery without paying for, or waiting on, a
+real model.
+
+Classes and Functions:
+- MockBackend: Produces scripted responses, simulates latency and logs every call.
+- MockPrompter: LLMWare-compatible prompter (`prompt_main`) backed by a MockBackend.
+- mock_backend_enabled: Whether the mock backend is switched on through the environment.
+- get_mock_backend: Returns the process-wide MockBackend.
+'''
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+from utils.token_counter import count_tokens
+from .async_client import caller_thread_name
+
+MOCK_MODEL_NAME = 'mock-llm'
+MOCK_BACKEND_ENV = 'AVA_LLM_BACKEND'
+MOCK_LATENCY_ENV = 'AVA_MOCK_LATENCY'
+MOCK_TOKEN_LATENCY_ENV = 'AVA_MOCK_TOKEN_LATENCY'
+
+MockCall = namedtuple('MockCall', ['role', 'input_tokens', 'output_tokens', 'seconds', 'thread'])
+
+# Words that look like tickers in upper case but are not
+_NON_TICKERS = {'I', 'A', 'PE', 'EPS', 'AI', 'OK', 'US', 'USD', 'ETF', 'CEO', 'AND', 'OR', 'VS'}
+_TICKER_PATTERN = re.compile(r"\$?\b([A-Z]{1,5}(?:\.[A-Z]{1,2})?)\b")
+_PERIOD_PATTERN = re.compile(r"\b(1d|5d|1mo|3mo|6mo|1y|2y|5y|10y|ytd|max)\b", re.IGNORECASE)
+_FUNDAMENTAL_TYPES = [
+    ('dividend', 'dividendYield'),
+    ('forward pe', 'forwardPE'),
+    ('pe', 'trailingPE'),
+    ('market cap', 'marketCap'),
+    ('ebitda', 'ebitda'),
+    ('volume', 'volume'),
+    ('sector', 'sector'),
+    ('website', 'website'),
+]
+
+
+def mock_backend_enabled():
+    return os.environ.get(MOCK_BACKEND_ENV, '').strip().lower() == 'mock'
+
+
+def _env_seconds(name):
+    try:
+        return max(float(os.environ.get(name, 0) or 0), 0.0)
+    except ValueError:
+        return 0.0
+
+
+def _user_input(prompt):
+    """The user input at the end of an AgentOne prompt (everything after the last 'User input:')."""
+    marker = prompt.rfind("User input:")
+    return prompt[marker + len("User input:"):].strip() if marker != -1 else prompt.strip()
+
+
+def _words(text, limit):
+    words = text.split()
+    return " ".join(words[:limit]) + (" ..." if len(words) > limit else "")
+
+
+def _truncate(text, max_tokens):
+    """Cuts `text` to `max_tokens` words, like a provider stopping at its output limit."""
+    if max_tokens is None:
+        return text
+    return "".join(re.findall(r"\S+\s*", text)[:max_tokens]).rstrip()
+
+
+def classify_input(user_input):
+    """Keyword-based stand-in for AgentOne: returns the evaluation dictionary for `user_input`."""
+    text = user_input.lower()
+    tickers = [t for t in _TICKER_PATTERN.findall(user_input) if t not in _NON_TICKERS]
+    period = _PERIOD_PATTERN.search(user_input)
+    period = [period.group(1).lower()] if period else []
+
+    if 'table' in text and ('pe' in text.split() or 'dividend' in text):
+        theme = re.search(r"\b([a-z]+)\s+(?:stocks|companies|sector)\b", text)
+        return {'pe_div_yield_table': {
+            'fields': ['pe_ratio', 'dividen_yield'],
+            'theme': theme.group(1) if theme else '',
+            'sort_by': 'market_cap_usd',
+            'order': 'desc',
+            'limit': 10
+        }}
+    if 'radar' in text and len(tickers) >= 2:
+        metrics = [metric for keyword, metric in _FUNDAMENTAL_TYPES[:3] if keyword in text] or ['trailingPE']
+        return {'radar_chart': [list(dict.fromkeys(metrics))] + tickers}
+    if 'compare' in text and len(tickers) >= 2:
+        return {'compare_price_chart': tickers + period}
+    if tickers and ('price' in text or 'chart' in text):
+        return {'price_chart': tickers[:1] + period}
+    if tickers:
+        evaluation = {'fundamentals': tickers[:1]}
+        fundamentals_type = next((metric for keyword, metric in _FUNDAMENTAL_TYPES if keyword in text.split()
+                                  or (' ' in keyword and keyword in text)), None)
+        if fundamentals_type:
+            evaluation['fundamentals_type'] = fundamentals_type
+        return evaluation
+    if any(word in text for word in ('invest', 'advice', 'recommend', 'which stocks', 'portfolio')):
+        return {'investment_advice': ['Y']}
+    if any(word in text for word in ('years', 'retire', 'horizon', 'long-term', 'income', 'risk', 'savings')):
+        return {'investment_advice': ['R']}
+    return {'investment_advice': ['N']}
+
+
+def _risk_profile(prompt):
+    text = prompt.lower()
+    return json.dumps({
+        'risk_ability': 'high' if 'high' in text or 'aggressive' in text else 'medium',
+        'risk_willingness': 'low' if 'cautious' in text or 'safe' in text else 'medium',
+        'time_horizon': 'long' if 'long' in text or 'years' in text else 'medium',
+        'other_notes': 'Scripted profile from the mock backend.'
+    })
+
+
+def _risk_profile_delta(prompt):
+    text = prompt.split("New messages:", 1)[-1].lower()
+    delta = {}
+    if 'high' in text or 'aggressive' in text:
+        delta['risk_ability'] = 'high'
+    if 'cautious' in text or 'safe' in text:
+        delta['risk_willingness'] = 'low'
+    if 'long' in text or 'years' in text:
+        delta['time_horizon'] = 'long'
+    return json.dumps(delta)
+
+
+class MockBackend:
+    def __init__(self, latency=None, token_latency=None):
+        self.latency = _env_seconds(MOCK_LATENCY_ENV) if latency is None else latency
+        self.token_latency = _env_seconds(MOCK_TOKEN_LATENCY_ENV) if token_latency is None else token_latency
+        self._scripts = []
+        self._calls = []
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    # -------------------------------------------------------------------------
+    # Scripted responses
+    # -------------------------------------------------------------------------
+
+    def register(self, pattern, response, role='scripted'):
+        """
+        Adds a script ahead of the built-in ones: prompts matching the regular expression `pattern` get
+        `response` (a string, or a callable receiving the prompt).
+        """
+        self._scripts.insert(0, (re.compile(pattern), response, role))
+
+    def respond(self, prompt):
+        """Returns (role, response text) for `prompt`."""
+        for pattern, response, role in self._scripts:
+            if pattern.search(prompt):
+                return role, response(prompt) if callable(response) else response
+
+        if "You are Agent One" in prompt:
+            return 'agent_one', (f"{classify_input(_user_input(prompt))}\n\nThis classification is based on the "
+                                 f"keywords, tickers and periods mentioned in the user input.")
+        if "You are Agent Two" in prompt:
+            if "Current risk profile:" in prompt:
+                return 'agent_two', _risk_profile_delta(prompt)
+            return 'agent_two', _risk_profile(prompt)
+        if "summarizes conversation history" in prompt or "summary of the following research report" in prompt:
+            body = prompt.split(":\n\n", 1)[-1]
+            # About half the input, at most 40 words, so a summary is always shorter than what it summarizes
+            return 'summarizer', f"Summary: {_words(body, min(40, max(len(body.split()) // 2, 5)))}"
+        if "You are Agent Zero" in prompt:
+            client = prompt.rsplit("Client:", 1)[-1].split("Agent Zero:", 1)[0].strip()
+            return 'agent_zero', f"Thanks for your message about \"{_words(client, 12)}\". Here is what I can tell you."
+        return 'other', "OK."
+
+    # -------------------------------------------------------------------------
+    # Calls
+    # -------------------------------------------------------------------------
+
+    def _begin(self):
+        with self._condition:
+            self._in_flight += 1
+
+    def _end(self, role, prompt, text, start):
+        usage = {
+            'input': count_tokens(prompt, MOCK_MODEL_NAME),
+            'output': count_tokens(text, MOCK_MODEL_NAME),
+            'cached': 0,
+        }
+        with self._condition:
+            self._calls.append(MockCall(role, usage['input'], usage['output'], time.perf_counter() - start,
+                                        caller_thread_name()))
+            self._in_flight -= 1
+            self._condition.notify_all()
+        return usage
+
+    def complete(self, prompt, system=None, max_tokens=None):
+        """Returns (response text, usage dict) after the configured latency."""
+        full_prompt = f"{system}{prompt}" if system else prompt
+        self._begin()
+        start = time.perf_counter()
+        role, text = 'error', ""
+        try:
+            role, text = self.respond(full_prompt)
+            text = _truncate(text, max_tokens)
+            time.sleep(self.latency + self.token_latency * len(text.split()))
+        finally:
+            usage = self._end(role, full_prompt, text, start)
+        return text, usage
+
+    def stream(self, prompt, system=None, usage=None, max_tokens=None):
+        """Yields the response word by word, sleeping `token_latency` per word after the initial latency."""
+        full_prompt = f"{system}{prompt}" if system else prompt
+        self._begin()
+        start = time.perf_counter()
+        role, streamed = 'error', ""
+        try:
+            role, text = self.respond(full_prompt)
+            text = _truncate(text, max_tokens)
+            time.sleep(self.latency)
+            for word in re.findall(r"\S+\s*", text):
+                time.sleep(self.token_latency)
+                streamed += word
+                yield word
+        finally:
+            # Only what was streamed counts (the consumer may stop early)
+            call_usage = self._end(role, full_prompt, streamed, start)
+            if usage is not None:
+                usage.update(call_usage)
+
+    async def acomplete(self, prompt, system=None, max_tokens=None):
+        """Coroutine version of `complete` (sleeps without blocking the event loop)."""
+        full_prompt = f"{system}{prompt}" if system else prompt
+        self._begin()
+        start = time.perf_counter()
+        role, text = 'error', ""
+        try:
+            role, text = self.respond(full_prompt)
+            text = _truncate(text, max_tokens)
+            await asyncio.sleep(self.latency + self.token_latency * len(text.split()))
+        finally:
+            usage = self._end(role, full_prompt, text, start)
+        return text, usage
+
+    async def astream(self, prompt, system=None, usage=None, max_tokens=None):
+        """Async generator version of `stream`."""
+        full_prompt = f"{system}{prompt}" if system else prompt
+        self._begin()
+        start = time.perf_counter()
+        role, streamed = 'error', ""
+        try:
+            role, text = self.respond(full_prompt)
+            text = _truncate(text, max_tokens)
+            await asyncio.sleep(self.latency)
+            for word in re.findall(r"\S+\s*", text):
+                await asyncio.sleep(self.token_latency)
+                streamed += word
+                yield word
+        finally:
+            # Only what was streamed counts (the consumer may stop early)
+            call_usage = self._end(role, full_prompt, streamed, start)
+            if usage is not None:
+                usage.update(call_usage)
+
+    # -------------------------------------------------------------------------
+    # Call log
+    # -------------------------------------------------------------------------
+
+    @property
+    def calls(self):
+        with self._condition:
+            return list(self._calls)
+
+    def wait_idle(self, timeout=None):
+        """Waits until no call is in flight (e.g. background precomputation). Returns False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._in_flight == 0, timeout)
+
+    def reset(self):
+        with self._condition:
+            self._calls.clear()
+
+
+class MockPrompter:
+    """Drop-in for an LLMWare prompter: `prompt_main` returns {'llm_response', 'usage'}."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def prompt_main(self, prompt_text):
+        text, usage = self.backend.complete(prompt_text)
+        return {'llm_response': text, 'usage': usage}
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_mock_backend():
+    """Returns the process-wide MockBackend (created on first use from the environment settings)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = MockBackend()
+        return _backend
@@ -0,0 +1,195 @@
+'''
+🔌 Provider Helpers - Direct Access to the OpenAI and Anthropic SDKs
+--------------------------------------------------------------------
+Technical Overview:
+LLMWare's `Prompt.prompt_main` returns a finished completion, which is all most agents need. Some features
+need more than that, such as token streaming, so this module talks to the provider SDKs (`openai`,
+`anthropic`, both listed in requirements.txt) directly. The provider is inferred from the model name. The SDKs
+are imported lazily, so the module can be imported without either of them installed. The model name
+`mock-llm` selects the 'mock' provider, a deterministic local stand-in (see `agents.mock_backend`).
+
+Requests are coroutines (`acomplete`, `astream_completion`) run on the async client layer
+(`agents.async_client`). That layer provides pooled keep-alive connections and a concurrency bound per
+provider. Synchronous callers use `complete` and `stream_completion`, which block on the background loop.
+
+In Simple Terms:
+This is a thin adapter that lets an agent talk straight to OpenAI or Anthropic when it needs something the
+LLMWare wrapper doesn't offer, like receiving the answer word by word.
+
+Functions:
+- provider_for_model: Returns 'openai', 'anthropic', 'mock' or None for a model name.
+- load_prompter: Loads the LLMWare prompter for a model (a MockPrompter for the mock backend).
+- acomplete: Coroutine running one completion with an optional (cacheable) system prefix; returns text and usage.
+- astream_completion: Async generator yielding the completion text chunk by chunk.
+- complete: Blocking wrapper around `acomplete`.
+- stream_completion: Synchronous generator around `astream_completion` (closing it cancels the request).
+'''
+
+from .async_client import get_async_sdk_client, get_event_loop_thread, provider_slot
+from .mock_backend import MOCK_MODEL_NAME, MockPrompter, get_mock_backend
+
+DEFAULT_MAX_OUTPUT_TOKENS = 1024
+
+
+def provider_for_model(model_name):
+    if not model_name:
+        return None
+    if model_name == MOCK_MODEL_NAME:
+        return 'mock'
+    if model_name.startswith('gpt'):
+        return 'openai'
+    if model_name.startswith('claude'):
+        return 'anthropic'
+    return None
+
+
+def load_prompter(model_name, api_key):
+    """Loads a prompter exposing `prompt_main`: LLMWare's Prompt, or a MockPrompter for the mock backend."""
+    if provider_for_model(model_name) == 'mock':
+        return MockPrompter(get_mock_backend())
+    from llmware.prompts import Prompt
+    return Prompt().load_model(model_name, api_key=api_key)
+
+
+def _system_blocks(provider, system, cache_system):
+    """Provider-specific representation of the static system prefix."""
+    if provider == 'anthropic':
+        block = {"type": "text", "text": system}
+        if cache_system:
+            block["cache_control"] = {"type": "ephemeral"}
+        return [block]
+    return system
+
+
+def _openai_messages(prompt, system):
+    messages = [{"role": "user", "content": prompt}]
+    if system:
+        messages.insert(0, {"role": "system", "content": system})
+    return messages
+
+
+def _openai_usage(raw_usage):
+    details = getattr(raw_usage, 'prompt_tokens_details', None)
+    return {
+        "input": raw_usage.prompt_tokens,
+        "output": raw_usage.completion_tokens,
+        "cached": (getattr(details, 'cached_tokens', None) or 0) if details else 0,
+    }
+
+
+def _anthropic_usage(raw_usage):
+    cache_read = getattr(raw_usage, 'cache_read_input_tokens', None) or 0
+    cache_write = getattr(raw_usage, 'cache_creation_input_tokens', None) or 0
+    return {
+        "input": raw_usage.input_tokens + cache_read + cache_write,
+        "output": raw_usage.output_tokens,
+        "cached": cache_read,
+    }
+
+
+def _check_provider(model_name, provider, action):
+    if provider not in ('openai', 'anthropic', 'mock'):
+        raise ValueError(f"{action} is not supported for model '{model_name}'.")
+
+
+async def acomplete(model_name, api_key, prompt, system=None, cache_system=True, max_tokens=DEFAULT_MAX_OUTPUT_TOKENS):
+    """
+    Runs a single (non-streaming) completion. `system` is sent as the provider's system prompt and,
+    for Anthropic, marked as cacheable when `cache_system` is True. OpenAI caches long stable
+    prefixes automatically.
+
+    Returns:
+        tuple: (response text, usage dict with 'input', 'output' and 'cached' token counts)
+    """
+    provider = provider_for_model(model_name)
+    _check_provider(model_name, provider, "Direct completion")
+
+    async with provider_slot(provider):
+        if provider == 'mock':
+            return await get_mock_backend().acomplete(prompt, system=system, max_tokens=max_tokens)
+
+        client = get_async_sdk_client(provider, api_key)
+        if provider == 'openai':
+            response = await client.chat.completions.create(
+                model=model_name,
+                messages=_openai_messages(prompt, system),
+                max_tokens=max_tokens
+            )
+            return response.choices[0].message.content or "", _openai_usage(response.usage)
+
+        request = dict(model=model_name, max_tokens=max_tokens, messages=[{"role": "user", "content": prompt}])
+        if system:
+            request['system'] = _system_blocks(provider, system, cache_system)
+        response = await client.messages.create(**request)
+        text = "".join(block.text for block in response.content if getattr(block, 'type', None) == 'text')
+        return text, _anthropic_usage(response.usage)
+
+
+def complete(model_name, api_key, prompt, system=None, cache_system=True, max_tokens=DEFAULT_MAX_OUTPUT_TOKENS):
+    """Blocking `acomplete` (runs on the shared event loop). Returns (response text, usage dict)."""
+    return get_event_loop_thread().run(
+        acomplete(model_name, api_key, prompt, system=system, cache_system=cache_system, max_tokens=max_tokens)
+    )
+
+
+async def astream_completion(model_name, api_key, prompt, max_tokens=DEFAULT_MAX_OUTPUT_TOKENS,
+                             system=None, cache_system=True, usage=None):
+    """
+    Async generator yielding text chunks of the model's completion for `prompt` as they arrive.
+    If a `usage` dict is passed, it is filled with the token usage once the stream finishes.
+
+    Raises:
+        ValueError: If the model does not belong to a supported provider.
+    """
+    provider = provider_for_model(model_name)
+    _check_provider(model_name, provider, "Streaming")
+
+    async with provider_slot(provider):
+        if provider == 'mock':
+            async for text in get_mock_backend().astream(prompt, system=system, usage=usage, max_tokens=max_tokens):
+                yield text
+
+        elif provider == 'openai':
+            client = get_async_sdk_client(provider, api_key)
+            stream = await client.chat.completions.create(
+                model=model_name,
+                messages=_openai_messages(prompt, system),
+                max_tokens=max_tokens,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+                    if getattr(chunk, 'usage', None) is not None and usage is not None:
+                        usage.update(_openai_usage(chunk.usage))
+            finally:
+                await stream.close()
+
+        else:
+            client = get_async_sdk_client(provider, api_key)
+            request = dict(model=model_name, max_tokens=max_tokens, messages=[{"role": "user", "content": prompt}])
+            if system:
+                request['system'] = _system_blocks(provider, system, cache_system)
+            async with client.messages.stream(**request) as stream:
+                async for text in stream.text_stream:
+                    yield text
+                if usage is not None:
+                    usage.update(_anthropic_usage((await stream.get_final_message()).usage))
+
+
+def stream_completion(model_name, api_key, prompt, max_tokens=DEFAULT_MAX_OUTPUT_TOKENS,
+                      system=None, cache_system=True, usage=None):
+    """
+    Generator yielding text chunks of the model's completion for `prompt` as they arrive. The stream runs on
+    the shared event loop; closing the generator early cancels the request.
+
+    Raises:
+        ValueError: If the model does not belong to a supported provider.
+    """
+    _check_provider(model_name, provider_for_model(model_name), "Streaming")
+    yield from get_event_loop_thread().iterate(
+        astream_completion(model_name, api_key, prompt, max_tokens=max_tokens,
+                           system=system, cache_system=cache_system, usage=usage)
+    )
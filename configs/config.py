@@ -11,7 +11,8 @@ vector-based data management.
 
 In Simple Terms:
 The Config class is like the app's settings hub. It sets up the main storage (SQLite) and enables a 
-specialized storage (Milvus Lite) for handling certain types of data. This makes the app ready to store 
+specialized storage (Milvus Lite) for handling certain types of data, such as the semantic cache of AgentOne 
+classifications (see utils/classification_cache.py). This makes the app ready to store 
 and quickly access information, so all the agents can work efficiently.
 
 Attributes:
@@ -12,12 +12,16 @@ You can use this file to set how many past messages and reports you want to incl
 Attributes:
 - num_messages: Number of past messages to include in the conversation summary.
 - num_reports: Number of past reports to include in the reports summary.
+- incremental_summaries: If True, keep a running conversation summary and only fold in new messages each turn.
+- summary_token_threshold: Minimum size (in tokens) of the new messages before the running summary is updated.
+- risk_profile_messages: Number of recent user/assistant messages AgentTwo reads to build the risk profile.
+- incremental_risk_profile: If True, update an existing risk profile from the new messages only (a delta).
 
 Methods:
 - None; this is a simple configuration class.
 
 Usage:
-- Adjust the `num_messages` and `num_reports` attributes as needed.
+- Adjust the `num_messages`, `num_reports`, `incremental_summaries` and `summary_token_threshold` attributes as needed.
 """
 
 class ConversationMemoryConfig:
@@ -25,9 +29,22 @@ class ConversationMemoryConfig:
         # Set default values; you can adjust these as needed
         self.num_messages = 3
         self.num_reports = 3
+        self.incremental_summaries = True
+        self.summary_token_threshold = 200
+        self.risk_profile_messages = 40
+        self.incremental_risk_profile = True
 
     def set_num_messages(self, num_messages):
         self.num_messages = num_messages
 
     def set_num_reports(self, num_reports):
         self.num_reports = num_reports
+
+    def set_incremental_summaries(self, incremental_summaries):
+        self.incremental_summaries = incremental_summaries
+
+    def set_summary_token_threshold(self, summary_token_threshold):
+        self.summary_token_threshold = summary_token_threshold
+
+    def set_incremental_risk_profile(self, incremental_risk_profile):
+        self.incremental_risk_profile = incremental_risk_profile
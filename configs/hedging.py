@@ -0,0 +1,59 @@
+# configs/hedging.py
+
+"""
+📁 HedgingConfig Class - Configuration for Hedged LLM Requests
+---------------------------------------------------------------
+Technical Overview:
+This configuration selects the agents whose model requests are hedged and tunes the hedging policy. When a
+request has not returned by the configured percentile of that agent's recent latency, a duplicate is sent to
+the same model or to an alternate model. The first response wins and the other request is cancelled (see
+`agents.hedging`).
+
+In Simple Terms:
+If an answer is taking unusually long, AVA asks a second time and uses whichever answer arrives first. This
+file decides for which agents that happens and how impatient AVA is.
+
+Attributes:
+- hedged_agents: Names of the agents whose requests are hedged (empty by default: hedging is opt-in).
+- percentile: Latency percentile (0-1) of recent requests after which the duplicate is sent.
+- alternate_model: Model receiving the duplicate request (None: the agent's own model).
+- min_samples: Recent requests needed before hedging starts for an agent and model.
+- min_delay: Lower bound, in seconds, of the wait before hedging.
+
+Methods:
+- is_hedged: Whether the named agent's requests are hedged.
+
+Usage:
+- Adjust the attributes as needed, or use the hedging settings in the sidebar.
+"""
+
+# Agents whose latency sits on the critical path of a turn
+HEDGEABLE_AGENTS = ['AgentOne', 'AgentZero']
+
+
+class HedgingConfig:
+    def __init__(self):
+        # Set default values; you can adjust these as needed
+        self.hedged_agents = set()
+        self.percentile = 0.95
+        self.alternate_model = None
+        self.min_samples = 10
+        self.min_delay = 0.5
+
+    def set_hedged_agents(self, hedged_agents):
+        self.hedged_agents = set(hedged_agents)
+
+    def set_percentile(self, percentile):
+        self.percentile = percentile
+
+    def set_alternate_model(self, alternate_model):
+        self.alternate_model = alternate_model
+
+    def set_min_samples(self, min_samples):
+        self.min_samples = min_samples
+
+    def set_min_delay(self, min_delay):
+        self.min_delay = min_delay
+
+    def is_hedged(self, agent_name):
+        return agent_name in self.hedged_agents
@@ -0,0 +1,38 @@
+# configs/output_limits.py
+
+"""
+📁 Output Limits - Hard Caps on the Length of Each Agent's Responses
+--------------------------------------------------------------------
+Technical Overview:
+Every provider request carries a maximum number of output tokens. The cap is set per agent here, so an
+agent that only has to return a short dictionary (AgentOne) cannot spend seconds generating an explanation
+nobody reads, while AgentZero keeps room for a full answer. The cap is also the output reserve of the
+agent's token budget, so prompts are fitted to the context window minus what the agent may write.
+
+In Simple Terms:
+This sets how long each agent's answers are allowed to be. Agents that only fill in a form get a short
+limit; the agent that talks to the user gets a long one.
+
+Attributes:
+- MAX_OUTPUT_TOKENS: Output token cap per agent class name.
+- DEFAULT_OUTPUT_TOKENS: Cap for agents not listed.
+
+Functions:
+- max_output_tokens: The cap for an agent.
+
+Usage:
+- Adjust the caps as needed.
+"""
+
+DEFAULT_OUTPUT_TOKENS = 1024
+
+MAX_OUTPUT_TOKENS = {
+    'AgentOne': 256,        # a short classification dictionary
+    'AgentTwo': 512,        # a JSON risk profile
+    'AgentSummarizer': 512,
+    'AgentZero': 1024,
+}
+
+
+def max_output_tokens(agent_name):
+    return MAX_OUTPUT_TOKENS.get(agent_name, DEFAULT_OUTPUT_TOKENS)
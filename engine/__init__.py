@@ -0,0 +1,6 @@
+# engine/__init__.py
+
+from .output import ProgressBar, RecordingOutput, TurnOutput
+from .session_store import InMemorySessionStore, SessionStore, new_session_state, resume_session_state
+from .advisory_session import AdvisorySession
+from .advisory_engine import AdvisoryEngine, EngineBusy, EngineSettings
@@ -0,0 +1,151 @@
+# engine/advisory_engine.py
+
+"""
+⚙️ AdvisoryEngine Class - The Advisory Pipeline as an Importable Engine
+-----------------------------------------------------------------------
+Technical Overview:
+AdvisoryEngine ties EngineSettings (models per agent, API keys, conversation memory and hedging
+configuration) to a SessionStore. Each turn runs through an AdvisorySession built for the conversation:
+- `session(state, output)` builds a session for a state mapping the caller already holds. The Streamlit app
+  does this with `st.session_state`.
+- `run_turn(session_id, message)` looks the conversation up in the session store, runs the turn and returns
+  a JSON-serialisable result (reply, classification, rendered events, timing, token counts).
+- `arun_turn` is the coroutine version, used by the API server.
+
+Concurrency is bounded. Turns run on a pool of `turn_workers` threads. At most `max_pending` turns may be
+running or queued; beyond that `arun_turn` raises EngineBusy instead of queueing without limit. The turns of
+one conversation are serialized by the session's lock, while different conversations run in parallel. Model
+calls made inside the turns share the process-wide async client layer, client registry and caches.
+
+In Simple Terms:
+This is AVA without a screen. Give it a conversation ID and a message and it returns the answer and
+everything it would have shown. Many conversations can be served at once, up to a fixed number of workers.
+
+Classes:
+- EngineSettings: What the engine runs with (models, API keys, configs).
+- AdvisoryEngine: Runs turns for the conversations in a SessionStore.
+- EngineBusy: Raised when too many turns are already pending.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agents.providers import provider_for_model
+from configs.conversation_memory import ConversationMemoryConfig
+from engine.advisory_session import AdvisorySession
+from engine.output import RecordingOutput
+from engine.session_store import InMemorySessionStore
+from utils.job_queue import get_job_queue
+
+AGENTS = ('agent_zero', 'agent_one', 'agent_two')
+TOKEN_FIELDS = ('input', 'output', 'cached')
+
+
+class EngineBusy(Exception):
+    """Too many turns are running or queued."""
+
+
+class EngineSettings:
+    def __init__(self, models, api_keys=None, memory_config=None, hedging_config=None, stream=True,
+                 research_wait=None):
+        """
+        Args:
+            models (dict or str): Model per agent ('agent_zero', 'agent_one', 'agent_two'), or one model for all.
+            api_keys (dict): API key per provider ('openai', 'anthropic').
+            memory_config (ConversationMemoryConfig): Summarization and risk profile settings.
+            hedging_config (HedgingConfig): Optional hedging of slow requests.
+            stream (bool): Stream AgentZero's response into the assistant message.
+            research_wait (float): Seconds a turn waits for the research report job before answering without
+                it (the report is added when the job finishes); None waits until it is done.
+        """
+        self.models = {agent: models for agent in AGENTS} if isinstance(models, str) else dict(models)
+        self.api_keys = dict(api_keys or {})
+        self.memory_config = memory_config if memory_config is not None else ConversationMemoryConfig()
+        self.hedging_config = hedging_config
+        self.stream = stream
+        self.research_wait = research_wait
+
+    def api_key_for_model(self, model_name):
+        return self.api_keys.get(provider_for_model(model_name))
+
+
+class AdvisoryEngine:
+    def __init__(self, settings, session_store=None, turn_workers=8, max_pending=64):
+        self.settings = settings
+        self.session_store = session_store if session_store is not None else InMemorySessionStore()
+        self.turn_workers = turn_workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {'turns': 0, 'failed': 0, 'rejected': 0}
+
+    def session(self, state, output=None):
+        """An AdvisorySession for a state mapping held by the caller (e.g. `st.session_state`)."""
+        return AdvisorySession(self.settings, state, output if output is not None else RecordingOutput())
+
+    # -------------------------------------------------------------------------
+    # Turns on the session store
+    # -------------------------------------------------------------------------
+
+    def create_session(self, session_id=None):
+        return self.session_store.create(session_id)[0]
+
+    def run_turn(self, session_id, message):
+        """
+        Runs one turn of a stored conversation (serialized with its other turns).
+
+        Returns:
+            dict: 'session_id', 'reply', 'intent', 'evaluation', 'source', 'events' (what the turn rendered),
+                  'elapsed_ms' and 'tokens' (input, output and cached tokens of the turn's model calls); None if
+                  the session is unknown.
+        """
+        output = RecordingOutput()
+        with self.session_store.checkout(session_id) as state:
+            if state is None:
+                return None
+            session = self.session(state, output)
+            start = time.perf_counter()
+            try:
+                turn = session.run_turn(message)
+            except Exception:
+                with self._lock:
+                    self._stats['failed'] += 1
+                raise
+            elapsed_ms = round(1000 * (time.perf_counter() - start), 1)
+        with self._lock:
+            self._stats['turns'] += 1
+        return dict(
+            turn,
+            session_id=session_id,
+            events=output.events,
+            elapsed_ms=elapsed_ms
+        )
+
+    async def arun_turn(self, session_id, message):
+        """Coroutine version of `run_turn`, on the engine's bounded worker pool. Raises EngineBusy when full."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats['rejected'] += 1
+                raise EngineBusy(f"{self._pending} turns pending")
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.turn_workers, thread_name_prefix='ava-turn')
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self.run_turn, session_id, message)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self):
+        """Returns {'turns', 'failed', 'rejected', 'pending', 'sessions', 'turn_workers', 'jobs'}."""
+        with self._lock:
+            stats = dict(self._stats, pending=self._pending, sessions=len(self.session_store),
+                         turn_workers=self.turn_workers)
+        return dict(stats, jobs=get_job_queue().stats())
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
@@ -0,0 +1,736 @@
+# engine/advisory_session.py
+
+"""
+🧭 AdvisorySession Class - One Conversation's Turn Pipeline, Independent of the Front End
+-----------------------------------------------------------------------------------------
+Technical Overview:
+AdvisorySession is the turn pipeline that used to be written inline in `main.py`:
+- the summaries and the classification (fast path, classification cache or AgentOne) run as a DAG;
+- market data is prefetched while AgentOne classifies;
+- the matching intent handler runs (the research report on a background job of `utils.job_queue`);
+- AgentZero answers;
+- the next turn's summaries are precomputed in the background.
+It is bound to one conversation's session state (any mapping; see `engine.session_store`) and to a TurnOutput
+the handlers render to (see `engine.output`). It never calls Streamlit, so the same pipeline serves the
+Streamlit app, the API server and scripts.
+
+A session is cheap to build. Models come from the process-wide client registry, and the session only wires
+the agents, managers, intent classifier and dispatcher to the conversation's metrics. A client builds one per
+Streamlit rerun or per API request.
+
+In Simple Terms:
+This is AVA's thinking for one conversation: it reads the message, works out what is asked, fetches what is
+needed and lets AgentZero reply. Where the results are shown is someone else's job.
+
+Classes and Functions:
+- AdvisorySession: Runs turns (`run_turn`), risk re-profiling (`reprofile`) and picks up the results of
+  background jobs (`collect_jobs`) for one conversation.
+- price_chart_request / compare_chart_request: Parameters of chart evaluations.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from agents.agent_one import AgentOne
+from agents.agent_summarizer import AgentSummarizer
+from agents.agent_two import AgentTwo
+from agents.agent_zero import AgentZero
+from agents.hedging import HedgePolicy
+from engine.themes import map_theme
+from utils.classification_cache import get_classification_cache
+from utils.context_precompute import ContextPrecomputer
+from utils.conversation_utils import ConversationManager
+from utils.dag_executor import DagExecutor
+from utils.fast_path_router import get_fast_path_router
+from utils.instrumentation import PipelineMetrics
+from utils.intent_classifier import IntentClassifier
+from utils.intent_dispatcher import IntentDispatcher, intent_key, intent_value
+from utils.job_queue import DONE, FAILED, get_job_queue
+from utils.market_data import MarketDataPrefetcher, get_market_data_cache
+from utils.price_chart_manager import PriceChartManager, KNOWN_PERIODS
+from utils.research_utils import RESEARCH_JOB, RESEARCH_MAX_AGE, ResearchManager, run_research_job
+from utils.response_parsing import parse_agent_response
+from utils.risk_profile_utils import RiskProfileManager
+from utils.single_stock_fundamentals import FundamentalsManager
+from utils.tracing import Tracer, trace_span
+from utils.turn_context import TurnContext
+
+# Turns AgentZero follows up with risk-profile questions (its mandate); the next input is likely the answer
+PROFILING_INTENTS = ('investment_advice_Y', 'investment_advice_R')
+
+
+def price_chart_request(evaluation_dict):
+    """(ticker, period) requested by a 'price_chart' evaluation."""
+    params = evaluation_dict['price_chart']
+    return params[0], (params[1] if len(params) > 1 else '1mo')
+
+
+def compare_chart_request(evaluation_dict):
+    """(tickers, period) requested by a 'compare_price_chart' evaluation; the period is optional and last."""
+    params = evaluation_dict['compare_price_chart']
+    if params and params[-1] in KNOWN_PERIODS:
+        return list(params[:-1]), params[-1]
+    return list(params), '1mo'
+
+
+def market_data_keys(evaluation_dict):
+    """The market data cache keys the intent handler for `evaluation_dict` will read (scored against prefetches)."""
+    cache = get_market_data_cache()
+    if evaluation_dict.get('price_chart'):
+        stock_ticker, period = price_chart_request(evaluation_dict)
+        return [cache.history_key(stock_ticker, period)]
+    if evaluation_dict.get('compare_price_chart'):
+        stock_tickers, period = compare_chart_request(evaluation_dict)
+        return [cache.history_key(ticker, period) for ticker in stock_tickers]
+    if evaluation_dict.get('fundamentals'):
+        return [cache.info_key(evaluation_dict['fundamentals'][0])]
+    radar_params = evaluation_dict.get('radar_chart')
+    if isinstance(radar_params, list) and len(radar_params) > 1:
+        return [cache.info_key(ticker) for ticker in radar_params[1:] if isinstance(ticker, str)]
+    return []
+
+
+class AdvisorySession:
+    def __init__(self, settings, state, output):
+        """
+        Args:
+            settings (EngineSettings): Models, API keys, memory and hedging configuration.
+            state (MutableMapping): The conversation's session state (`engine.session_store`).
+            output (TurnOutput): Where the turn's results are rendered.
+        """
+        self.settings = settings
+        self.state = state
+        self.output = output
+        self.memory_config = settings.memory_config
+
+        # Session-scoped pipeline metrics and per-turn span trees (kept in the session state)
+        self.metrics = PipelineMetrics(state['pipeline_metrics'])
+        self.tracer = Tracer(state['traces'])
+
+        self._build_agents()
+        self._build_pipeline()
+
+    # -------------------------------------------------------------------------
+    # Wiring
+    # -------------------------------------------------------------------------
+
+    def _build_agents(self):
+        models, metrics = self.settings.models, self.metrics
+        # Agents draw their models from the process-wide client registry, so this only loads
+        # models on the first run for a given model/key; later runs just look them up.
+        with metrics.timer('rerun.model_setup'):
+            self.agent_zero_api_key = self.settings.api_key_for_model(models['agent_zero'])
+            self.agent_zero = AgentZero(models['agent_zero'], self.agent_zero_api_key, metrics=metrics)
+            self.agent_one = AgentOne(
+                models['agent_one'], self.settings.api_key_for_model(models['agent_one']), metrics=metrics
+            )
+            self.agent_two = AgentTwo(
+                models['agent_two'], self.settings.api_key_for_model(models['agent_two']), metrics=metrics
+            )
+            # The summarizer runs on AgentZero's model
+            self.agent_summarizer = AgentSummarizer(models['agent_zero'], self.agent_zero_api_key, metrics=metrics)
+
+        # Hedge the opted-in agents' requests; the latency history behind the hedge delay is process-wide
+        hedging_config = self.settings.hedging_config
+        if hedging_config is None:
+            return
+        for hedgeable_agent in (self.agent_one, self.agent_zero):
+            if hedging_config.is_hedged(hedgeable_agent.agent_name):
+                hedgeable_agent.hedging = HedgePolicy(
+                    hedgeable_agent.agent_name,
+                    percentile=hedging_config.percentile,
+                    alternate_model=hedging_config.alternate_model,
+                    alternate_api_key=self.settings.api_key_for_model(hedging_config.alternate_model),
+                    min_samples=hedging_config.min_samples,
+                    min_delay=hedging_config.min_delay,
+                    metrics=metrics
+                )
+
+    def _build_pipeline(self):
+        self.conversation_manager = ConversationManager(
+            self.agent_zero,
+            self.agent_summarizer,
+            num_messages=self.memory_config.num_messages,
+            num_reports=self.memory_config.num_reports,
+            stream=self.settings.stream,
+            metrics=self.metrics,
+            state=self.state,
+            output=self.output
+        )
+        self.context_precomputer = ContextPrecomputer(
+            self.agent_summarizer,
+            self.memory_config,
+            store=self.state['precomputed_context'],
+            metrics=self.metrics
+        )
+        self.research_manager = ResearchManager(output=self.output)
+        # The research summary runs as a background job, so it survives reruns and is shared by sessions
+        self.job_queue = get_job_queue()
+        self.job_queue.register(RESEARCH_JOB, run_research_job)
+        self.risk_profile_manager = RiskProfileManager(output=self.output)
+        self.fundamentals_manager = FundamentalsManager(output=self.output)
+        self.price_chart_manager = PriceChartManager()
+        self.market_data_prefetcher = MarketDataPrefetcher(router=get_fast_path_router(), metrics=self.metrics)
+
+        # AgentOne behind the semantic classification cache (Milvus Lite)
+        self.intent_classifier = IntentClassifier(
+            self.agent_one,
+            cache=get_classification_cache(),
+            metrics=self.metrics,
+            router=get_fast_path_router()
+        )
+
+        # Register intents in matching order. AgentOne is consulted exactly once per turn;
+        # the first intent whose matcher accepts the parsed dictionary handles the turn.
+        dispatcher = IntentDispatcher(metrics=self.metrics)
+        dispatcher.register('investment_advice_Y', intent_value('investment_advice', 'Y'), self.handle_investment_advice)
+        dispatcher.register('investment_advice_R', intent_value('investment_advice', 'R'), self.handle_risk_profile_answer)
+        dispatcher.register('investment_advice_N', intent_value('investment_advice', 'N'), self.handle_general_conversation)
+        dispatcher.register('fundamentals', intent_key('fundamentals'), self.handle_fundamentals)
+        dispatcher.register('price_chart', intent_key('price_chart'), self.handle_price_chart)
+        dispatcher.register('compare_price_chart', intent_key('compare_price_chart'), self.handle_compare_price_chart)
+        dispatcher.register('radar_chart', intent_key('radar_chart'), self.handle_radar_chart)
+        dispatcher.register('pe_div_yield_table', intent_key('pe_div_yield_table'), self.handle_pe_div_yield_table)
+        # If none of the intents matched, continue normally
+        dispatcher.set_default(self.handle_general_conversation)
+        self.intent_dispatcher = dispatcher
+
+    # -------------------------------------------------------------------------
+    # Turns
+    # -------------------------------------------------------------------------
+
+    def run_turn(self, user_input):
+        """
+        Runs one turn: records the user message, processes it (traced as one turn) and starts precomputing the
+        next turn's summaries.
+
+        Returns:
+            dict: 'reply' (AgentZero's response, or None if the turn ended early), 'evaluation' (AgentOne's
+                  parsed dictionary), 'source' of the classification, 'intent' and 'tokens' (input, output and
+                  cached tokens of the model calls in the turn's trace).
+        """
+        turn = {'reply': None, 'evaluation': None, 'source': None, 'intent': None}
+        with self.tracer.turn(user_input[:60], model=self.settings.models['agent_zero']) as root:
+            # Reports of background jobs that finished since the last turn come first
+            self.collect_jobs()
+
+            # Add user message to conversation history
+            self.state['messages'].append({"role": "user", "content": user_input})
+            self.output.user_message(user_input)
+            self.state['conversation_history'].append({"role": "user", "content": user_input})
+
+            turn['reply'] = self.process_user_input(user_input, turn)
+        # Counted from the turn's own spans: background precomputation for other turns is not included
+        turn['tokens'] = {field: root.total(f'{field}_tokens') for field in ('input', 'output', 'cached')}
+
+        # Use the idle time until the next message to prepare the next turn's summaries
+        self.context_precomputer.start(
+            self.state['conversation_history'],
+            self.state.get('report_summaries', []),
+            rolling_state=self.state['rolling_summary']
+        )
+        return turn
+
+    def awaiting_answer(self):
+        """
+        True when the previous turn gave investment advice or took a risk-profile answer (AgentOne's last
+        classification) and AgentZero ended it with a question: the new input is then likely the answer. The
+        greeting and the questions of ordinary conversation turns do not count.
+        """
+        last_assistant_message = next(
+            (m['content'] for m in self.state['messages'].by_role('assistant', last=1)),
+            None
+        )
+        if not last_assistant_message or "?" not in last_assistant_message:
+            return False
+        last_evaluation = next(
+            (m['content'] for m in self.state['conversation_history'].by_role('agent_one', last=1)),
+            None
+        )
+        if last_evaluation is None:
+            return False
+        return self.intent_dispatcher.match(parse_agent_response(last_evaluation) or {})[0] in PROFILING_INTENTS
+
+    def process_user_input(self, user_input_text, turn=None):
+        turn = turn if turn is not None else {}
+        rolling_state = self.state['rolling_summary'] if self.memory_config.incremental_summaries else None
+
+        # Summaries prepared while the app was idle, if the history has not changed since
+        conversation_history = self.state['conversation_history']
+        precomputed = self.context_precomputer.take(
+            conversation_history.view(len(conversation_history) - 1),
+            self.state.get('report_summaries', []),
+            rolling_state=rolling_state
+        )
+
+        # Per-turn context: summaries are memoized so each one costs at most one LLM call
+        context = TurnContext(
+            self.agent_summarizer,
+            conversation_history,
+            self.state.get('report_summaries', []),
+            num_messages=self.memory_config.num_messages,
+            num_reports=self.memory_config.num_reports,
+            metrics=self.metrics,
+            rolling_state=rolling_state,
+            summary_token_threshold=self.memory_config.summary_token_threshold,
+            precomputed=precomputed
+        )
+
+        # Whether the user is answering a risk-profile question (decides whether the fast path and cache may be used)
+        awaiting_answer = self.awaiting_answer()
+
+        # ---------------------------
+        # Turn pipeline: independent steps run concurrently
+        # ---------------------------
+        # conversation_summary ──> classification ──> market_data
+        # reports_summary
+        # A fast-path classification needs no summary, so market data is fetched alongside the summaries.
+        # Otherwise the market data the input mentions is prefetched while AgentOne classifies.
+        pipeline = DagExecutor(metrics=self.metrics)
+        pipeline.add_node('conversation_summary', context.summarize_conversation)
+        pipeline.add_node('reports_summary', context.summarize_reports)
+
+        prefetched = None
+        fast_path_classification = self.intent_classifier.route(user_input_text, awaiting_answer)
+        if fast_path_classification is not None:
+            pipeline.add_node('classification', lambda: fast_path_classification)
+        else:
+            prefetched = self.market_data_prefetcher.start(user_input_text)
+            # AgentOne (or the classification cache) evaluates the user input with context, once per turn
+            pipeline.add_node(
+                'classification',
+                lambda conversation_summary: self.intent_classifier.classify(
+                    user_input_text,
+                    conversation_summary=conversation_summary,
+                    awaiting_answer=awaiting_answer,
+                    fast_path=False
+                ),
+                inputs=('conversation_summary',)
+            )
+
+        def classified_market_data(classification):
+            evaluation = classification[1] or {}
+            if prefetched is not None:
+                self.market_data_prefetcher.settle(prefetched, market_data_keys(evaluation))
+            # Reads through the market data cache, so confirmed prefetches (even in flight) are reused
+            return self.fetch_market_data(evaluation)
+
+        pipeline.add_node('market_data', classified_market_data, inputs=('classification',))
+
+        results = pipeline.run()
+        context.market_data = results['market_data']
+        self.state['critical_path'] = pipeline.describe_critical_path()
+
+        evaluation_response, evaluation_dict, source = results['classification']
+        turn.update(evaluation=evaluation_dict, source=source)
+        source_label = {'cache': ' (cached)', 'fast_path': ' (fast path)'}.get(source, '')
+        self.output.write(f"**Evaluation Report from Agent One{source_label}:**\n{evaluation_response}")
+
+        # Append AgentOne's evaluation to conversation history
+        conversation_history.append({"role": "agent_one", "content": evaluation_response})
+
+        # ---------------------------
+        # Check the parsed evaluation
+        # ---------------------------
+        if not evaluation_dict:
+            self.output.error("Failed to parse Agent One's evaluation into a dictionary. Please try again.")
+            return None
+
+        # ---------------------------
+        # Dispatch to the registered intent handler
+        # ---------------------------
+        turn['intent'] = self.intent_dispatcher.match(evaluation_dict)[0]
+        return self.intent_dispatcher.dispatch(evaluation_dict, user_input_text, evaluation_dict, context)
+
+    # -------------------------------------------------------------------------
+    # Intent Handlers
+    # -------------------------------------------------------------------------
+    # Each handler receives the raw user input, AgentOne's parsed evaluation dictionary
+    # and the turn's TurnContext (memoized conversation/reports summaries, report summaries).
+
+    def respond(self, user_input_text, context, **extra_context):
+        """Hands the turn over to AgentZero with the turn's summaries plus any extra context."""
+        return self.conversation_manager.conversation(
+            user_input_text,
+            turn_context=context,
+            conversation_summary=context.conversation_summary,
+            reports_summary=context.reports_summary,
+            **extra_context
+        )
+
+    def fetch_market_data(self, evaluation_dict):
+        """
+        Fetches the yfinance data a data intent will need, keyed the way the handlers look it up in
+        `context.market_data`. Runs as a pipeline node, so the fetch overlaps with the turn's summaries.
+        """
+        if evaluation_dict.get('price_chart'):
+            stock_ticker, period = price_chart_request(evaluation_dict)
+            return {
+                ('price_chart', stock_ticker, period): self.price_chart_manager.get_price_data(stock_ticker, period)
+            }
+
+        if evaluation_dict.get('compare_price_chart'):
+            stock_tickers, period = compare_chart_request(evaluation_dict)
+            if stock_tickers:
+                return {
+                    ('compare_price_chart', tuple(stock_tickers), period):
+                        self.price_chart_manager.get_comparative_price_data(stock_tickers, period)
+                }
+
+        if evaluation_dict.get('fundamentals'):
+            stock_ticker = evaluation_dict['fundamentals'][0]
+            fundamentals_type = evaluation_dict.get('fundamentals_type', None)
+            return {
+                ('fundamentals', stock_ticker, fundamentals_type):
+                    self.fundamentals_manager.generate_fundamentals_report(stock_ticker, fundamentals_type)
+            }
+
+        return {}
+
+    def handle_investment_advice(self, user_input_text, evaluation_dict, context):
+        # User is requesting investment advice: the research runs as a background job, which survives
+        # reruns and is shared with identical requests of other sessions
+        job_id = self.job_queue.submit(
+            RESEARCH_JOB, {'local_library_path': "data"}, max_age=RESEARCH_MAX_AGE, metrics=self.metrics
+        )
+        self.state['pending_jobs'] = self.state.get('pending_jobs', []) + [job_id]
+
+        with self.output.progress('Generating detailed report...') as bar:
+            job = self.job_queue.wait(
+                job_id,
+                timeout=self.settings.research_wait,
+                on_progress=lambda update: bar.update(update['progress'], update['message'] or None)
+            )
+            if job['status'] == DONE:
+                bar.update(1.0)
+
+        if job['status'] == DONE:
+            self._attach_research(job, context.report_summaries)
+            # Update the summarized reports
+            context.summarize_reports()
+        elif job['status'] == FAILED:
+            self._drop_job(job_id)
+            self.output.error(f"The research report failed: {job['error']}")
+        else:
+            self.output.write("The detailed report is still being prepared; it will be added to the conversation "
+                              "when it is ready.")
+        return self.respond(user_input_text, context)
+
+    def _drop_job(self, job_id):
+        self.state['pending_jobs'] = [pending for pending in self.state.get('pending_jobs', []) if pending != job_id]
+
+    def _attach_research(self, job, report_summaries=None):
+        """Summarizes a finished research job's report and adds it to the report summaries."""
+        self._drop_job(job['id'])
+        research_summary = job['result']
+        self.output.write(research_summary)
+        report_summary_text = self.research_manager.summarize_report(
+            research_summary,
+            self.settings.models['agent_zero'],
+            self.agent_zero_api_key,
+            metrics=self.metrics
+        )
+        # Appended in place, so the turn's context sees the new report
+        report_summaries = report_summaries if report_summaries is not None else self.state.get('report_summaries', [])
+        report_summaries.append(report_summary_text)
+        self.state['report_summaries'] = report_summaries
+        return report_summary_text
+
+    def collect_jobs(self):
+        """
+        Picks up the background jobs the conversation is waiting for: a finished research report is added to
+        the reports and announced in the chat; a failed job is reported.
+
+        Returns:
+            list: The jobs still queued or running (see `JobQueue.get`).
+        """
+        still_pending = []
+        for job_id in list(self.state.get('pending_jobs', [])):
+            job = self.job_queue.get(job_id)
+            if job is None or job['status'] == FAILED:
+                self._drop_job(job_id)
+                self.output.warning(f"The research report failed: {job['error'] if job else 'unknown job'}")
+            elif job['status'] == DONE:
+                report_summary_text = self._attach_research(job)
+                announcement = f"Your detailed research report is ready:\n\n{report_summary_text}"
+                with self.output.assistant_message() as message:
+                    message.update(announcement)
+                self.state['messages'].append({"role": "assistant", "content": announcement})
+                self.state['conversation_history'].append({"role": "assistant", "content": announcement})
+            else:
+                still_pending.append(job)
+        return still_pending
+
+    def full_risk_profile(self):
+        """Profiles the user from the conversation (its latest user and assistant messages) with AgentTwo."""
+        self.metrics.increment('risk_profile.full')
+        history = self.state['conversation_history']
+        # AgentTwo only reads the user's and the assistant's messages: fetch just those, most recent first
+        raw_risk_profile_report = self.risk_profile_manager.generate_risk_profile(
+            history.by_role(('user', 'assistant'), last=self.memory_config.risk_profile_messages),
+            self.agent_two
+        )
+
+        # Store the raw JSON string for display/downloading
+        self.state['risk_profile_report'] = raw_risk_profile_report
+
+        # Parse the JSON into a dict for internal usage
+        parsed_profile = self.risk_profile_manager.parse_risk_profile_report(raw_risk_profile_report)
+        self.state['risk_profile_data'] = parsed_profile  # e.g. {'risk_ability': 'medium', 'age': '45'}
+        self.state['risk_profile_mark'] = len(history)
+
+        self.output.write("**Risk Profile Report from Agent Two (Raw JSON):**")
+        self.output.json(raw_risk_profile_report)
+
+        self.output.write("**Parsed Risk Profile Data (Dictionary):**")
+        self.output.write(parsed_profile)
+        return raw_risk_profile_report
+
+    def incremental_risk_profile(self):
+        """Merges AgentTwo's delta for the messages since the last profile update into the profile slots."""
+        self.metrics.increment('risk_profile.incremental')
+        history = self.state['conversation_history']
+        limit = self.memory_config.risk_profile_messages
+        new_messages = [
+            message for message in history[self.state['risk_profile_mark']:]
+            if message['role'] in ('user', 'assistant')
+        ]
+        new_messages = new_messages[-limit:] if limit > 0 else []
+        raw_delta, merged_profile = self.risk_profile_manager.update_risk_profile(
+            self.state['risk_profile_data'], new_messages, self.agent_two
+        )
+
+        # The stored report stays a complete profile (for AgentZero and the download)
+        raw_risk_profile_report = json.dumps(merged_profile, indent=4)
+        self.state['risk_profile_report'] = raw_risk_profile_report
+        self.state['risk_profile_data'] = merged_profile
+        self.state['risk_profile_mark'] = len(history)
+
+        self.output.write("**Risk Profile Update from Agent Two (Raw JSON):**")
+        self.output.json(raw_delta)
+
+        self.output.write("**Updated Risk Profile Data (Dictionary):**")
+        self.output.write(merged_profile)
+        return raw_risk_profile_report
+
+    def reprofile(self):
+        """Explicit full re-profile from the conversation; the new report is added to the history and reports."""
+        raw_risk_profile_report = self.full_risk_profile()
+        self.state['conversation_history'].append({"role": "agent_two", "content": raw_risk_profile_report})
+        self.state['report_summaries'] = self.state.get('report_summaries', []) + [raw_risk_profile_report]
+        return raw_risk_profile_report
+
+    def handle_risk_profile_answer(self, user_input_text, evaluation_dict, context):
+        # User answered a risk profile question -> call AgentTwo
+        report_summaries = context.report_summaries
+        if self.memory_config.incremental_risk_profile and self.state['risk_profile_data']:
+            raw_risk_profile_report = self.incremental_risk_profile()
+        else:
+            raw_risk_profile_report = self.full_risk_profile()
+
+        # Append the raw report to conversation history
+        self.state['conversation_history'].append({"role": "agent_two", "content": raw_risk_profile_report})
+
+        report_summaries.append(raw_risk_profile_report)
+        self.state['report_summaries'] = report_summaries
+
+        # Summarize updated reports
+        context.summarize_reports()
+
+        # Pass the raw text to AgentZero if you want
+        return self.respond(user_input_text, context, risk_profile_report=raw_risk_profile_report)
+
+    def handle_general_conversation(self, user_input_text, evaluation_dict, context):
+        return self.respond(user_input_text, context)
+
+    def handle_fundamentals(self, user_input_text, evaluation_dict, context):
+        report_summaries = context.report_summaries
+        stock_tickers = evaluation_dict['fundamentals']
+        if not stock_tickers:
+            self.output.warning("No stock ticker provided in 'fundamentals'.")
+            return None
+
+        stock_ticker = stock_tickers[0]
+        fundamentals_type = evaluation_dict.get('fundamentals_type', None)
+
+        # Generate fundamentals report (unless it was fetched while the turn's summaries were produced;
+        # a fetch that failed there has already reported its error)
+        key = ('fundamentals', stock_ticker, fundamentals_type)
+        if key in context.market_data:
+            fundamentals_report = context.market_data[key]
+        else:
+            fundamentals_report = self.fundamentals_manager.generate_fundamentals_report(stock_ticker, fundamentals_type)
+        self.state['fundamentals_report'] = fundamentals_report
+        if fundamentals_report is None:
+            # The fetch failed and the error has been rendered; answer without a report
+            return self.respond(user_input_text, context)
+
+        self.output.write(f"**Fundamentals Report for {stock_ticker}:**\n{fundamentals_report}")
+        self.state['conversation_history'].append(
+            {"role": "fundamentals_report", "content": fundamentals_report}
+        )
+
+        report_summaries.append(fundamentals_report)
+        self.state['report_summaries'] = report_summaries
+
+        # Update summarized reports
+        context.summarize_reports()
+        return self.respond(user_input_text, context, fundamentals_report=fundamentals_report)
+
+    def handle_price_chart(self, user_input_text, evaluation_dict, context):
+        stock_tickers = evaluation_dict['price_chart']
+        if not stock_tickers:
+            self.output.warning("No stock ticker provided in 'price_chart'.")
+            return None
+
+        stock_ticker, period = price_chart_request(evaluation_dict)
+
+        price_result = context.market_data.get(('price_chart', stock_ticker, period))
+        if price_result is None:
+            with self.output.spinner(f'Fetching price data for {stock_ticker} over {period}...'):
+                price_result = self.price_chart_manager.get_price_data(stock_ticker, period)
+        price_data, latest_price, error_message = price_result
+        if error_message:
+            self.output.error(error_message)
+            return self.respond(user_input_text, context)
+
+        self.state['price_chart_data'] = price_data
+        self.output.write(f"**Price Chart for {stock_ticker} over {period}: Latest Price - ${latest_price:.2f}**")
+        with trace_span('render.price_chart', 'render'):
+            self.output.line_chart(price_data['Close'])
+
+        price_chart_note = f"{stock_ticker} over {period}, Latest Price: ${latest_price:.2f}"
+        return self.respond(user_input_text, context, price_chart_note=price_chart_note)
+
+    def handle_compare_price_chart(self, user_input_text, evaluation_dict, context):
+        chart_params = evaluation_dict['compare_price_chart']
+        if not chart_params:
+            self.output.warning("No tickers provided in 'compare_price_chart'.")
+            return None
+
+        stock_tickers, period = compare_chart_request(evaluation_dict)
+
+        if not stock_tickers:
+            self.output.warning("No stock tickers provided for comparison.")
+            return None
+
+        compare_result = context.market_data.get(('compare_price_chart', tuple(stock_tickers), period))
+        if compare_result is None:
+            with self.output.spinner(f'Fetching comparative price data for {", ".join(stock_tickers)} over {period}...'):
+                compare_result = self.price_chart_manager.get_comparative_price_data(stock_tickers, period)
+        compare_data, error_message = compare_result
+        if error_message:
+            self.output.error(error_message)
+            return self.respond(user_input_text, context)
+
+        self.output.write(f"**Comparative Price Chart for {', '.join(stock_tickers)} over {period}:**")
+        with trace_span('render.compare_price_chart', 'render'):
+            self.output.line_chart(compare_data)
+
+        price_chart_note = f"Comparison of {', '.join(stock_tickers)} over {period}"
+        return self.respond(user_input_text, context, price_chart_note=price_chart_note)
+
+    def handle_radar_chart(self, user_input_text, evaluation_dict, context):
+        chart_params = evaluation_dict['radar_chart']
+        if len(chart_params) < 2:
+            self.output.warning("You must provide at least one list of metrics and at least one ticker.")
+            return self.respond(user_input_text, context)
+
+        metrics = chart_params[0]
+        if not isinstance(metrics, list) or len(metrics) == 0:
+            self.output.warning("The first element must be a non-empty list of metrics.")
+            return self.respond(user_input_text, context)
+
+        stock_tickers = chart_params[1:]
+        if len(stock_tickers) == 0:
+            self.output.warning("Please provide at least one stock ticker.")
+            return self.respond(user_input_text, context)
+
+        from utils.radar_chart_manager import RadarChartManager
+        radar_manager = RadarChartManager()
+
+        # Fetch data for radar metrics
+        with self.output.spinner(
+            f"Fetching data for {', '.join(stock_tickers)} on metrics: {', '.join(metrics)}..."
+        ):
+            radar_data, warning_message = radar_manager.get_metric_data(stock_tickers, metrics)
+            if not radar_data:
+                self.output.error(f"Unable to retrieve data for {', '.join(stock_tickers)}.")
+                return self.respond(user_input_text, context)
+            if warning_message:
+                self.output.warning(warning_message)
+
+        # Create the radar chart
+        radar_fig = radar_manager.create_radar_chart(radar_data, metrics)
+        self.output.write(
+            f"**Radar Chart for metrics {', '.join(metrics)} across {', '.join(radar_data.keys())}:**"
+        )
+        with trace_span('render.radar_chart', 'render'):
+            self.output.plotly_chart(radar_fig)
+
+        radar_chart_note = (
+            f"Radar chart for metrics {', '.join(metrics)} "
+            f"on {', '.join(radar_data.keys())}"
+        )
+        return self.respond(user_input_text, context, radar_chart_note=radar_chart_note)
+
+    def handle_pe_div_yield_table(self, user_input_text, evaluation_dict, context):
+        table_params = evaluation_dict['pe_div_yield_table']
+        fields = table_params.get('fields', ['pe_ratio', 'dividen_yield'])
+        theme = table_params.get('theme', '')
+        sort_by = table_params.get('sort_by', 'market_cap_usd')
+        order = table_params.get('order', 'desc')
+        limit = table_params.get('limit', None)  # optional limit
+
+        table_path = os.path.join(os.getcwd(), 'data/pe_div_yield_table.csv')
+        if os.path.exists(table_path):
+            with trace_span('pd.read_csv', 'data', path='data/pe_div_yield_table.csv') as span:
+                df = pd.read_csv(table_path)
+                if span is not None:
+                    span.attributes['rows'] = len(df)
+
+            if theme:
+                # Map theme if it's an abbreviation
+                mapped_theme = map_theme(theme)
+                df = df[df['theme'].str.lower().str.contains(mapped_theme.lower())]
+                if df.empty:
+                    self.output.warning(f"No results found for theme '{theme}'. Please try a different theme.")
+                    return self.respond(user_input_text, context)
+
+            # Desired column order
+            desired_order = ['name', 'ticker', 'market_cap_usd', 'pe_ratio', 'dividen_yield',
+                             'description', 'theme']
+
+            # Ensure all requested fields are included (without duplication)
+            for f in fields:
+                if f not in desired_order:
+                    desired_order.append(f)
+
+            # Filter df to only include columns that exist
+            available_columns = [c for c in desired_order if c in df.columns]
+            df = df[available_columns]
+
+            # Sort if possible
+            if sort_by in df.columns:
+                ascending = (order == 'asc')
+                df = df.sort_values(by=sort_by, ascending=ascending)
+
+            # Apply limit if specified
+            if isinstance(limit, int) and limit > 0:
+                df = df.head(limit)
+
+            # Formatting for better readability
+            format_dict = {
+                'market_cap_usd': '${:,.2f}',
+                'dividen_yield': '{:.2%}'
+            }
+
+            self.output.write("**Results from pe_div_yield_table:**")
+            with trace_span('render.pe_div_yield_table', 'render', rows=len(df)):
+                self.output.dataframe(df, formats=format_dict)
+        else:
+            self.output.error("pe_div_yield_table.csv not found.")
+
+        return self.respond(user_input_text, context)
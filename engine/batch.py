@@ -0,0 +1,220 @@
+# engine/batch.py
+
+"""
+📦 Batch Runner - Query Files Through the Advisory Engine
+---------------------------------------------------------
+Technical Overview:
+Runs a file of (session_id, message) rows through the same pipeline as the app and the API server:
+AgentOne classifies, the intent handler runs and AgentZero answers (`AdvisoryEngine.run_turn`).
+- Input: JSONL (one object per line) or CSV (with a header row). `--template` builds the message from a row's
+  fields instead, e.g. `--template "Tell me about {ticker}"` over `data/equity_list_sample.csv`.
+- Sessions: rows that share a session ID are one conversation and run in file order. A row without a session ID
+  gets a new session of its own, and a session ID already in the conversation log continues that conversation.
+  Up to `--concurrency` conversations run at a time, each held in memory until its rows are done.
+- Output: one result per input row, in input order: intent, classification source, reply, duration and token
+  counts (plus the rendered events with `--events`). The output is JSONL, or CSV if the path ends in `.csv`.
+  A failed row records its error and the batch continues; so do the rows of a conversation whose session
+  could not be created.
+- At the end the throughput is printed: rows per second, p50/p95 turn latency and total tokens.
+
+Conversations are written to the conversation log as usual (`--log` points them elsewhere), so a batch
+session can be opened in the app with `?session=<ID>`. With `AVA_LLM_BACKEND=mock` and `--model mock-llm` the
+batch runs offline.
+
+Usage (from the repository root):
+    python -m engine.batch questions.jsonl --output results.jsonl --concurrency 8 --model gpt-4o
+    AVA_LLM_BACKEND=mock python -m engine.batch data/equity_list_sample.csv --template "Tell me about {ticker}" \\
+        --model mock-llm --output fundamentals.csv
+
+In Simple Terms:
+Instead of typing hundreds of questions into the chat, put them in a file and let AVA answer them all, several
+at a time. The answers, how long each took and how many tokens it used end up in another file.
+
+Functions:
+- read_rows: Reads the input rows.
+- run_batch: Runs rows through an AdvisoryEngine; returns the results in input order.
+- summarize: Throughput and latency of a batch.
+- write_results: Writes the results as JSONL or CSV.
+- main: Command-line entry point.
+"""
+
+import argparse
+import csv
+import json
+import os
+import statistics
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from configs.config import Config
+from engine.advisory_engine import TOKEN_FIELDS, AdvisoryEngine, EngineSettings
+from engine.session_store import InMemorySessionStore
+from utils.conversation_store import ConversationLog
+
+RESULT_COLUMNS = ('row', 'session_id', 'message', 'intent', 'source', 'reply', 'elapsed_ms',
+                  'input_tokens', 'output_tokens', 'cached_tokens', 'error')
+
+
+def read_rows(path, template=None):
+    """
+    Reads (session_id, message) rows from a JSONL or CSV file. With `template`, the message is formatted from the
+    row's fields. Returns a list of {'row', 'session_id', 'message'}; rows without a message are skipped.
+    """
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            records = list(csv.DictReader(f))
+    else:
+        with open(path, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f if line.strip()]
+
+    rows = []
+    for index, record in enumerate(records):
+        message = template.format(**record) if template else record.get('message')
+        if not message or not str(message).strip():
+            continue
+        rows.append({'row': index, 'session_id': record.get('session_id') or None, 'message': str(message).strip()})
+    return rows
+
+
+def _run_conversation(engine, session_id, rows, include_events):
+    """Runs one conversation's rows in order; returns their results."""
+    try:
+        session_id = engine.create_session(session_id)
+    except Exception as e:
+        # Without a session none of its rows can run; the other conversations carry on
+        error = f"{type(e).__name__}: {e}"
+        return [{'row': row['row'], 'session_id': session_id, 'message': row['message'], 'error': error}
+                for row in rows]
+    results = []
+    # Pinned, so the conversation stays in memory between its rows instead of being resumed from the log
+    with engine.session_store.pin(session_id):
+        for row in rows:
+            result = {'row': row['row'], 'session_id': session_id, 'message': row['message']}
+            try:
+                turn = engine.run_turn(session_id, row['message'])
+                result.update(
+                    intent=turn['intent'],
+                    source=turn['source'],
+                    reply=turn['reply'],
+                    elapsed_ms=turn['elapsed_ms'],
+                    **{f'{field}_tokens': turn['tokens'][field] for field in TOKEN_FIELDS}
+                )
+                if include_events:
+                    result['events'] = turn['events']
+            except Exception as e:
+                result['error'] = f"{type(e).__name__}: {e}"
+            results.append(result)
+    return results
+
+
+def run_batch(engine, rows, concurrency=4, include_events=False, progress=None):
+    """
+    Runs `rows` (see `read_rows`) through `engine`, up to `concurrency` conversations at a time.
+
+    Args:
+        progress (callable): Called with (done, total) after each conversation.
+
+    Returns:
+        list: One result dictionary per row, in input order.
+    """
+    conversations = OrderedDict()
+    for row in rows:
+        # Rows without a session ID are conversations of their own
+        key = row['session_id'] if row['session_id'] else ('row', row['row'])
+        conversations.setdefault(key, []).append(row)
+
+    results, done = [], 0
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1), thread_name_prefix='ava-batch') as executor:
+        futures = [
+            executor.submit(_run_conversation, engine, key if isinstance(key, str) else None, grouped, include_events)
+            for key, grouped in conversations.items()
+        ]
+        for future in as_completed(futures):
+            results.extend(future.result())
+            done += 1
+            if progress is not None:
+                progress(done, len(futures))
+    return sorted(results, key=lambda result: result['row'])
+
+
+def summarize(results, wall_seconds):
+    """Returns rows, failures, wall time, rows per second, p50/p95 latency and token totals of a batch."""
+    latencies = sorted(result['elapsed_ms'] for result in results if result.get('elapsed_ms') is not None)
+    summary = {
+        'rows': len(results),
+        'failed': sum(1 for result in results if result.get('error')),
+        'wall_s': round(wall_seconds, 2),
+        'rows_per_s': round(len(results) / wall_seconds, 2) if wall_seconds > 0 else None,
+        'p50_ms': round(statistics.median(latencies), 1) if latencies else None,
+        'p95_ms': round(latencies[min(int(0.95 * len(latencies)), len(latencies) - 1)], 1) if latencies else None,
+    }
+    for field in TOKEN_FIELDS:
+        summary[f'{field}_tokens'] = sum(result.get(f'{field}_tokens') or 0 for result in results)
+    return summary
+
+
+def write_results(path, results):
+    if path.endswith('.csv'):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            for result in results:
+                f.write(json.dumps(result, default=str) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a file of (session_id, message) rows through AVA.")
+    parser.add_argument('input', help="JSONL or CSV file with 'session_id' (optional) and 'message' fields.")
+    parser.add_argument('--output', default='batch_results.jsonl', help="Results file (.jsonl or .csv).")
+    parser.add_argument('--template', help="Build each message from the row's fields, e.g. 'Tell me about {ticker}'.")
+    parser.add_argument('--concurrency', type=int, default=4, help="Conversations run at a time.")
+    parser.add_argument('--model', default='gpt-4o', help="Model for all agents (unless overridden below).")
+    parser.add_argument('--agent-zero-model', help="Model for AgentZero and the summarizer.")
+    parser.add_argument('--agent-one-model', help="Model for AgentOne.")
+    parser.add_argument('--agent-two-model', help="Model for AgentTwo.")
+    parser.add_argument('--events', action='store_true', help="Include the rendered events (JSONL output only).")
+    parser.add_argument('--log', help="Conversation log to write the batch's sessions to (default: the app's).")
+    args = parser.parse_args()
+
+    rows = read_rows(args.input, args.template)
+    models = {
+        'agent_zero': args.agent_zero_model or args.model,
+        'agent_one': args.agent_one_model or args.model,
+        'agent_two': args.agent_two_model or args.model,
+    }
+    api_keys = {'openai': os.environ.get('OPENAI_API_KEY'), 'anthropic': os.environ.get('ANTHROPIC_API_KEY')}
+    Config().setup()
+    # Running conversations are pinned until their rows are done; finished ones make room for the next
+    session_store = InMemorySessionStore(
+        max_sessions=max(args.concurrency, 1) * 2,
+        log=ConversationLog(args.log) if args.log else None
+    )
+    # No streaming: nobody watches the replies arrive
+    engine = AdvisoryEngine(EngineSettings(models, api_keys, stream=False), session_store=session_store)
+
+    print(f"Running {len(rows)} rows from {args.input} ({args.concurrency} at a time)")
+    start = time.perf_counter()
+    try:
+        results = run_batch(
+            engine, rows, args.concurrency, include_events=args.events,
+            progress=lambda done, total: print(f"\r{done}/{total} conversations", end='', flush=True)
+        )
+    finally:
+        engine.shutdown()
+    wall_seconds = time.perf_counter() - start
+    print()
+
+    write_results(args.output, results)
+    summary = summarize(results, wall_seconds)
+    print(f"Wrote {summary['rows']} results to {args.output} ({summary['failed']} failed)")
+    print(f"Throughput: {summary['rows_per_s']} rows/s over {summary['wall_s']}s; "
+          f"turn latency p50 {summary['p50_ms']} ms, p95 {summary['p95_ms']} ms")
+    print(f"Tokens: {summary['input_tokens']} in, {summary['output_tokens']} out, {summary['cached_tokens']} cached")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+# engine/output.py
+
+"""
+🖨️ TurnOutput Classes - Where a Turn's Results Go
+--------------------------------------------------
+Technical Overview:
+Intent handlers and the ConversationManager used to call Streamlit directly (`st.write`, `st.line_chart`,
+`st.chat_message`...), so a turn could only run inside the Streamlit script. They now write to a TurnOutput:
+a small set of rendering calls (text, JSON, warnings and errors, charts, tables, a spinner or a progress bar
+around slow work, and the user's and the assistant's chat messages, the latter updated while AgentZero
+streams).
+
+TurnOutput itself discards everything, so the pipeline runs headless. RecordingOutput turns every call into
+a JSON-serialisable event (charts and tables are converted to records), which is what the API server returns.
+The Streamlit client renders the same calls with `st.*` (`ui.streamlit_output.StreamlitOutput`).
+
+In Simple Terms:
+The pipeline no longer draws on the screen itself. It hands its results to an "output", which can be the
+Streamlit page, a list of results to send back over HTTP, or nothing at all.
+
+Classes:
+- TurnOutput: The rendering interface (no-op implementation).
+- RecordingOutput: Records a turn's output as JSON-serialisable events.
+"""
+
+import json
+from contextlib import contextmanager
+
+
+class AssistantMessage:
+    """Handle to the assistant's chat message of a turn, updated while the response streams."""
+
+    def __init__(self):
+        self.text = ""
+        self.captions = []
+
+    def update(self, text):
+        self.text = text
+
+    def caption(self, text):
+        self.captions.append(text)
+
+
+class ProgressBar:
+    """Handle to a progress bar shown while slow work (e.g. a background job) runs."""
+
+    def __init__(self, text=""):
+        self.fraction = 0.0
+        self.text = text
+
+    def update(self, fraction, text=None):
+        self.fraction = fraction
+        if text:
+            self.text = text
+
+
+class TurnOutput:
+    def user_message(self, text):
+        pass
+
+    @contextmanager
+    def assistant_message(self):
+        yield AssistantMessage()
+
+    @contextmanager
+    def spinner(self, text):
+        yield
+
+    @contextmanager
+    def progress(self, text):
+        yield ProgressBar(text)
+
+    def write(self, value):
+        pass
+
+    def json(self, value):
+        pass
+
+    def warning(self, text):
+        pass
+
+    def error(self, text):
+        pass
+
+    def line_chart(self, data):
+        pass
+
+    def plotly_chart(self, figure):
+        pass
+
+    def dataframe(self, data, formats=None):
+        pass
+
+
+def _jsonable(value):
+    """Converts pandas objects, plotly figures and other values to JSON-serialisable data."""
+    if hasattr(value, 'to_plotly_json'):
+        return json.loads(value.to_json())
+    if hasattr(value, 'to_json'):
+        return json.loads(value.to_json(date_format='iso'))
+    return json.loads(json.dumps(value, default=str))
+
+
+class RecordingOutput(TurnOutput):
+    def __init__(self):
+        self.events = []
+        self.assistant_response = None
+
+    def _record(self, kind, **fields):
+        self.events.append(dict(type=kind, **fields))
+
+    def user_message(self, text):
+        self._record('user_message', text=text)
+
+    @contextmanager
+    def assistant_message(self):
+        message = AssistantMessage()
+        try:
+            yield message
+        finally:
+            self.assistant_response = message.text
+            self._record('assistant_message', text=message.text, captions=message.captions)
+
+    @contextmanager
+    def spinner(self, text):
+        self._record('status', text=text)
+        yield
+
+    @contextmanager
+    def progress(self, text):
+        bar = ProgressBar(text)
+        try:
+            yield bar
+        finally:
+            # Only where the work got to is recorded, not every update
+            self._record('progress', fraction=bar.fraction, text=bar.text)
+
+    def write(self, value):
+        if isinstance(value, str):
+            self._record('text', text=value)
+        else:
+            self._record('data', data=_jsonable(value))
+
+    def json(self, value):
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                # Model output that is not valid JSON is passed on as it is
+                return self._record('json', data=None, raw=value)
+        self._record('json', data=_jsonable(value))
+
+    def warning(self, text):
+        self._record('warning', text=text)
+
+    def error(self, text):
+        self._record('error', text=text)
+
+    def line_chart(self, data):
+        self._record('line_chart', data=_jsonable(data))
+
+    def plotly_chart(self, figure):
+        self._record('plotly_chart', figure=_jsonable(figure))
+
+    def dataframe(self, data, formats=None):
+        records = json.loads(data.to_json(orient='records')) if hasattr(data, 'to_json') else _jsonable(data)
+        self._record('table', rows=records, formats=formats or {})
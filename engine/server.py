@@ -0,0 +1,262 @@
+# engine/server.py
+
+"""
+🌐 API Server - Headless asyncio HTTP Front End of the AdvisoryEngine
+---------------------------------------------------------------------
+Technical Overview:
+A small HTTP/1.1 JSON API on `asyncio.start_server`, using only the standard library. One event loop
+accepts and parses requests, and the turns run on the engine's bounded worker pool (`AdvisoryEngine.arun_turn`).
+So a slow model call never blocks other connections, and many conversations are served concurrently by one
+process. When the engine already has `max_pending` turns, the server answers 503 with a Retry-After header
+instead of queueing more. Connections are kept alive unless the client asks to close them.
+
+Endpoints:
+- GET  /health: Liveness check.
+- POST /sessions: Starts a conversation; returns its `session_id` (and the greeting).
+- GET  /sessions/<id>?limit=N: The last N chat messages of a conversation (resumed from the log if needed).
+- POST /sessions/<id>/messages  {"message": "..."}: Runs one turn and returns the reply, AgentOne's
+  classification, the events the turn rendered (text, tables, chart data), its duration and token counts.
+- GET  /jobs/<id>: Status, progress and result of a background job (e.g. a research report that was still
+  running when its turn answered; the session adds its report on the next turn).
+- GET  /stats: Engine counters (turns, failures, rejections, pending turns, sessions in memory) and job counts.
+
+Models and API keys are read from the command line and the environment (OPENAI_API_KEY, ANTHROPIC_API_KEY).
+With `AVA_LLM_BACKEND=mock` the `mock-llm` backend serves every agent offline.
+
+Usage (from the repository root):
+    python -m engine.server --port 8080 --model gpt-4o
+    AVA_LLM_BACKEND=mock python -m engine.server --model mock-llm --workers 16
+    curl -X POST localhost:8080/sessions
+    curl -X POST localhost:8080/sessions/<id>/messages -d '{"message": "Show me the price chart of AAPL over 1y"}'
+
+In Simple Terms:
+This lets other apps talk to AVA over the network: start a conversation, send messages, get answers back
+as JSON. Streamlit is just one of the possible front ends.
+
+Functions:
+- serve: Runs the server until cancelled.
+- main: Command-line entry point.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+from urllib.parse import parse_qs, urlsplit
+
+from configs.config import Config
+from engine.advisory_engine import AdvisoryEngine, EngineBusy, EngineSettings
+from engine.session_store import InMemorySessionStore
+from utils.job_queue import get_job_queue
+
+MAX_BODY_BYTES = 1024 * 1024
+REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+_SESSION_ID = re.compile(r'[\w-]+')
+_SESSION_PATH = re.compile(r'^/sessions/([\w-]+)(/messages)?$')
+_JOB_PATH = re.compile(r'^/jobs/([\w-]+)$')
+
+
+class _HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+async def _read_request(reader):
+    """Returns (method, path, query, headers, body), or None when the client closed the connection."""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode('latin-1').split()
+    except ValueError:
+        raise _HttpError(400, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise _HttpError(400, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise _HttpError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b''
+    url = urlsplit(target)
+    return method.upper(), url.path.rstrip('/') or '/', parse_qs(url.query), headers, body
+
+
+def _json_body(body):
+    try:
+        payload = json.loads(body or b'{}')
+    except ValueError:
+        raise _HttpError(400, "Body must be JSON")
+    if not isinstance(payload, dict):
+        raise _HttpError(400, "Body must be a JSON object")
+    return payload
+
+
+def _int_param(query, name, default):
+    try:
+        return int((query.get(name) or [default])[0])
+    except ValueError:
+        raise _HttpError(400, f"'{name}' must be an integer")
+
+
+async def _route(engine, method, path, query, body):
+    """Returns (status, payload) for a request."""
+    if path == '/health':
+        return 200, {'status': 'ok'}
+
+    if path == '/stats':
+        return 200, engine.stats()
+
+    if path == '/sessions':
+        if method != 'POST':
+            raise _HttpError(405, "Use POST to start a session")
+        requested_id = _json_body(body).get('session_id')
+        # The ID must be addressable by the /sessions/<id> routes
+        if requested_id is not None and not (isinstance(requested_id, str) and _SESSION_ID.fullmatch(requested_id)):
+            raise _HttpError(400, "'session_id' must be a string of letters, digits, '_' or '-'")
+        # Creating or resuming a session reads and writes the conversation log: keep it off the event loop
+        loop = asyncio.get_running_loop()
+        session_id = await loop.run_in_executor(None, engine.create_session, requested_id)
+        state = await loop.run_in_executor(None, engine.session_store.get, session_id)
+        return 201, {'session_id': session_id, 'messages': state['messages'].tail(1)}
+
+    match = _JOB_PATH.match(path)
+    if match is not None:
+        if method != 'GET':
+            raise _HttpError(405, "Use GET to read a job")
+        job = get_job_queue().get(match.group(1))
+        if job is None:
+            raise _HttpError(404, f"Unknown job {match.group(1)}")
+        return 200, job
+
+    match = _SESSION_PATH.match(path)
+    if match is None:
+        raise _HttpError(404, f"No route for {path}")
+    session_id, turn = match.groups()
+
+    if turn:
+        if method != 'POST':
+            raise _HttpError(405, "Use POST to send a message")
+        message = _json_body(body).get('message')
+        if not isinstance(message, str) or not message.strip():
+            raise _HttpError(400, "'message' must be a non-empty string")
+        result = await engine.arun_turn(session_id, message.strip())
+        if result is None:
+            raise _HttpError(404, f"Unknown session {session_id}")
+        return 200, result
+
+    if method != 'GET':
+        raise _HttpError(405, "Use GET to read a session")
+    state = await asyncio.get_running_loop().run_in_executor(None, engine.session_store.get, session_id)
+    if state is None:
+        raise _HttpError(404, f"Unknown session {session_id}")
+    limit = _int_param(query, 'limit', 50)
+    if limit < 0:
+        raise _HttpError(400, "'limit' must not be negative")
+    return 200, {'session_id': session_id, 'length': len(state['messages']), 'messages': state['messages'].tail(limit)}
+
+
+def _response(status, payload, keep_alive, extra_headers=()):
+    body = json.dumps(payload, default=str).encode('utf-8')
+    headers = [
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        *extra_headers,
+    ]
+    return ("\r\n".join(headers) + "\r\n\r\n").encode('latin-1') + body
+
+
+async def _handle_connection(engine, reader, writer):
+    try:
+        while True:
+            extra_headers = ()
+            try:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, query, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                try:
+                    status, payload = await _route(engine, method, path, query, body)
+                except EngineBusy as e:
+                    status, payload, extra_headers = 503, {'error': str(e)}, ("Retry-After: 1",)
+                except _HttpError:
+                    raise
+                except Exception as e:
+                    status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+            except _HttpError as e:
+                status, payload, keep_alive = e.status, {'error': str(e)}, False
+            except (asyncio.IncompleteReadError, ValueError):
+                break
+
+            writer.write(_response(status, payload, keep_alive, extra_headers))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(engine, host='127.0.0.1', port=8080):
+    """Serves `engine` over HTTP until cancelled."""
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_connection(engine, reader, writer), host, port
+    )
+    addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"AVA API listening on {addresses}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless AVA API server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--model', default='gpt-4o', help="Model for all agents (unless overridden below).")
+    parser.add_argument('--agent-zero-model', help="Model for AgentZero and the summarizer.")
+    parser.add_argument('--agent-one-model', help="Model for AgentOne.")
+    parser.add_argument('--agent-two-model', help="Model for AgentTwo.")
+    parser.add_argument('--workers', type=int, default=8, help="Turns run concurrently.")
+    parser.add_argument('--max-pending', type=int, default=64, help="Turns running or queued before 503.")
+    parser.add_argument('--max-sessions', type=int, default=1000, help="Conversations kept in memory.")
+    args = parser.parse_args()
+
+    models = {
+        'agent_zero': args.agent_zero_model or args.model,
+        'agent_one': args.agent_one_model or args.model,
+        'agent_two': args.agent_two_model or args.model,
+    }
+    Config().setup()
+    api_keys = {'openai': os.environ.get('OPENAI_API_KEY'), 'anthropic': os.environ.get('ANTHROPIC_API_KEY')}
+    engine = AdvisoryEngine(
+        EngineSettings(models, api_keys),
+        session_store=InMemorySessionStore(max_sessions=args.max_sessions),
+        turn_workers=args.workers,
+        max_pending=args.max_pending
+    )
+    try:
+        asyncio.run(serve(engine, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+# engine/session_store.py
+
+"""
+🗂️ SessionStore Classes - Conversation State Behind an Interface
+-----------------------------------------------------------------
+Technical Overview:
+Everything the advisory pipeline keeps between turns of one conversation lives in a session state mapping:
+- the two ConversationStores ('messages' for what the user sees, 'conversation_history' for what the agents
+  read);
+- report summaries, the risk profile (raw report, parsed slots and the history length at its last update);
+- the running summary, the precomputed next-turn context, pending background jobs, pipeline metrics and traces.
+The engine only reads and writes these keys, so any MutableMapping can hold them. In the Streamlit app it is
+`st.session_state`; in the API server it is a plain dictionary, held by a SessionStore.
+
+`new_session_state` builds the state of a new conversation (with the greeting). `resume_session_state`
+rebuilds a logged conversation from the conversation log: only the last window of messages is read, and the
+latest risk profile is restored.
+
+SessionStore is the interface the server uses: create a session, look one up by ID, and check one out for
+a turn. `checkout` hands over the state with the session's lock held, so the turns of one conversation run
+one at a time while different conversations run concurrently. Because the state and its lock come from one
+lookup, a turn never works on a state that was evicted and resumed in the meantime. `pin` keeps a session in
+memory across several turns, e.g. a batch conversation, so it is not resumed from the log between them.
+InMemorySessionStore keeps up to `max_sessions` states in memory and evicts the least recently used idle
+ones; checked-out and pinned sessions are never evicted. An evicted session is not lost: its conversation is
+in the log and is resumed on the next request.
+
+In Simple Terms:
+This is the drawer where AVA keeps each conversation's notes between messages. Many conversations can be
+open at once; ones nobody has touched for a while go back to the archive on disk and are taken out again
+when needed.
+
+Classes and Functions:
+- SessionStore: Interface (create, get, checkout, pin, discard, len).
+- InMemorySessionStore: Bounded in-process SessionStore.
+- new_session_state / resume_session_state: Session state factories.
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from utils.conversation_store import ConversationStore, get_conversation_log
+from utils.risk_profile_utils import RiskProfileManager
+
+GREETING = "Hi, how can I help you today?"
+
+# Session state that belongs to one conversation (replaced when another session is resumed)
+CONVERSATION_KEYS = (
+    'messages', 'conversation_history', 'risk_profile_report', 'risk_profile_data', 'risk_profile_mark',
+    'fundamentals_report', 'price_chart_data', 'radar_chart_data', 'radar_chart_note', 'report_summaries',
+    'rolling_summary', 'precomputed_context', 'critical_path', 'pending_jobs',
+)
+
+
+def _session_state(messages, history):
+    return {
+        'messages': messages,
+        'conversation_history': history,
+        'report_summaries': [],
+        # Keep the raw report (string) and the parsed data (dictionary)
+        'risk_profile_report': None,
+        'risk_profile_data': {},
+        # Length of the conversation history when the risk profile was last updated
+        'risk_profile_mark': 0,
+        'fundamentals_report': None,
+        'price_chart_data': None,
+        'radar_chart_data': None,
+        'radar_chart_note': None,
+        # Running conversation summary and high-water mark for incremental summaries
+        'rolling_summary': {'summary': None, 'high_water_mark': 0},
+        # Next-turn summaries precomputed in the background, keyed by history version
+        'precomputed_context': {},
+        # Critical path of the last turn's pipeline
+        'critical_path': None,
+        # Background jobs (IDs) whose results the conversation is still waiting for
+        'pending_jobs': [],
+        # Counters and timings collected by PipelineMetrics
+        'pipeline_metrics': {},
+        # Span trees of recent turns recorded by the Tracer
+        'traces': [],
+    }
+
+
+def new_session_state(session_id=None, log=None):
+    """State of a new conversation, opened with the assistant's greeting."""
+    messages = ConversationStore('messages', session_id=session_id, log=log)
+    messages.append({"role": "assistant", "content": GREETING})
+    # Same session ID, so both channels of a session sit side by side in the log
+    history = ConversationStore('history', session_id=messages.session_id, log=log)
+    return _session_state(messages, history)
+
+
+def resume_session_state(session_id, log=None):
+    """
+    State of a logged conversation: both conversation stores (last window only) and the latest risk profile.
+    Returns None if the log is unavailable or does not know the session.
+    """
+    log = log if log is not None else get_conversation_log()
+    if log is None or not log.has_session(session_id):
+        return None
+
+    history = ConversationStore.resume(session_id, 'history', log=log)
+    state = _session_state(ConversationStore.resume(session_id, 'messages', log=log), history)
+
+    # The latest profile is the last AgentTwo report; later answers are merged into it
+    last_profile = history.by_role('agent_two', last=1)
+    if last_profile:
+        report = last_profile[0]['content']
+        state['risk_profile_report'] = report
+        state['risk_profile_data'] = RiskProfileManager().parse_risk_profile_report(report)
+    state['risk_profile_mark'] = len(history)
+
+    # The running summary starts again from the messages still in memory
+    state['rolling_summary']['high_water_mark'] = max(len(history) - history.window, 0)
+    return state
+
+
+class SessionStore:
+    """Interface of the session state storage used by the API server."""
+
+    def create(self, session_id=None):
+        """Creates a new session; returns (session_id, state)."""
+        raise NotImplementedError
+
+    def get(self, session_id):
+        """The state of a session, or None if it is unknown."""
+        raise NotImplementedError
+
+    def checkout(self, session_id):
+        """
+        Context manager holding the session's lock while a turn runs; yields the state, or None if the session
+        is unknown. The state stays in the store until the block exits.
+        """
+        raise NotImplementedError
+
+    def pin(self, session_id):
+        """Context manager keeping the session in memory while the block runs; yields the state, or None."""
+        raise NotImplementedError
+
+    def discard(self, session_id):
+        """Drops a session's in-memory state (its log stays)."""
+        raise NotImplementedError
+
+    def __len__(self):
+        """Number of sessions held in memory."""
+        raise NotImplementedError
+
+
+class InMemorySessionStore(SessionStore):
+    def __init__(self, max_sessions=1000, log=None):
+        self.max_sessions = max_sessions
+        self._log = log
+        self._lock = threading.Lock()
+        # session_id -> [state, lock, pins], least recently used first; pinned entries are never evicted
+        self._sessions = OrderedDict()
+
+    def _add(self, session_id, state):
+        # Called with the lock held
+        self._sessions[session_id] = [state, threading.Lock(), 0]
+        for idle_id in list(self._sessions):
+            if len(self._sessions) <= self.max_sessions:
+                break
+            _, lock, pins = self._sessions[idle_id]
+            if idle_id != session_id and not pins and not lock.locked():
+                del self._sessions[idle_id]
+
+    def create(self, session_id=None):
+        # A known ID resumes that conversation rather than starting it over
+        state = self.get(session_id) if session_id else None
+        if state is not None:
+            return session_id, state
+        state = new_session_state(session_id, log=self._log)
+        session_id = state['messages'].session_id
+        with self._lock:
+            self._add(session_id, state)
+        return session_id, state
+
+    def _entry(self, session_id, pin=False):
+        """The session's [state, lock, pins] entry (resumed from the log if needed), or None; optionally pinned."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                self._sessions.move_to_end(session_id)
+                if pin:
+                    entry[2] += 1
+                return entry
+        # Evicted or from an earlier run: resume it from the conversation log
+        state = resume_session_state(session_id, log=self._log)
+        if state is None:
+            return None
+        with self._lock:
+            if session_id not in self._sessions:
+                self._add(session_id, state)
+            entry = self._sessions[session_id]
+            if pin:
+                entry[2] += 1
+            return entry
+
+    def _unpin(self, entry):
+        with self._lock:
+            entry[2] -= 1
+
+    def get(self, session_id):
+        entry = self._entry(session_id)
+        return entry[0] if entry is not None else None
+
+    @contextmanager
+    def pin(self, session_id):
+        entry = self._entry(session_id, pin=True)
+        if entry is None:
+            yield None
+            return
+        try:
+            yield entry[0]
+        finally:
+            self._unpin(entry)
+
+    @contextmanager
+    def checkout(self, session_id):
+        # Pinned from the lookup on, so the entry cannot be evicted while the turn waits for its lock
+        entry = self._entry(session_id, pin=True)
+        if entry is None:
+            yield None
+            return
+        try:
+            with entry[1]:
+                yield entry[0]
+        finally:
+            self._unpin(entry)
+
+    def discard(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
@@ -0,0 +1,92 @@
+# engine/themes.py
+
+"""
+🏷️ map_theme - Theme Names for the PE / Dividend Yield Table
+-------------------------------------------------------------
+Technical Overview:
+Maps the theme a user (or AgentOne) names, e.g. "ev" or "chips", to the theme wording used in
+`data/pe_div_yield_table.csv`. Unknown themes are passed through in lower case.
+
+In Simple Terms:
+Users say "tech" or "renewables"; the table says "information technology" or "sustainable energy". This
+translates one into the other.
+
+Functions:
+- map_theme: Returns the table's theme for a user-provided theme.
+"""
+
+
+def map_theme(theme_input: str) -> str:
+    """
+    Maps a user-provided theme input to a recognized theme in the dataset.
+    
+    Args:
+        theme_input (str): The theme input provided by the user.
+
+    Returns:
+        str: The mapped theme, or the original input if no mapping is found.
+    """
+    theme_mapping = {
+        'ai': 'artificial intelligence',
+        'arificial intelligence': 'artificial intelligence',
+        'artificial intelligence': 'artificial intelligence',
+        'ev': 'electric vehicle',
+        'electric vehicle': 'electric vehicles',
+        'electric vehicles': 'electric vehicles',
+        'electric cars': 'electric vehicles',
+        'cars': 'automobiles & parts',
+        'vehicles': 'automobiles & parts',
+        'tech': 'information technology',
+        'technology': 'information technology',
+        'fintech': 'financial services',
+        'financial services': 'financial services',
+        'blockchain': 'blockchain companies',
+        'gaming': 'gaming',
+        'games': 'gaming',
+        'sports': 'active lifestyle',
+        'active lifestyle': 'active lifestyle',
+        'psychedelics': 'psychedelics',
+        'entheogens': 'psychedelics',
+        'green energy': 'sustainable energy',
+        'renewables': 'sustainable energy',
+        'crisper': 'biotechnology',
+        'biotech': 'biotechnology',
+        'biotechnology': 'biotechnology',
+        'fashion': 'personal goods',
+        'gold': 'mining',
+        'pharma': 'pharmaceuticals & biotechnology',
+        'pharmaceuticals': 'pharmaceuticals & biotechnology',
+        'robotics': 'robotics',
+        'coffee': 'beverages',
+        'fast food': 'food producers',
+        'travel': 'travel & leisure',
+        'leisure': 'travel & leisure',
+        'social media': 'social networking',
+        'social networking': 'social networking',
+        'microchips': 'technology hardware & equipment',
+        'chips': 'technology hardware & equipment',
+        'tobacco': 'tobacco',
+        'real estate': 'real estate investment & services',
+        'reit': 'real estate investment trusts',
+        'insurance': 'life insurance',
+        'mining': 'mining',
+        'oil': 'oil & gas producers',
+        'gas': 'oil & gas producers',
+        'media': 'media',
+        'dividends': 'dividends',
+        'support': 'support services',
+        'construction': 'household goods & home construction',
+        'industrial': 'industrial engineering',
+        'metals': 'industrial metals & mining',
+        'forestry': 'forestry & paper',
+        'healthcare': 'health care equipment & services',
+        'health care': 'health care equipment & services',
+        'food': 'food & drug retailers',
+        'retail': 'general retailers',
+        'luxury': 'personal goods',
+    }
+
+    theme_lower = theme_input.lower()
+    if theme_lower in theme_mapping:
+        return theme_mapping[theme_lower]
+    return theme_lower
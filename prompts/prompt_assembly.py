@@ -0,0 +1,87 @@
+# prompts/prompt_assembly.py
+
+'''
+🧱 Prompt Assembly - Stable Mandate Prefixes for Provider Prompt Caching
+------------------------------------------------------------------------
+Technical Overview:
+OpenAI caches prompt prefixes automatically, and Anthropic caches prefixes marked with `cache_control`. Both
+only help if the start of the prompt is byte-for-byte identical from one request to the next. This module
+loads each agent mandate once through MandateStore, reloading it only when the file's mtime changes. It then
+assembles prompts as an AssembledPrompt with two parts. The static part is the mandate, always emitted first
+and unchanged. The dynamic part holds the volatile context (summaries, reports, notes) followed by the user
+input. Provider-aware callers (see AgentBase.prompt_cached) send the static part as a cacheable system prompt.
+Other models receive the two parts concatenated, which is the same text the agents sent before.
+When a TokenBudget is given, the volatile sections are compacted to fit the model's context window.
+
+In Simple Terms:
+Every agent prompt is split into "the rules", which never change, and "this turn's details". The rules are
+read from disk only when the file changes and always come first, so the AI provider can recognise them and
+skip re-reading them.
+
+Classes and Functions:
+- MandateStore: mtime-aware cache of mandate files in the prompts directory.
+- AssembledPrompt: A prompt split into static_prefix and dynamic_suffix.
+- assemble_prompt: Builds an AssembledPrompt from a mandate, context sections and a closing line.
+'''
+
+import os
+import threading
+from collections import namedtuple
+
+PROMPTS_DIR = 'prompts'
+
+
+class AssembledPrompt(namedtuple('AssembledPrompt', ['static_prefix', 'dynamic_suffix'])):
+    __slots__ = ()
+
+    @property
+    def text(self):
+        return f"{self.static_prefix}{self.dynamic_suffix}"
+
+
+class MandateStore:
+    def __init__(self, prompts_dir=PROMPTS_DIR):
+        self.prompts_dir = prompts_dir
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    def load(self, filename):
+        """Returns the mandate text, re-reading the file only when its mtime has changed."""
+        path = os.path.join(self.prompts_dir, filename)
+        mtime = os.stat(path).st_mtime_ns
+
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+        with open(path, 'r') as f:
+            text = f.read()
+
+        with self._lock:
+            self._cache[path] = (mtime, text)
+        return text
+
+
+def assemble_prompt(mandate, sections=(), closing="", budget=None):
+    """
+    Assembles a prompt with the mandate as a stable prefix.
+
+    Args:
+        mandate (str): The static agent mandate.
+        sections (iterable): Volatile context strings, already formatted, or PromptSections; None entries are skipped.
+        closing (str): Final line(s), typically containing the user input.
+        budget (TokenBudget): Optional budget; sections are compacted, lowest priority first, to fit it.
+
+    Returns:
+        AssembledPrompt
+    """
+    if budget is not None:
+        sections, _ = budget.fit(mandate, sections, closing)
+    sections = [section.render() if hasattr(section, 'render') else section for section in sections]
+    dynamic_suffix = "".join(section for section in sections if section)
+    return AssembledPrompt(mandate, f"{dynamic_suffix}{closing}")
+
+
+# Shared store used by all agents
+mandate_store = MandateStore()
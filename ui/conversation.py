@@ -1,43 +1,78 @@
 # ui/conversation.py
 
+import time
+
 import streamlit as st
 
+from engine.session_store import CONVERSATION_KEYS, new_session_state, resume_session_state
+from utils.conversation_store import get_conversation_log
+
+SESSION_QUERY_PARAM = 'session'
+PAGE_SIZE = 20           # messages rendered per page of the transcript
+MAX_RENDER_SAMPLES = 100  # render timings kept for the metrics pane
+
+
 def initialize_conversation():
     """
     Initializes the conversation history and reports in session state.
+
+    The conversation's state comes from the engine (`engine.session_store`): 'messages' (what the chat shows)
+    and 'conversation_history' (what the agents read, including reports) are ConversationStores, bounded in
+    memory with older messages in the session's SQLite log. The session ID is kept in the URL
+    (`?session=<ID>`), so a browser refresh resumes the conversation from the log.
     """
     if 'messages' not in st.session_state:
-        st.session_state['messages'] = []
-        st.session_state['messages'].append({"role": "assistant", "content": "Hi, how can I help you today?"})
-
-    if 'conversation_history' not in st.session_state:
-        st.session_state['conversation_history'] = []
+        session_id = st.query_params.get(SESSION_QUERY_PARAM)
+        state = (session_id and resume_session_state(session_id)) or new_session_state()
+        for key, value in state.items():
+            # Metrics and traces of the browser session are kept when another conversation is resumed
+            if key in CONVERSATION_KEYS or key not in st.session_state:
+                st.session_state[key] = value
+        st.query_params[SESSION_QUERY_PARAM] = st.session_state['messages'].session_id
 
-    # Keep the raw report (string) ...
-    if 'risk_profile_report' not in st.session_state:
-        st.session_state['risk_profile_report'] = None
 
-    # ... and the parsed data (dictionary)
-    if 'risk_profile_data' not in st.session_state:
-        st.session_state['risk_profile_data'] = {}
+def display_session_controls():
+    """
+    Displays the session ID in the sidebar and lets the user resume another logged session by its ID.
+    """
+    st.sidebar.header("Session")
+    session_id = st.session_state['messages'].session_id
+    st.sidebar.caption(f"Session ID: `{session_id}` (open the app with `?session=<ID>` to resume it)")
 
-    if 'fundamentals_report' not in st.session_state:
-        st.session_state['fundamentals_report'] = None
+    requested = st.sidebar.text_input("Resume session", placeholder="Session ID").strip()
+    if requested and requested != session_id:
+        log = get_conversation_log()
+        if log is None or not log.has_session(requested):
+            st.sidebar.warning(f"No logged session with ID {requested}.")
+            return
+        for key in CONVERSATION_KEYS + ('conversation_pages',):
+            st.session_state.pop(key, None)
+        st.query_params[SESSION_QUERY_PARAM] = requested
+        st.rerun()
 
-    if 'price_chart_data' not in st.session_state:
-        st.session_state['price_chart_data'] = None
 
-    if 'radar_chart_data' not in st.session_state:
-        st.session_state['radar_chart_data'] = None
-    if 'radar_chart_note' not in st.session_state:
-        st.session_state['radar_chart_note'] = None
+def display_conversation(metrics=None, page_size=PAGE_SIZE):
+    """
+    Displays the most recent page of the conversation in the Streamlit app; earlier pages are loaded on
+    demand (from the session log once they are out of the in-memory window).
 
+    The render time of every rerun is recorded ('render.conversation' in `metrics`, and with the conversation
+    length in session_state['render_timings']), so it can be checked to stay flat as the session grows.
 
-def display_conversation():
+    Args:
+        metrics (PipelineMetrics): Optional metrics collector.
+        page_size (int): Messages per page.
     """
-    Displays the conversation history in the Streamlit app.
-    """
-    for message in st.session_state['messages']:
+    start = time.perf_counter()
+    messages = st.session_state['messages']
+    pages = st.session_state.get('conversation_pages', 1)
+    hidden = len(messages) - pages * page_size
+    if hidden > 0 and st.button(f"Show earlier messages ({hidden} not shown)"):
+        pages += 1
+        st.session_state['conversation_pages'] = pages
+
+    shown = messages.tail(pages * page_size)
+    for message in shown:
         if message['role'] == 'user':
             with st.chat_message("user"):
                 st.markdown(message['content'])
@@ -45,6 +80,13 @@ def display_conversation():
             with st.chat_message("assistant"):
                 st.markdown(message['content'])
 
+    elapsed = time.perf_counter() - start
+    if metrics is not None:
+        metrics.record_timing('render.conversation', elapsed)
+    samples = st.session_state.setdefault('render_timings', [])
+    samples.append({'messages': len(messages), 'rendered': len(shown), 'ms': round(1000 * elapsed, 2)})
+    del samples[:-MAX_RENDER_SAMPLES]
+
 
 def get_user_input():
     """
@@ -0,0 +1,36 @@
+# ui/job_progress.py
+
+import streamlit as st
+
+POLL_SECONDS = 1.0
+
+
+def display_job_progress(job_queue, pending_jobs, poll_seconds=POLL_SECONDS):
+    """
+    Displays the progress of the background jobs the conversation is waiting for, below the chat. The progress
+    is polled every `poll_seconds` in a fragment, so only the bars rerun; once a job has finished the whole app
+    reruns and the session picks up its result.
+
+    Args:
+        job_queue (JobQueue): The process-wide job queue.
+        pending_jobs (list): Jobs still queued or running (from `AdvisorySession.collect_jobs`).
+    """
+    if not pending_jobs:
+        return
+    job_ids = [job['id'] for job in pending_jobs]
+
+    def render():
+        jobs = [job_queue.get(job_id) for job_id in job_ids]
+        if any(job is None or job['status'] in ('done', 'failed') for job in jobs):
+            st.rerun()
+        for job in jobs:
+            status = job['message'] or job['status'].capitalize()
+            st.progress(job['progress'] or 0.0, text=f"Research report in the background: {status}")
+
+    # Fragments rerun on a timer on their own (Streamlit 1.37+); older versions refresh on request
+    fragment = getattr(st, 'fragment', None)
+    if fragment is not None:
+        fragment(run_every=poll_seconds)(render)()
+    else:
+        render()
+        st.button("Refresh report progress")
@@ -0,0 +1,134 @@
+# ui/metrics_pane.py
+
+import streamlit as st
+
+def _hedging_rows(counters):
+    """Per-agent hedge rate, wins and extra cost from the `hedge.<agent>.<name>` counters."""
+    agents = sorted({name.split('.')[1] for name in counters if name.startswith('hedge.')})
+    rows = []
+    for agent in agents:
+        def count(name):
+            return counters.get(f"hedge.{agent}.{name}", 0)
+        requests, hedged = count('requests'), count('hedged')
+        rows.append({
+            "agent": agent,
+            "requests": requests,
+            "hedge rate": f"{100 * hedged / requests:.1f}%" if requests else "-",
+            "hedge wins": f"{count('hedge_wins')}/{hedged}",
+            "extra tokens in/out": f"{count('extra_input_tokens')}/{count('extra_output_tokens')}",
+        })
+    return rows
+
+def display_pipeline_metrics(metrics, client_stats=None, critical_path=None, provider_stats=None,
+                             market_data_stats=None, response_cache_stats=None, render_timings=None):
+    """
+    Displays per-intent hit counts and handler latencies collected by PipelineMetrics
+    in a collapsible section of the Streamlit sidebar.
+
+    Args:
+        metrics (PipelineMetrics): The session's metrics collector.
+        client_stats (dict): Optional process-wide model client registry statistics.
+        critical_path (str): Optional description of the last turn's critical path.
+        provider_stats (dict): Optional per-provider request counts of the async client layer.
+        market_data_stats (dict): Optional process-wide market data cache statistics.
+        response_cache_stats (dict): Optional process-wide LLM response cache statistics.
+        render_timings (list): Optional conversation render samples ({'messages', 'rendered', 'ms'}) of
+            recent reruns.
+    """
+    snapshot = metrics.snapshot()
+
+    with st.sidebar.expander("Pipeline Metrics", expanded=False):
+        rows = []
+        for name, timing in sorted(snapshot['timings'].items()):
+            count = timing['count']
+            rows.append({
+                "step": name,
+                "calls": count,
+                "avg (ms)": round(1000 * timing['total'] / count, 1) if count else 0.0,
+                "max (ms)": round(1000 * timing['max'], 1),
+                "last (ms)": round(1000 * timing['last'], 1),
+            })
+
+        if critical_path:
+            st.write("**Last turn critical path**")
+            st.caption(critical_path)
+
+        if rows:
+            st.write("**Timings**")
+            st.dataframe(rows, hide_index=True)
+
+        if snapshot['counters']:
+            st.write("**Counters**")
+            st.dataframe(
+                [{"counter": name, "value": value} for name, value in sorted(snapshot['counters'].items())],
+                hide_index=True
+            )
+
+        if snapshot.get('breakdowns'):
+            st.write("**Prompt tokens (last prompt per agent)**")
+            st.dataframe(
+                [
+                    dict({"prompt": name.split('.', 1)[-1]}, **breakdown)
+                    for name, breakdown in sorted(snapshot['breakdowns'].items())
+                ],
+                hide_index=True
+            )
+
+        hedging_rows = _hedging_rows(snapshot['counters'])
+        if hedging_rows:
+            st.write("**Hedged requests**")
+            st.dataframe(hedging_rows, hide_index=True)
+
+        if client_stats:
+            st.write("**Model Clients (process-wide)**")
+            st.write(
+                f"{client_stats['live_clients']} loaded · {client_stats['hits']} reused · "
+                f"{client_stats['misses']} created ({client_stats['setup_seconds']:.2f}s setup) · "
+                f"{client_stats['evictions']} evicted"
+            )
+
+        if provider_stats:
+            st.write("**Provider Requests (process-wide)**")
+            for provider, stats in sorted(provider_stats.items()):
+                st.write(
+                    f"{provider}: {stats['requests']} requests · {stats['in_flight']} in flight · "
+                    f"peak {stats['peak_in_flight']} concurrent"
+                )
+
+        counters = snapshot['counters']
+        prefetch_started = counters.get('prefetch.started', 0)
+        if prefetch_started:
+            hits, missed = counters.get('prefetch.hits', 0), counters.get('prefetch.missed', 0)
+            st.write("**Market Data Prefetch**")
+            st.write(
+                f"hit rate {100 * hits / (hits + missed) if hits + missed else 0:.1f}% ({hits}/{hits + missed} needed) · "
+                f"{counters.get('prefetch.wasted', 0)}/{prefetch_started} fetches wasted"
+            )
+
+        if market_data_stats:
+            st.write("**Market Data Cache (process-wide)**")
+            st.write(
+                f"{market_data_stats['entries']} entries · {market_data_stats['hits']} hits · "
+                f"{market_data_stats['coalesced']} joined in flight · {market_data_stats['misses']} fetched · "
+                f"{market_data_stats['evictions']} evicted"
+            )
+
+        if response_cache_stats:
+            st.write("**LLM Response Cache (process-wide)**")
+            st.write(
+                f"{response_cache_stats['entries']} responses ({response_cache_stats['bytes'] / 1024:.1f} KB) · "
+                f"{response_cache_stats['hits']} hits · {response_cache_stats['misses']} misses · "
+                f"{response_cache_stats['coalesced']} coalesced · {response_cache_stats['evictions']} evicted"
+            )
+
+        if render_timings:
+            last = render_timings[-1]
+            st.write("**Conversation Rendering**")
+            st.caption(
+                f"last rerun: {last['ms']} ms for {last['rendered']} of {last['messages']} messages "
+                f"(should stay flat as the conversation grows)"
+            )
+            st.line_chart(render_timings, x='messages', y='ms')
+
+        if not rows and not snapshot['counters']:
+            st.caption("No turns processed yet.")
@@ -2,33 +2,57 @@
 
 import streamlit as st
 
-def model_selection(gpt_models, claude_models):
+from utils.model_benchmark import AUTO_MODEL, MIN_VALIDITY, ROLE_FOR_AGENT, pick_model
+
+AGENT_LABELS = {
+    'agent_zero': "Choose the model for conversation agent (Agent Zero):",
+    'agent_one': "Choose the model for the evaluation agent (Agent One):",
+    'agent_two': "Choose the model for risk profiling agent (Agent Two):",
+}
+
+
+def _resolve_auto(agent, all_models, benchmark_results, min_validity):
+    """The benchmarked model 'auto' stands for, with a caption explaining the choice."""
+    role = ROLE_FOR_AGENT[agent]
+    picked = pick_model(benchmark_results, role, all_models, min_validity)
+    if picked is None:
+        st.warning(
+            f"No benchmarked model reaches {100 * min_validity:.0f}% validity for {role}; "
+            f"using {all_models[0]}. Run _helpers/model_benchmark.py to benchmark the candidates."
+        )
+        return all_models[0]
+    model_name, result = picked
+    st.caption(
+        f"Auto: {model_name} (p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, "
+        f"validity {100 * result['validity']:.0f}%)"
+    )
+    return model_name
+
+
+def model_selection(gpt_models, claude_models, local_models=(), benchmark_results=None, min_validity=MIN_VALIDITY):
     """
     Displays model selection dropdowns for each agent and stores the selections in session state.
 
     Args:
         gpt_models (list): List of GPT model names.
         claude_models (list): List of Claude model names.
+        local_models (iterable): Models that need no API key (e.g. the mock backend), listed first.
+        benchmark_results (dict): Optional per-role model benchmark results (`utils.model_benchmark`). When
+            given, an "auto" option picks the fastest model that reaches `min_validity` for each agent.
+        min_validity (float): Validity (0-1) a model needs in the benchmark to be picked by "auto".
 
     Returns:
         dict: A dictionary with selected models for each agent.
     """
-    all_models = gpt_models + claude_models
-
-    # Dropdown for Agent Zero model selection
-    agent_zero_model = st.selectbox("Choose the model for conversation agent (Agent Zero):", all_models)
-    st.session_state['agent_zero_model'] = agent_zero_model
-
-    # Dropdown for Agent One model selection
-    agent_one_model = st.selectbox("Choose the model for the evaluation agent (Agent One):", all_models)
-    st.session_state['agent_one_model'] = agent_one_model
-
-    # Dropdown for Agent Two model selection
-    agent_two_model = st.selectbox("Choose the model for risk profiling agent (Agent Two):", all_models)
-    st.session_state['agent_two_model'] = agent_two_model
-
-    return {
-        'agent_zero': agent_zero_model,
-        'agent_one': agent_one_model,
-        'agent_two': agent_two_model
-    }
+    all_models = list(local_models) + gpt_models + claude_models
+    options = ([AUTO_MODEL] if benchmark_results else []) + all_models
+
+    selected = {}
+    for agent in ('agent_zero', 'agent_one', 'agent_two'):
+        model_name = st.selectbox(AGENT_LABELS[agent], options)
+        if model_name == AUTO_MODEL:
+            model_name = _resolve_auto(agent, all_models, benchmark_results, min_validity)
+        st.session_state[f'{agent}_model'] = model_name
+        selected[agent] = model_name
+
+    return selected
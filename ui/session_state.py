@@ -9,4 +9,6 @@ def initialize_session_state():
     if 'api_keys' not in st.session_state:
         st.session_state['api_keys'] = {}
 
+    # The conversation's own state (stores, reports, summaries, metrics) is set up by initialize_conversation
+
     # Add other session state initializations if needed
@@ -29,6 +29,13 @@ def display_settings(conversation_memory_config):
           context but may risk exceeding token limits.
         - **Number of reports**: Specifies how many recent reports or results are included in the 
           summarized context for agents. Adjust this based on the depth of insights required.
+        - **Incremental summaries**: Keeps a running summary and only folds in the messages added 
+          since the previous turn, so earlier context is kept and each turn sends fewer tokens. 
+          The number of messages setting is not used in this mode.
+        - **Token threshold**: New messages are folded into the running summary only once they 
+          exceed this many tokens; until then they are passed along verbatim.
+        - **Incremental risk profile**: Once a risk profile exists, only the new answers and the 
+          current profile are sent to the risk profiling agent, which returns the changes.
         """)
 
     # Number of Messages to Summarize
@@ -51,6 +58,77 @@ def display_settings(conversation_memory_config):
         help="This sets the number of recent reports included in the summarization. Adjust based on context needs."
     )
 
+    # Incremental (rolling) conversation summaries
+    incremental_summaries = st.sidebar.checkbox(
+        "Incremental conversation summaries",
+        value=conversation_memory_config.incremental_summaries,
+        help="Fold only new messages into a running summary instead of re-summarizing the recent window every turn."
+    )
+
+    summary_token_threshold = st.sidebar.number_input(
+        "Token threshold for updating the running summary",
+        min_value=0,
+        max_value=2000,
+        value=conversation_memory_config.summary_token_threshold,
+        step=50,
+        disabled=not incremental_summaries,
+        help="The summarizer is skipped until the new messages exceed this many tokens."
+    )
+
+    incremental_risk_profile = st.sidebar.checkbox(
+        "Incremental risk profile",
+        value=conversation_memory_config.incremental_risk_profile,
+        help="Update the risk profile from the new answers only. Use the re-profile button for a full rebuild."
+    )
+
     # Update the configuration with user inputs
     conversation_memory_config.set_num_messages(num_messages)
     conversation_memory_config.set_num_reports(num_reports)
+    conversation_memory_config.set_incremental_summaries(incremental_summaries)
+    conversation_memory_config.set_summary_token_threshold(summary_token_threshold)
+    conversation_memory_config.set_incremental_risk_profile(incremental_risk_profile)
+
+
+def display_hedging_settings(hedging_config, hedgeable_agents, model_options):
+    """
+    Displays the hedging settings in the Streamlit sidebar: which agents' requests are hedged, after which
+    latency percentile, and which model receives the duplicate request.
+
+    Args:
+        hedging_config (HedgingConfig): The configuration to update.
+        hedgeable_agents (list): Names of the agents that can be hedged.
+        model_options (list): Models that may receive the duplicate request.
+    """
+    st.sidebar.header("Hedged Requests")
+
+    hedged_agents = st.sidebar.multiselect(
+        "Hedge requests of",
+        hedgeable_agents,
+        default=sorted(hedging_config.hedged_agents),
+        help="If a request of these agents runs longer than usual, a duplicate is sent and the first answer wins. "
+             "This cuts slow outliers at the cost of occasional extra tokens."
+    )
+
+    percentile = st.sidebar.slider(
+        "Hedge after latency percentile",
+        min_value=50,
+        max_value=99,
+        value=int(round(100 * hedging_config.percentile)),
+        step=1,
+        disabled=not hedged_agents,
+        help="The duplicate is sent once a request has taken longer than this percentile of recent requests."
+    )
+
+    same_model = "Same model"
+    alternate_model = st.sidebar.selectbox(
+        "Send the duplicate to",
+        [same_model] + list(model_options),
+        index=0,
+        disabled=not hedged_agents,
+        help="The duplicate can go to the agent's own model or to an alternate model."
+    )
+
+    # Update the configuration with user inputs
+    hedging_config.set_hedged_agents(hedged_agents)
+    hedging_config.set_percentile(percentile / 100)
+    hedging_config.set_alternate_model(None if alternate_model == same_model else alternate_model)
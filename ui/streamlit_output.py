@@ -0,0 +1,81 @@
+# ui/streamlit_output.py
+
+from contextlib import contextmanager
+
+import streamlit as st
+
+from engine.output import TurnOutput
+
+
+class _StreamlitAssistantMessage:
+    def __init__(self):
+        self._placeholder = st.empty()
+
+    def update(self, text):
+        self._placeholder.markdown(text)
+
+    def caption(self, text):
+        st.caption(text)
+
+
+class _StreamlitProgressBar:
+    def __init__(self, text):
+        self.text = text
+        self._bar = st.progress(0.0, text=text)
+
+    def update(self, fraction, text=None):
+        self.text = text or self.text
+        self._bar.progress(min(max(fraction, 0.0), 1.0), text=self.text)
+
+    def empty(self):
+        self._bar.empty()
+
+
+class StreamlitOutput(TurnOutput):
+    """
+    Renders a turn of the advisory engine in the Streamlit app: chat messages (the assistant's streamed into
+    a placeholder), progress bars, text, JSON, warnings, charts and tables.
+    """
+
+    def user_message(self, text):
+        with st.chat_message("user"):
+            st.markdown(text)
+
+    @contextmanager
+    def assistant_message(self):
+        with st.chat_message("assistant"):
+            yield _StreamlitAssistantMessage()
+
+    @contextmanager
+    def spinner(self, text):
+        with st.spinner(text):
+            yield
+
+    @contextmanager
+    def progress(self, text):
+        bar = _StreamlitProgressBar(text)
+        try:
+            yield bar
+        finally:
+            bar.empty()
+
+    def write(self, value):
+        st.write(value)
+
+    def json(self, value):
+        st.json(value)
+
+    def warning(self, text):
+        st.warning(text)
+
+    def error(self, text):
+        st.error(text)
+
+    def line_chart(self, data):
+        st.line_chart(data)
+
+    def plotly_chart(self, figure):
+        st.plotly_chart(figure, use_container_width=True)
+
+    def dataframe(self, data, formats=None):
+        st.dataframe(data.style.format(formats) if formats else data)
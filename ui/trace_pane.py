@@ -0,0 +1,59 @@
+# ui/trace_pane.py
+
+import json
+import streamlit as st
+
+def _flatten(span, depth=0, rows=None):
+    rows = [] if rows is None else rows
+    attributes = span['attributes']
+    rows.append({
+        "span": f"{'· ' * depth}{span['name']}",
+        "category": span['category'],
+        "start (ms)": round(span['start_ms'], 1),
+        "duration (ms)": round(span['duration_ms'], 1),
+        "tokens in/out": (
+            f"{attributes.get('input_tokens', '')}/{attributes.get('output_tokens', '')}"
+            if 'input_tokens' in attributes or 'output_tokens' in attributes else ""
+        ),
+        "cache": {True: "hit", False: "miss"}.get(attributes.get('hit', attributes.get('memo_hit')), ""),
+        "bytes": attributes.get('payload_bytes', attributes.get('result_bytes', "")),
+        "thread": span['thread'],
+    })
+    for child in span['children']:
+        _flatten(child, depth + 1, rows)
+    return rows
+
+def display_traces(tracer):
+    """
+    Displays the span trees of recent turns in a collapsible section of the Streamlit sidebar,
+    with downloads of the selected trace and of all traces in the Chrome trace format.
+
+    Args:
+        tracer (Tracer): The session's tracer.
+    """
+    traces = tracer.traces
+
+    with st.sidebar.expander("Turn Traces", expanded=False):
+        if not traces:
+            st.caption("No turns traced yet.")
+            return
+
+        labels = [f"{index + 1}. {trace['name']} ({trace['duration_ms'] / 1000:.2f}s)" for index, trace in enumerate(traces)]
+        selected = st.selectbox("Turn", range(len(traces)), index=len(traces) - 1, format_func=lambda index: labels[index])
+        trace = traces[selected]
+
+        st.dataframe(_flatten(trace), hide_index=True)
+
+        st.download_button(
+            label="Download trace (Chrome format)",
+            data=json.dumps(tracer.to_chrome_trace([trace]), default=str),
+            file_name=f"ava_trace_turn_{selected + 1}.json",
+            mime="application/json"
+        )
+        st.download_button(
+            label="Download all traces (Chrome format)",
+            data=json.dumps(tracer.to_chrome_trace(traces), default=str),
+            file_name="ava_traces.json",
+            mime="application/json"
+        )
+        st.caption("Open in chrome://tracing or ui.perfetto.dev.")
@@ -0,0 +1,217 @@
+# utils/classification_cache.py
+
+"""
+🧠 ClassificationCache Class - Semantic Cache for AgentOne Classifications
+--------------------------------------------------------------------------
+Technical Overview:
+`Config.setup` enables Milvus Lite, and this cache is what uses it. Each stored entry holds an embedding of
+the normalized user input (LLMWare's `mini-lm-sbert` embedding model) together with the parsed AgentOne
+dictionary and a creation timestamp. Entries live in their own collection of the same Milvus Lite database
+LLMWare uses. A lookup embeds the new input and searches by cosine similarity, ignoring entries older than
+the TTL. A hit is accepted only if:
+  1. the similarity reaches `similarity_threshold`, and
+  2. the "entity signature" matches: the tokens that are not common request vocabulary, such as tickers,
+     company names and periods. The embedding matches the phrasing ("plot", "show me", "chart of"), while
+     the signature guard stops "TSLA over 6 months" from answering "AAPL over 6 months".
+Context-dependent turns are never cached. These are investment_advice classifications, replies to a
+risk-profile question Agent Zero asked after giving advice or taking a profile answer, and very short inputs,
+because for them the conversation summary matters more than the words themselves. A question elsewhere in
+the conversation (the greeting, or an ordinary reply) does not make a turn context dependent: the caller
+decides whether an answer is awaited. Expired entries are deleted periodically. Missing optional
+dependencies (pymilvus, the embedding model) disable the cache instead of failing the turn.
+
+In Simple Terms:
+The cache remembers how AgentOne classified requests it has seen before. If a new request is worded almost
+the same way and mentions the same stocks, the old answer is reused instantly instead of asking the model.
+
+Methods:
+- is_context_dependent: Decides whether a turn must bypass the cache.
+- lookup: Returns a cached classification dictionary or None.
+- store: Saves a classification for reuse (context-free intents only).
+- evict_expired: Deletes entries older than the TTL.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+COLLECTION_NAME = "ava_classification_cache"
+EMBEDDING_MODEL = "mini-lm-sbert"
+EMBEDDING_DIMS = 384
+
+# Intents whose classification does not depend on the conversation so far
+CACHEABLE_INTENTS = ('fundamentals', 'price_chart', 'compare_price_chart', 'radar_chart', 'pe_div_yield_table')
+
+# Common request vocabulary; anything else (tickers, company names, periods, metrics) forms the signature
+REQUEST_VOCABULARY = frozenset("""
+a an and are as at be by can chart charts compare comparison could do does for from get give graph have how i
+in is it its me my of on over please plot price prices show stock stocks tell than that the their them this
+to vs versus want what whats which with would you your like last past performance performed done doing
+data table fundamentals fundamental info information about history historical between against display
+""".split())
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9./&-]+")
+
+
+def normalize_input(user_input):
+    return " ".join(_TOKEN_PATTERN.findall(user_input.lower()))
+
+
+def entity_signature(normalized_input):
+    return " ".join(sorted(set(token for token in normalized_input.split() if token not in REQUEST_VOCABULARY)))
+
+
+class ClassificationCache:
+    def __init__(self, similarity_threshold=0.92, ttl_seconds=7 * 24 * 3600):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        # Process-wide counters (per-session hit rate and latency saved are kept by IntentClassifier)
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'errors': 0}
+        self.available = None  # unknown until first use
+        self._lock = threading.Lock()
+        self._client = None
+        self._embedder = None
+        self._last_eviction = 0.0
+
+    # -------------------------------------------------------------------------
+    # Setup (lazy, optional dependencies)
+    # -------------------------------------------------------------------------
+
+    def _ensure_ready(self):
+        if self.available is not None:
+            return self.available
+
+        with self._lock:
+            if self.available is not None:
+                return self.available
+            try:
+                import pymilvus
+                from llmware.configs import MilvusConfig
+                from llmware.models import ModelCatalog
+
+                db_path = os.path.join(MilvusConfig().get_config("lite_folder_path"), MilvusConfig().get_config("lite_name"))
+                os.makedirs(os.path.dirname(db_path), exist_ok=True)
+                client = pymilvus.MilvusClient(db_path)
+                if COLLECTION_NAME not in client.list_collections():
+                    client.create_collection(
+                        collection_name=COLLECTION_NAME,
+                        dimension=EMBEDDING_DIMS,
+                        metric_type="COSINE",
+                        auto_id=True
+                    )
+                self._embedder = ModelCatalog().load_model(EMBEDDING_MODEL)
+                self._client = client
+                self.available = True
+            except Exception:
+                # Optional feature: without pymilvus or the embedding model, classification goes to the LLM
+                self.available = False
+        return self.available
+
+    def _embed(self, text):
+        vector = self._embedder.embedding(text)
+        vector = vector[0] if getattr(vector, 'ndim', 1) > 1 else vector
+        return [float(v) for v in vector]
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    # -------------------------------------------------------------------------
+    # Policy
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def is_context_dependent(user_input, awaiting_answer=False):
+        """
+        True when the classification likely depends on the conversation rather than the words alone: the
+        previous turn asked for an answer (`awaiting_answer`, e.g. a risk profile question), or the input is
+        too short to stand on its own.
+        """
+        if awaiting_answer:
+            return True
+        return len(normalize_input(user_input).split()) < 3
+
+    @staticmethod
+    def is_cacheable(evaluation_dict):
+        return any(intent in evaluation_dict for intent in CACHEABLE_INTENTS)
+
+    # -------------------------------------------------------------------------
+    # Lookup / store
+    # -------------------------------------------------------------------------
+
+    def lookup(self, user_input):
+        if not self._ensure_ready():
+            return None
+
+        normalized = normalize_input(user_input)
+        try:
+            results = self._client.search(
+                collection_name=COLLECTION_NAME,
+                data=[self._embed(normalized)],
+                limit=3,
+                filter=f"created_at > {time.time() - self.ttl_seconds}",
+                output_fields=["signature", "classification"]
+            )
+        except Exception:
+            self._count('errors')
+            return None
+
+        signature = entity_signature(normalized)
+        for hit in (results[0] if results else []):
+            entity = hit.get("entity", {})
+            if hit.get("distance", 0.0) >= self.similarity_threshold and entity.get("signature") == signature:
+                self._count('hits')
+                return json.loads(entity["classification"])
+
+        self._count('misses')
+        return None
+
+    def store(self, user_input, evaluation_dict):
+        if not self.is_cacheable(evaluation_dict) or not self._ensure_ready():
+            return False
+
+        normalized = normalize_input(user_input)
+        try:
+            self._client.insert(
+                collection_name=COLLECTION_NAME,
+                data=[{
+                    "vector": self._embed(normalized),
+                    "normalized_input": normalized,
+                    "signature": entity_signature(normalized),
+                    "classification": json.dumps(evaluation_dict),
+                    "created_at": time.time(),
+                }]
+            )
+        except Exception:
+            self._count('errors')
+            return False
+
+        self._count('stores')
+        # Evict expired entries at most once an hour
+        if time.time() - self._last_eviction > 3600:
+            self.evict_expired()
+        return True
+
+    def evict_expired(self):
+        if not self._ensure_ready():
+            return
+        self._last_eviction = time.time()
+        try:
+            self._client.delete(collection_name=COLLECTION_NAME, filter=f"created_at < {time.time() - self.ttl_seconds}")
+        except Exception:
+            self._count('errors')
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_classification_cache():
+    """Process-wide cache instance (the embedding model and Milvus client are loaded once)."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ClassificationCache()
+        return _shared_cache
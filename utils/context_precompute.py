@@ -0,0 +1,132 @@
+# utils/context_precompute.py
+
+"""
+⏳ ContextPrecomputer Class - Idle-Time Precomputation of Next-Turn Context
+---------------------------------------------------------------------------
+Technical Overview:
+Once Agent Zero's reply has been rendered, the app sits idle until the next user message, and the next turn
+used to start by summarizing the history again. ContextPrecomputer uses that idle time. Right after a turn
+finishes it submits a background job to a small process-wide thread pool. The job summarizes the conversation
+and the reports as they stand, and for incremental summaries it folds the new messages into a copy of the
+running-summary state. The results are parked in session-scoped storage (a dictionary in `st.session_state`)
+under a history version. The version is a hash of the conversation history, the report list and the memory
+settings that shape the summaries.
+
+At the start of the next turn `take` recomputes the version for the history as it was before the new user
+message. A matching result is handed to the turn's TurnContext, so the turn can go straight to
+classification; a job that is still running is waited for rather than duplicated. A mismatch, for example
+when the history was edited, a report was added or the settings changed, means the precomputation is stale:
+it is discarded and the turn summarizes as usual. The new user message reaches AgentOne and Agent Zero
+directly, so leaving it out of the precomputed conversation summary loses nothing.
+
+In Simple Terms:
+While the user is reading the answer and typing the next question, AVA already writes up its notes on the
+conversation so far. When the question arrives, the notes are ready, unless something changed in the
+meantime, in which case they are thrown away and rewritten.
+
+Methods:
+- history_version: Hash identifying a history, report list and summary settings.
+- start: Submits the background precomputation for the current history.
+- take: Returns the precomputed context for a history version, or None if missing or stale.
+"""
+
+import copy
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.instrumentation import PipelineMetrics
+from utils.turn_context import TurnContext, content_hash
+
+# Shared by all sessions; summarization is I/O bound, so a couple of workers is plenty
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='ava-precompute')
+
+
+def history_version(conversation_history, report_summaries, memory_config):
+    # A ConversationStore (or view) identifies its messages by its hash chain; lists are hashed in full
+    fingerprint = getattr(conversation_history, 'fingerprint', None)
+    return content_hash([
+        fingerprint() if fingerprint is not None else conversation_history,
+        report_summaries,
+        memory_config.num_messages,
+        memory_config.num_reports,
+        memory_config.incremental_summaries,
+        memory_config.summary_token_threshold,
+    ])
+
+
+class ContextPrecomputer:
+    def __init__(self, agent_summarizer, memory_config, store=None, metrics=None):
+        self.agent_summarizer = agent_summarizer
+        self.memory_config = memory_config
+        # Session-scoped storage, e.g. st.session_state['precomputed_context']
+        self.store = store if store is not None else {}
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+
+    def _precompute(self, conversation_history, report_summaries, rolling_state):
+        context = TurnContext(
+            self.agent_summarizer,
+            conversation_history,
+            report_summaries,
+            num_messages=self.memory_config.num_messages,
+            num_reports=self.memory_config.num_reports,
+            metrics=self.metrics,
+            rolling_state=rolling_state,
+            summary_token_threshold=self.memory_config.summary_token_threshold
+        )
+        with self.metrics.timer('precompute.run'):
+            return {
+                'conversation_summary': context.summarize_conversation(),
+                'reports_summary': context.summarize_reports(),
+                'rolling_state': rolling_state,
+            }
+
+    def start(self, conversation_history, report_summaries, rolling_state=None):
+        """
+        Submits the precomputation for the given history. Snapshots are taken so the session's lists and the
+        running-summary state are never touched from the background thread. A ConversationStore is snapshotted
+        as a view (a frozen prefix), so it is not copied.
+        """
+        view = getattr(conversation_history, 'view', None)
+        conversation_history = view() if view is not None else list(conversation_history)
+        report_summaries = list(report_summaries or [])
+        if self.memory_config.incremental_summaries:
+            rolling_state = copy.deepcopy(rolling_state) if rolling_state is not None else {}
+        else:
+            rolling_state = None
+
+        self.store.clear()
+        self.store['version'] = history_version(conversation_history, report_summaries, self.memory_config)
+        self.store['future'] = _executor.submit(self._precompute, conversation_history, report_summaries, rolling_state)
+        self.metrics.increment('precompute.started')
+
+    def take(self, conversation_history, report_summaries, rolling_state=None):
+        """
+        Returns the precomputed context ('conversation_summary', 'reports_summary') if it was computed for
+        exactly this history, waiting for a job still in flight. Consumes the stored entry.
+
+        In incremental mode the precomputed running-summary state is copied into `rolling_state` instead, and
+        no conversation summary is returned: the turn's TurnContext then only has the new user message to add.
+        """
+        future = self.store.get('future')
+        if future is None:
+            return None
+
+        version = self.store.get('version')
+        self.store.clear()
+        if version != history_version(conversation_history, list(report_summaries or []), self.memory_config):
+            future.cancel()
+            self.metrics.increment('precompute.stale')
+            return None
+
+        waited = not future.done()
+        try:
+            result = future.result()
+        except Exception:
+            # A failed precomputation only costs the usual summarization in the turn itself
+            self.metrics.increment('precompute.failed')
+            return None
+
+        self.metrics.increment('precompute.waited' if waited else 'precompute.ready')
+        if result['rolling_state'] is not None and rolling_state is not None:
+            rolling_state.update(result['rolling_state'])
+            return {'conversation_summary': None, 'reports_summary': result['reports_summary']}
+        return {'conversation_summary': result['conversation_summary'], 'reports_summary': result['reports_summary']}
@@ -0,0 +1,318 @@
+# utils/conversation_store.py
+
+"""
+💬 ConversationStore Class - Bounded In-Memory Conversation with a SQLite Log
+-----------------------------------------------------------------------------
+Technical Overview:
+`st.session_state['conversation_history']` and `['messages']` used to be plain lists. They grew for as long
+as a session lasted and held full fundamentals reports, raw risk-profile JSON and AgentOne dictionaries. Any
+step that needed history walked or copied all of it. ConversationStore replaces both lists.
+
+Every appended message is written through to a local SQLite log (CONVERSATION_LOG_PATH). The log holds one
+row per message, keyed by session, channel ('history' or 'messages') and index, with its role, its turn
+(a turn starts at each user message) and a hash chain over the messages so far. Only the most recent
+`window` messages stay in memory, so a session's memory stays flat however long it runs. Older messages are
+read back from the log on demand, through indexes on role and turn.
+
+The store behaves like a read-only list for existing code: `len`, indexing, slicing (slices return lists of
+message dictionaries) and iteration. History-dependent steps can read only what they need:
+- `tail(n)`: the last n messages;
+- `by_role(roles, last=n)`: the last n messages of the given roles;
+- `turn(number)`: the messages of one turn;
+- `view(length)`: a frozen prefix of the conversation, safe to hand to a background thread;
+- `fingerprint(length)`: a hash identifying the first `length` messages, computed in constant time from the
+  hash chain.
+If the log cannot be opened, the store keeps all messages in memory instead of failing the session.
+
+The log is append-only and outlives the Streamlit session: `ConversationStore.resume` rebuilds a store for a
+session ID from it (reading only the last `window` messages), so a conversation survives a browser refresh
+or a restart.
+
+In Simple Terms:
+AVA now keeps only the latest part of each conversation in memory and writes everything to a small
+database on disk. When an older message is needed, it is looked up there by who said it or when.
+
+Classes:
+- ConversationStore: The session's conversation (append-only), with a bounded in-memory window.
+- ConversationView: A read-only prefix of a store.
+- ConversationLog: The SQLite file shared by all sessions of the process.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+CONVERSATION_LOG_PATH = 'data/conversations.sqlite'
+DEFAULT_WINDOW = 40
+
+
+def _chain(previous, message):
+    payload = json.dumps(message, sort_keys=True, default=str)
+    return hashlib.sha256(f"{previous}\n{payload}".encode('utf-8')).hexdigest()
+
+
+class ConversationLog:
+    def __init__(self, path=CONVERSATION_LOG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " session_id TEXT, channel TEXT, idx INTEGER, turn INTEGER, role TEXT, content TEXT, extra TEXT,"
+            " chain TEXT, created REAL, PRIMARY KEY (session_id, channel, idx))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS messages_role ON messages (session_id, channel, role, idx)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS messages_turn ON messages (session_id, channel, turn, idx)")
+        self._db.commit()
+
+    @staticmethod
+    def _message(row):
+        role, content, extra = row
+        message = {"role": role, "content": content}
+        if extra:
+            message.update(json.loads(extra))
+        return message
+
+    def append(self, session_id, channel, index, turn, message, chain):
+        extra = {key: value for key, value in message.items() if key not in ('role', 'content')}
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO messages (session_id, channel, idx, turn, role, content, extra, chain, created)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (session_id, channel, index, turn, message.get('role'), message.get('content'),
+                 json.dumps(extra, default=str) if extra else None, chain, time.time())
+            )
+            self._db.commit()
+
+    def read(self, session_id, channel, start, stop):
+        """Messages with index in [start, stop), in order."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT role, content, extra FROM messages WHERE session_id = ? AND channel = ? AND idx >= ? AND idx < ?"
+                " ORDER BY idx", (session_id, channel, start, stop)
+            ).fetchall()
+        return [self._message(row) for row in rows]
+
+    def by_role(self, session_id, channel, roles, stop, limit):
+        """The last `limit` messages (all if None) with one of `roles` and index below `stop`, in order."""
+        placeholders = ", ".join("?" for _ in roles)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT role, content, extra FROM messages WHERE session_id = ? AND channel = ?"
+                f" AND role IN ({placeholders}) AND idx < ? ORDER BY idx DESC LIMIT ?",
+                (session_id, channel, *roles, stop, -1 if limit is None else limit)
+            ).fetchall()
+        return [self._message(row) for row in reversed(rows)]
+
+    def turn(self, session_id, channel, turn, stop):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT role, content, extra FROM messages WHERE session_id = ? AND channel = ? AND turn = ?"
+                " AND idx < ? ORDER BY idx", (session_id, channel, turn, stop)
+            ).fetchall()
+        return [self._message(row) for row in rows]
+
+    def tail(self, session_id, channel, count):
+        """(messages, turns, chains) of the last `count` messages, in order, plus the total number of messages."""
+        with self._lock:
+            total = self._db.execute(
+                "SELECT COALESCE(MAX(idx) + 1, 0) FROM messages WHERE session_id = ? AND channel = ?",
+                (session_id, channel)
+            ).fetchone()[0]
+            rows = self._db.execute(
+                "SELECT role, content, extra, turn, chain FROM messages WHERE session_id = ? AND channel = ?"
+                " AND idx >= ? ORDER BY idx", (session_id, channel, max(total - count, 0))
+            ).fetchall()
+        return [self._message(row[:3]) for row in rows], [(row[3], row[4]) for row in rows], total
+
+    def has_session(self, session_id):
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM messages WHERE session_id = ? LIMIT 1", (session_id,)).fetchone()
+        return row is not None
+
+    def chain(self, session_id, channel, index):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT chain FROM messages WHERE session_id = ? AND channel = ? AND idx = ?",
+                (session_id, channel, index)
+            ).fetchone()
+        return row[0] if row else None
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def get_conversation_log(path=CONVERSATION_LOG_PATH):
+    """Process-wide ConversationLog for `path`, or None if the database cannot be opened."""
+    with _logs_lock:
+        if path not in _logs:
+            try:
+                _logs[path] = ConversationLog(path)
+            except (sqlite3.Error, OSError):
+                _logs[path] = None
+        return _logs[path]
+
+
+class _ConversationSequence:
+    """List-like read access shared by ConversationStore and ConversationView (subclasses define `_length`)."""
+
+    def __len__(self):
+        return self._length()
+
+    def __bool__(self):
+        return self._length() > 0
+
+    def __iter__(self):
+        length, start = self._length(), 0
+        while start < length:
+            # Reads in pages, so iterating a long conversation never loads it all at once
+            for message in self._store._read(start, min(start + self._store.window, length)):
+                yield message
+            start += self._store.window
+
+    def __getitem__(self, item):
+        length = self._length()
+        if isinstance(item, slice):
+            start, stop, step = item.indices(length)
+            if step != 1:
+                return self[start:stop][::step]
+            return self._store._read(start, stop) if start < stop else []
+        index = item + length if item < 0 else item
+        if not 0 <= index < length:
+            raise IndexError("conversation index out of range")
+        return self._store._read(index, index + 1)[0]
+
+    def tail(self, count):
+        """The last `count` messages."""
+        return self[-count:] if count > 0 else []
+
+    def by_role(self, roles, last=None):
+        """The last `last` messages (all if None) whose role is `roles` (a role or a tuple of roles)."""
+        return self._store._by_role((roles,) if isinstance(roles, str) else tuple(roles), last, self._length())
+
+    def turn(self, number):
+        """The messages of turn `number` (turn 0 holds anything before the first user message)."""
+        return self._store._turn(number, self._length())
+
+    def fingerprint(self):
+        """Hash identifying exactly these messages (constant time)."""
+        return self._store._chain_at(self._length())
+
+    def view(self, length=None):
+        """A read-only prefix of the first `length` messages (all of them by default)."""
+        own = self._length()
+        return ConversationView(self._store, own if length is None else max(min(length, own), 0))
+
+
+class ConversationStore(_ConversationSequence):
+    def __init__(self, channel='history', session_id=None, window=DEFAULT_WINDOW, log=None):
+        self.channel = channel
+        self.session_id = session_id or uuid.uuid4().hex
+        self.window = window
+        self._log = log if log is not None else get_conversation_log()
+        self._lock = threading.Lock()
+        self._store = self
+        self._recent = []  # the last `window` messages (all messages without a log)
+        self._meta = []    # (turn, chain hash) of each message in self._recent
+        self._offset = 0   # index of self._recent[0]
+        self._count = 0
+        self._current_turn = 0
+
+    @classmethod
+    def resume(cls, session_id, channel='history', window=DEFAULT_WINDOW, log=None):
+        """
+        Rebuilds the store of an earlier session from the log. Only the last `window` messages are read;
+        older ones stay on disk. Returns None without a log.
+        """
+        store = cls(channel, session_id=session_id, window=window, log=log)
+        if store._log is None:
+            return None
+        store._recent, store._meta, store._count = store._log.tail(session_id, channel, window)
+        store._offset = store._count - len(store._recent)
+        store._current_turn = store._meta[-1][0] if store._meta else 0
+        return store
+
+    def _length(self):
+        return self._count
+
+    @property
+    def current_turn(self):
+        return self._current_turn
+
+    def append(self, message):
+        with self._lock:
+            if message.get('role') == 'user':
+                self._current_turn += 1
+            chain = _chain(self._chain_at_locked(self._count), message)
+            if self._log is not None:
+                self._log.append(self.session_id, self.channel, self._count, self._current_turn, message, chain)
+            self._recent.append(dict(message))
+            self._meta.append((self._current_turn, chain))
+            self._count += 1
+            if self._log is not None and len(self._recent) > self.window:
+                # Spilled: older messages are read back from the log when needed
+                drop = len(self._recent) - self.window
+                del self._recent[:drop]
+                del self._meta[:drop]
+                self._offset += drop
+
+    # -------------------------------------------------------------------------
+    # Reads (window first, log for older messages)
+    # -------------------------------------------------------------------------
+
+    def _read(self, start, stop):
+        with self._lock:
+            if start >= self._offset:
+                return [dict(m) for m in self._recent[start - self._offset:stop - self._offset]]
+            offset, recent = self._offset, [dict(m) for m in self._recent[:max(stop - self._offset, 0)]]
+        return self._log.read(self.session_id, self.channel, start, min(stop, offset)) + recent
+
+    def _by_role(self, roles, last, stop):
+        with self._lock:
+            in_window = [dict(m) for m in self._recent[:max(stop - self._offset, 0)] if m.get('role') in roles]
+            covers_all = self._offset == 0
+        if covers_all or (last is not None and len(in_window) >= last):
+            if last is None:
+                return in_window
+            return in_window[-last:] if last > 0 else []
+        return self._log.by_role(self.session_id, self.channel, roles, stop, last)
+
+    def _turn(self, number, stop):
+        with self._lock:
+            limit = max(stop - self._offset, 0)
+            # The whole turn is in the window if the window starts in an earlier turn (or at the beginning)
+            in_window = self._offset == 0 or (self._meta and self._meta[0][0] < number)
+            if in_window:
+                return [dict(m) for m, (turn, _) in zip(self._recent[:limit], self._meta[:limit]) if turn == number]
+        return self._log.turn(self.session_id, self.channel, number, stop)
+
+    def _chain_at_locked(self, length):
+        if length == 0:
+            return ""
+        if length - 1 >= self._offset:
+            return self._meta[length - 1 - self._offset][1]
+        return self._log.chain(self.session_id, self.channel, length - 1) or ""
+
+    def _chain_at(self, length):
+        with self._lock:
+            if length == 0 or length - 1 >= self._offset:
+                return self._chain_at_locked(length)
+        return self._log.chain(self.session_id, self.channel, length - 1) or ""
+
+
+class ConversationView(_ConversationSequence):
+    def __init__(self, store, length):
+        self._store = store
+        self._frozen_length = length
+
+    def _length(self):
+        return self._frozen_length
@@ -1,7 +1,11 @@
 # utils/conversation_utils.py
 
 import re
-import streamlit as st
+import time
+
+from utils.instrumentation import PipelineMetrics
+from utils.tracing import traced
+from utils.turn_context import TurnContext
 
 class ConversationManager:
     """
@@ -20,28 +24,50 @@ class ConversationManager:
     information like risk reports, and gets a response from AgentZero. This response is cleaned up, saved to 
     the chat history, and shown to the user, making sure the conversation feels smooth and on-topic.
 
+    By default AgentZero's response is streamed into the chat message token by token; the cleaned full text
+    is stored in the chat history once generation finishes, and the time-to-first-token is recorded.
+
+    Summaries are obtained through a per-turn TurnContext, so a summary already computed earlier in the turn
+    is reused instead of triggering another summarizer call.
+
+    The manager no longer touches Streamlit: it reads and appends to the session state mapping it is given
+    and shows the response through a TurnOutput (see `engine.output`), so it also runs headless.
+
     Attributes:
-    - None specific to this class; it relies on session state for data storage.
+    - state: The session state mapping ('messages', 'conversation_history', 'report_summaries').
+    - output: The TurnOutput the assistant message is rendered to.
 
     Methods:
     - conversation: Manages the chat flow by combining user input, reports, and agent responses, cleaning 
       the output, and saving it to the chat history for seamless interaction.
     """
 
-    def __init__(self, agent_zero, agent_summarizer, num_messages=3, num_reports=3):
+    def __init__(self, agent_zero, agent_summarizer, num_messages=3, num_reports=3, stream=True, metrics=None,
+                 state=None, output=None):
         self.agent_zero = agent_zero
         self.agent_summarizer = agent_summarizer
         self.num_messages = num_messages
         self.num_reports = num_reports
-        
-
-    def conversation(self, user_input, **kwargs):
+        self.stream = stream
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+        self.state = state if state is not None else {}
+        if output is None:
+            from engine.output import TurnOutput  # the engine package builds on this module
+            output = TurnOutput()
+        self.output = output
+
+    @traced('agent')
+    def conversation(self, user_input, turn_context=None, **kwargs):
         """
         Handles the chat flow by combining user input with context and generating a response from AgentZero.
 
         Parameters:
         - user_input (str): The user's input to the system.
+        - turn_context (TurnContext): Optional per-turn context holding memoized summaries. If omitted, a
+          context is created for this call.
         - kwargs (dict): Optional additional arguments such as:
+          - conversation_summary: Conversation summary already computed this turn.
+          - reports_summary: Reports summary already computed this turn.
           - report_summaries: List of past report summaries.
           - risk_profile_report: The latest risk profile report.
           - fundamentals_report: Fundamentals report of a stock.
@@ -50,21 +76,25 @@ class ConversationManager:
         Returns:
         - str: The assistant's response.
         """
-        # Summarize conversation history
-        conversation_summary = self.agent_summarizer.summarize_conversation(
-            st.session_state['conversation_history'],
-            num_messages=self.num_messages
-        )
-
-        # Summarize reports if provided
-        report_summaries = kwargs.get('report_summaries', [])
-        if 'report_summaries' in st.session_state:
-            report_summaries.extend(st.session_state['report_summaries'])
-
-        reports_summary = self.agent_summarizer.summarize_reports(
-            report_summaries,
-            num_reports=self.num_reports
-        ) if report_summaries else None
+        if turn_context is None:
+            report_summaries = list(kwargs.get('report_summaries', []))
+            report_summaries.extend(self.state.get('report_summaries', []))
+            turn_context = TurnContext(
+                self.agent_summarizer,
+                self.state['conversation_history'],
+                report_summaries,
+                num_messages=self.num_messages,
+                num_reports=self.num_reports
+            )
+
+        # Reuse the summaries computed earlier in the turn; only summarize what is missing
+        conversation_summary = kwargs.get('conversation_summary')
+        if conversation_summary is None:
+            conversation_summary = turn_context.summarize_conversation()
+
+        reports_summary = kwargs.get('reports_summary')
+        if reports_summary is None:
+            reports_summary = turn_context.summarize_reports()
 
         # Extract additional context from kwargs
         risk_profile_report = kwargs.get('risk_profile_report')
@@ -73,24 +103,59 @@ class ConversationManager:
 
         radar_chart_note = kwargs.get('radar_chart_note', None)
 
-        # Generate assistant response with summarized context
-        assistant_response = self.agent_zero.generate_response(
-            user_input,
+        response_context = dict(
             conversation_summary=conversation_summary,
             reports_summary=reports_summary,
             risk_profile_report=risk_profile_report,
             fundamentals_report=fundamentals_report,
             price_chart_note=price_chart_note,
-            radar_chart_note=radar_chart_note
+            radar_chart_note=radar_chart_note,
+            turn_context=turn_context
         )
 
-        # Clean up the response
-        assistant_response = re.sub(r"[\n\n]+", "\n\n", assistant_response).strip()
-        st.session_state['messages'].append({"role": "assistant", "content": assistant_response})
-        with st.chat_message("assistant"):
-            st.markdown(assistant_response)
+        with self.output.assistant_message() as message:
+            if self.stream:
+                # Stream tokens into the chat message as they arrive
+                assistant_response = self._stream_response(user_input, response_context, message)
+            else:
+                # Generate assistant response with summarized context
+                with self.metrics.timer('agent_zero.generate'):
+                    assistant_response = self.agent_zero.generate_response(user_input, **response_context)
+                assistant_response = self._clean_response(assistant_response)
+                message.update(assistant_response)
+
+        self.state['messages'].append({"role": "assistant", "content": assistant_response})
 
         # Append Agent Zero's response to conversation history
-        st.session_state['conversation_history'].append({"role": "assistant", "content": assistant_response})
+        self.state['conversation_history'].append({"role": "assistant", "content": assistant_response})
+
+        return assistant_response
 
+    @staticmethod
+    def _clean_response(assistant_response):
+        # Clean up the response
+        return re.sub(r"[\n\n]+", "\n\n", assistant_response).strip()
+
+    def _stream_response(self, user_input, response_context, message):
+        """
+        Renders AgentZero's response token by token into the assistant message, records the
+        time-to-first-token and total generation time, and returns the cleaned full text.
+        """
+        chunks = []
+        start = time.perf_counter()
+        time_to_first_token = None
+
+        for chunk in self.agent_zero.stream_response(user_input, **response_context):
+            if time_to_first_token is None:
+                time_to_first_token = time.perf_counter() - start
+                self.metrics.record_timing('agent_zero.time_to_first_token', time_to_first_token)
+            chunks.append(chunk)
+            message.update("".join(chunks) + "▌")
+
+        self.metrics.record_timing('agent_zero.generate', time.perf_counter() - start)
+
+        assistant_response = self._clean_response("".join(chunks))
+        message.update(assistant_response)
+        if time_to_first_token is not None:
+            message.caption(f"First token after {time_to_first_token:.2f}s")
         return assistant_response
@@ -0,0 +1,150 @@
+# utils/dag_executor.py
+
+"""
+🕸️ DagExecutor Class - Concurrent Execution of Pipeline Steps
+--------------------------------------------------------------
+Technical Overview:
+The README describes AVA as a DAG of agents, yet a turn used to run every step one after the other. The
+DagExecutor runs each turn's steps as a small directed acyclic graph. Each node declares the nodes it
+depends on and receives their results as keyword arguments. A node is submitted to a thread pool as soon as
+all of its inputs are available, so independent steps overlap. For example, the reports summary can run
+while AgentOne classifies, and yfinance data for a fast-path request can be fetched while the conversation
+summary is produced. Nodes can only depend on nodes added before them, which keeps the graph acyclic by
+construction.
+
+Worker threads are attached to the Streamlit script-run context of the calling thread, so nodes may still
+read `st.session_state` or emit elements. Each node runs in a copy of the caller's context variables, so its
+trace span nests under the turn being traced. After each run the executor reports per-node timings and the
+critical path: the chain of dependent nodes that determined the turn's wall-clock time. Both are recorded in
+PipelineMetrics (`dag.<node>`, `dag.wall`, `dag.critical_path`).
+
+In Simple Terms:
+Instead of doing every step of a turn in a queue, AVA now starts each step as soon as everything it needs is
+ready, doing unrelated steps side by side. It also notes which chain of steps the user actually had to wait
+for, so we know what to speed up next.
+
+Methods:
+- add_node: Registers a step, its function and the steps it depends on.
+- run: Executes the graph and returns a dictionary of node results.
+"""
+
+import contextvars
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils.instrumentation import PipelineMetrics
+from utils.tracing import trace_span
+
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:  # outside Streamlit, or an older release
+    add_script_run_ctx = get_script_run_ctx = None
+
+DagNode = namedtuple('DagNode', ['name', 'func', 'inputs'])
+DagRun = namedtuple('DagRun', ['results', 'spans', 'critical_path', 'wall_seconds'])
+
+
+def _attach_script_run_ctx(ctx):
+    if ctx is not None and add_script_run_ctx is not None:
+        add_script_run_ctx(threading.current_thread(), ctx)
+
+
+class DagExecutor:
+    def __init__(self, max_workers=4, metrics=None):
+        self.max_workers = max_workers
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+        self._nodes = {}
+        self.last_run = None
+
+    def add_node(self, name, func, inputs=()):
+        """
+        Registers a node. `func` is called with one keyword argument per input node, holding that node's result.
+        """
+        if name in self._nodes:
+            raise ValueError(f"Node '{name}' is already registered.")
+        missing = [dependency for dependency in inputs if dependency not in self._nodes]
+        if missing:
+            raise ValueError(f"Node '{name}' depends on unknown node(s): {', '.join(missing)}.")
+        self._nodes[name] = DagNode(name, func, tuple(inputs))
+        return self
+
+    def _run_node(self, node, kwargs):
+        start = time.perf_counter()
+        with trace_span(node.name, 'pipeline', inputs=list(node.inputs)):
+            result = node.func(**kwargs)
+        return result, start, time.perf_counter()
+
+    def run(self):
+        """
+        Executes all nodes, each as soon as its inputs are ready. An exception raised by a node cancels the
+        nodes not yet started and is re-raised once the running ones have finished.
+
+        Returns:
+            dict: Node name -> result.
+        """
+        results, spans = {}, {}
+        pending = dict(self._nodes)
+        running = {}
+        ctx = get_script_run_ctx() if get_script_run_ctx is not None else None
+        run_start = time.perf_counter()
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='ava-dag',
+            initializer=_attach_script_run_ctx,
+            initargs=(ctx,)
+        ) as pool:
+            while pending or running:
+                for name, node in list(pending.items()):
+                    if all(dependency in results for dependency in node.inputs):
+                        kwargs = {dependency: results[dependency] for dependency in node.inputs}
+                        context = contextvars.copy_context()
+                        running[pool.submit(context.run, self._run_node, node, kwargs)] = name
+                        del pending[name]
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        result, start, end = future.result()
+                    except Exception:
+                        pending.clear()
+                        for other in running:
+                            other.cancel()
+                        raise
+                    results[name] = result
+                    spans[name] = (start - run_start, end - run_start)
+
+        wall_seconds = time.perf_counter() - run_start
+        critical_path = self._critical_path(spans)
+        self.last_run = DagRun(results, spans, critical_path, wall_seconds)
+        self._record_metrics()
+        return results
+
+    def _critical_path(self, spans):
+        """Walks back from the last node to finish, always through the input that finished last."""
+        if not spans:
+            return []
+        name = max(spans, key=lambda node_name: spans[node_name][1])
+        path = []
+        while name is not None:
+            start, end = spans[name]
+            path.append((name, end - start))
+            inputs = self._nodes[name].inputs
+            name = max(inputs, key=lambda node_name: spans[node_name][1]) if inputs else None
+        return list(reversed(path))
+
+    def _record_metrics(self):
+        run = self.last_run
+        for name, (start, end) in run.spans.items():
+            self.metrics.record_timing(f"dag.{name}", end - start)
+        self.metrics.record_timing('dag.wall', run.wall_seconds)
+        self.metrics.record_timing('dag.critical_path', sum(seconds for _, seconds in run.critical_path))
+
+    def describe_critical_path(self):
+        """Human-readable critical path of the last run, e.g. 'conversation_summary (1.20s) → classification (0.80s)'."""
+        if not self.last_run:
+            return ""
+        return " → ".join(f"{name} ({seconds:.2f}s)" for name, seconds in self.last_run.critical_path)
@@ -0,0 +1,345 @@
+# utils/fast_path_router.py
+
+"""
+⚡ FastPathRouter Class - Deterministic Intent Routing Ahead of AgentOne
+-----------------------------------------------------------------------
+Technical Overview:
+Many data requests are unambiguous: "price chart AAPL 1y", "compare NVDA AMD 6mo", "PE of TSLA". The
+FastPathRouter classifies those locally with rules and a lexicon, without calling a model. The lexicon maps
+tickers and company names to tickers and is built once per process from `data/equity_list.csv` and
+`data/pe_div_yield_table.csv`. Periods are the yfinance periods in `KNOWN_PERIODS` plus common phrasings
+("6 months", "past year"), and metrics are the user-facing names in `FundamentalsManager.FUNDAMENTALS_MAP`.
+The router emits the same dictionary shape AgentOne produces, together with a confidence score. Anything
+that looks like advice, opinion, a table or radar request, an unrecognized period, or a long request with
+many unexplained words gets a low score (or no result), and IntentClassifier falls back to the LLM.
+
+Tickers are recognized when written in capitals (or with a `$` prefix) or when a company name, e.g. "apple"
+or "nvidia", is mentioned; lowercase words are never read as tickers, so "all", "now" or "on" stay words.
+The first word of a longer company name (e.g. "Horizon" for Horizon Therapeutics) only counts when it is
+capitalized in the input, so "my horizon" stays a phrase. A period alone is not a chart request: charts need
+chart or comparison wording ("chart", "price", "compare", "vs"...).
+
+In Simple Terms:
+For simple requests like "show me a chart of AAPL for 1 year", AVA no longer has to ask AgentOne what the
+user wants; a quick lookup works it out instantly. Anything less clear-cut still goes to AgentOne.
+
+Methods:
+- route: Returns (evaluation dictionary or None, confidence).
+- mentions: Returns the tickers, period and kind of data mentioned in any input (for speculative prefetch).
+"""
+
+import csv
+import re
+import threading
+
+from utils.classification_cache import REQUEST_VOCABULARY
+from utils.price_chart_manager import KNOWN_PERIODS
+from utils.single_stock_fundamentals import FundamentalsManager
+
+LEXICON_FILES = ('data/equity_list.csv', 'data/pe_div_yield_table.csv')
+
+# Inputs mentioning any of these need judgement (advice, opinions, tables, radar charts): leave them to AgentOne
+_LLM_ONLY_WORDS = frozenset("""
+should buy sell invest investing investment recommend recommendation advice advise portfolio risk think
+opinion why hold worth good better best undervalued overvalued table radar dividend dividends yield theme
+sector risky safe news predict forecast
+""".split())
+
+_CHART_PATTERN = re.compile(r"\b(chart|charts|graph|plot|trend|history|historical|performance|performed|price|prices|trading)\b")
+_COMPARE_PATTERN = re.compile(r"\b(compare|comparison|vs|versus|against|relative to)\b")
+_FUNDAMENTALS_PATTERN = re.compile(r"\b(fundamentals?|financials|overview|stats|statistics|tell me about|info(?:rmation)? (?:on|about))\b")
+
+_RADAR_PATTERN = re.compile(r"\b(radar|dividends?|yield|valuation|metrics?)\b")
+
+_UNIT_PATTERN = re.compile(r"\b(\d+)\s*-?\s*(d|day|days|w|wk|wks|week|weeks|mo|mos|month|months|y|yr|yrs|year|years)\b")
+_PHRASE_PERIODS = (
+    (re.compile(r"\b(today|intraday)\b"), '1d'),
+    (re.compile(r"\b(?:this|past|last|a|the) week\b"), '5d'),
+    (re.compile(r"\b(?:this|past|last|a|the) month\b"), '1mo'),
+    (re.compile(r"\b(?:this|past|last|a|the) quarter\b"), '3mo'),
+    (re.compile(r"\b(?:this|past|last|a|the) year\b"), '1y'),
+    (re.compile(r"\b(all[ -]time|max|maximum)\b"), 'max'),
+)
+# Period words the router cannot map onto KNOWN_PERIODS (e.g. "ytd", "2 years"); their presence lowers confidence
+_UNRESOLVED_PERIOD_PATTERN = re.compile(r"\b(ytd|year to date|since|decade|weeks?|months?|years?|days?|quarters?)\b")
+
+_TOKEN_PATTERN = re.compile(r"\$?[A-Za-z0-9][A-Za-z0-9.&'/-]*")
+
+# Trailing corporate words stripped from company names before they are used as aliases
+_NAME_SUFFIXES = frozenset("""
+inc inc. ltd ltd. limited plc corp corp. corporation co co. co/the company nv ag sa se group holdings holding
+a b class the
+""".split())
+
+# First words that are too generic to stand for a company on their own
+_GENERIC_FIRST_WORDS = frozenset("""
+american general first united national international global new china south north east west african
+bank capital energy financial royal standard the great
+""".split())
+
+# Upper-case words that are not meant as tickers even if some exchange lists them
+_NON_TICKER_WORDS = frozenset("I A AI US USA CEO ETF USD EPS PE PS YTD OK IPO".split())
+
+
+def _period_from_units(number, unit):
+    unit = unit[0] if unit not in ('mo', 'mos', 'month', 'months') else 'm'
+    if unit == 'd':
+        return {1: '1d', 5: '5d'}.get(number)
+    if unit == 'w':
+        return '5d' if number == 1 else None
+    if unit == 'm':
+        return {1: '1mo', 3: '3mo', 6: '6mo', 12: '1y', 60: '5y'}.get(number)
+    return {1: '1y', 5: '5y'}.get(number)
+
+
+def _metric_aliases():
+    """(regex, user-facing metric) pairs, longest first, for the metric names FundamentalsManager understands."""
+    fundamentals_map = FundamentalsManager.FUNDAMENTALS_MAP
+
+    # The name emitted for each yfinance key must survive FundamentalsManager's normalization
+    emitted = {}
+    for key, yf_key in fundamentals_map.items():
+        if " " not in key:
+            emitted.setdefault(yf_key, key)
+
+    aliases = []
+    for key, yf_key in fundamentals_map.items():
+        if yf_key == 'currentPrice':
+            # "price" means a price chart to AgentOne; leave it to the chart rules
+            continue
+        words = [re.escape(word) for word in key.split()]
+        pattern = re.compile(r"(?<![\w/])" + r"[\s-]*".join(words) + r"(?:\s*ratio)?(?![\w/])")
+        aliases.append((len(key), pattern, emitted[yf_key]))
+    aliases.sort(key=lambda alias: alias[0], reverse=True)
+    return [(pattern, metric) for _, pattern, metric in aliases]
+
+
+class FastPathRouter:
+    def __init__(self, lexicon_files=LEXICON_FILES, confidence_threshold=0.8):
+        self.lexicon_files = lexicon_files
+        self.confidence_threshold = confidence_threshold
+        self._lock = threading.Lock()
+        self._tickers = None
+        self._names = None
+        self._first_words = frozenset()
+        self._max_name_words = 1
+        self._metrics = _metric_aliases()
+
+    # -------------------------------------------------------------------------
+    # Lexicon
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _simplify_name(name):
+        words = re.sub(r"[,()]", " ", name.lower()).split()
+        while len(words) > 1 and words[-1] in _NAME_SUFFIXES:
+            words.pop()
+        if words and words[0].endswith(".com"):
+            words[0] = words[0][:-4]
+        return words
+
+    def _ensure_lexicon(self):
+        if self._tickers is not None:
+            return
+
+        with self._lock:
+            if self._tickers is not None:
+                return
+
+            tickers, names, first_words = set(), {}, {}
+            for path in self.lexicon_files:
+                try:
+                    with open(path, newline='', encoding='utf-8-sig') as f:
+                        for row in csv.DictReader(f):
+                            ticker = (row.get('ticker') or '').strip()
+                            if not ticker:
+                                continue
+                            tickers.add(ticker)
+                            words = self._simplify_name(row.get('name') or '')
+                            if not words:
+                                continue
+                            names.setdefault(" ".join(words), ticker)
+                            if len(words) > 1 and len(words[0]) >= 4 and words[0] not in _GENERIC_FIRST_WORDS:
+                                first_words.setdefault(words[0], set()).add(ticker)
+                except (OSError, csv.Error):
+                    # Without a lexicon only explicit $TICKER mentions are recognized
+                    continue
+
+            # A first word is an alias only if it points to exactly one ticker and is not a full name itself
+            aliases = set()
+            for word, word_tickers in first_words.items():
+                if len(word_tickers) == 1 and word not in names and word not in REQUEST_VOCABULARY:
+                    names[word] = next(iter(word_tickers))
+                    aliases.add(word)
+
+            self._first_words = frozenset(aliases)
+            self._names = names
+            self._max_name_words = max((len(name.split()) for name in names), default=1)
+            self._tickers = tickers
+
+    def _find_tickers(self, user_input):
+        """Returns [(position, ticker)] for tickers and company names mentioned, plus the consumed word positions."""
+        found, consumed = [], set()
+        tokens = _TOKEN_PATTERN.findall(user_input)
+
+        for position, token in enumerate(tokens):
+            symbol = token.rstrip(".,'")
+            if symbol.startswith('$') and len(symbol) > 1:
+                found.append((position, symbol[1:].upper()))
+                consumed.add(position)
+            elif symbol in self._tickers and symbol not in _NON_TICKER_WORDS and (symbol.isupper() or '.' in symbol):
+                found.append((position, symbol))
+                consumed.add(position)
+
+        words = [token.lower().rstrip(".,'?!").removesuffix("'s") for token in tokens]
+        position = 0
+        while position < len(words):
+            for size in range(min(self._max_name_words, len(words) - position), 0, -1):
+                if any(p in consumed for p in range(position, position + size)):
+                    continue
+                name = " ".join(words[position:position + size])
+                ticker = self._names.get(name)
+                if ticker and name in self._first_words and not tokens[position][:1].isupper():
+                    # First-word aliases are ordinary words unless written as a name
+                    ticker = None
+                if ticker:
+                    found.append((position, ticker))
+                    consumed.update(range(position, position + size))
+                    position += size - 1
+                    break
+            position += 1
+
+        found.sort()
+        tickers = []
+        for _, ticker in found:
+            if ticker not in tickers:
+                tickers.append(ticker)
+        return tickers, {words[p] for p in consumed}
+
+    # -------------------------------------------------------------------------
+    # Periods and metrics
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _find_period(text):
+        """Returns (period or None, unresolved) where unresolved flags a period the router cannot express."""
+        for token in text.split():
+            if token in KNOWN_PERIODS:
+                return token, False
+
+        match = _UNIT_PATTERN.search(text)
+        if match:
+            period = _period_from_units(int(match.group(1)), match.group(2))
+            return period, period is None
+
+        for pattern, period in _PHRASE_PERIODS:
+            if pattern.search(text):
+                return period, False
+
+        return None, bool(_UNRESOLVED_PERIOD_PATTERN.search(text))
+
+    def _find_metrics(self, text):
+        metrics = []
+        for pattern, metric in self._metrics:
+            if pattern.search(text):
+                text = pattern.sub(" ", text)
+                if metric not in metrics:
+                    metrics.append(metric)
+        return metrics, text
+
+    # -------------------------------------------------------------------------
+    # Routing
+    # -------------------------------------------------------------------------
+
+    def route(self, user_input):
+        """
+        Classifies unambiguous data requests without a model call.
+
+        Returns:
+            tuple: (evaluation_dict, confidence). evaluation_dict is None when the router has no answer;
+                   callers should only trust it when confidence reaches `confidence_threshold`.
+        """
+        self._ensure_lexicon()
+
+        text = " ".join(re.findall(r"[a-z0-9$./&'-]+", user_input.lower()))
+        words = set(word.strip(".,'?!") for word in text.split())
+        if not text or words & _LLM_ONLY_WORDS:
+            return None, 0.0
+
+        tickers, name_words = self._find_tickers(user_input)
+        if not tickers:
+            return None, 0.0
+
+        metrics, remaining = self._find_metrics(text)
+        period, period_unresolved = self._find_period(remaining)
+        wants_chart = bool(_CHART_PATTERN.search(remaining))
+        wants_comparison = bool(_COMPARE_PATTERN.search(remaining))
+        wants_fundamentals = bool(_FUNDAMENTALS_PATTERN.search(remaining))
+
+        if metrics and not wants_chart and not period:
+            if len(tickers) != 1:
+                return None, 0.0  # metrics across several stocks is a radar chart; AgentOne decides its shape
+            evaluation_dict, confidence = {'fundamentals': tickers, 'fundamentals_type': ", ".join(metrics)}, 0.9
+        elif wants_chart or wants_comparison:
+            # A period alone ("for 5 years") is not a chart request
+            if len(tickers) >= 2:
+                evaluation_dict = {'compare_price_chart': tickers + ([period] if period else [])}
+            elif wants_comparison:
+                return None, 0.0
+            else:
+                evaluation_dict = {'price_chart': tickers + ([period] if period else [])}
+            confidence = 0.9
+        elif wants_fundamentals and len(tickers) == 1:
+            evaluation_dict, confidence = {'fundamentals': tickers}, 0.85
+        else:
+            return None, 0.0
+
+        if period_unresolved:
+            confidence -= 0.3
+
+        # Many words the router did not account for suggest a more nuanced request
+        unexplained = [
+            word for word in re.findall(r"[a-z]+", remaining)
+            if word not in REQUEST_VOCABULARY and word not in name_words and len(word) > 2
+            and not _CHART_PATTERN.fullmatch(word) and not _COMPARE_PATTERN.fullmatch(word)
+            and not _FUNDAMENTALS_PATTERN.fullmatch(word)
+        ]
+        unexplained = [word for word in unexplained if word.upper() not in tickers]
+        if len(unexplained) > 4:
+            confidence -= 0.1 * (len(unexplained) - 4)
+
+        return evaluation_dict, round(max(confidence, 0.0), 2)
+
+    def mentions(self, user_input):
+        """
+        Tickers (including company names) and the period mentioned in `user_input`, whatever the request is.
+        Used to guess which market data a request will need before it has been classified.
+
+        Returns:
+            dict: 'tickers' (list), 'period' (or None), 'chart' (chart, comparison or period wording) and
+                  'metrics' (metric, fundamentals or radar wording).
+        """
+        self._ensure_lexicon()
+        text = " ".join(re.findall(r"[a-z0-9$./&'-]+", user_input.lower()))
+        tickers, _ = self._find_tickers(user_input)
+        metrics, remaining = self._find_metrics(text)
+        period, _ = self._find_period(remaining)
+        return {
+            'tickers': tickers,
+            'period': period,
+            'chart': bool(period or _CHART_PATTERN.search(remaining) or _COMPARE_PATTERN.search(remaining)),
+            'metrics': bool(metrics or _FUNDAMENTALS_PATTERN.search(remaining) or _RADAR_PATTERN.search(text)),
+        }
+
+
+_shared_router = None
+_shared_router_lock = threading.Lock()
+
+
+def get_fast_path_router():
+    """Process-wide router instance (the lexicon is built once)."""
+    global _shared_router
+    with _shared_router_lock:
+        if _shared_router is None:
+            _shared_router = FastPathRouter()
+        return _shared_router
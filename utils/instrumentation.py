@@ -0,0 +1,82 @@
+# utils/instrumentation.py
+
+"""
+📏 PipelineMetrics Class - Lightweight Counters and Timings for the Agent Pipeline
+----------------------------------------------------------------------------------
+Technical Overview:
+PipelineMetrics keeps named counters and named timing series for a single user session. Timings are stored
+as running aggregates (count, total, max, last) so the memory footprint does not grow with the length of the
+session. The backing store is a plain dictionary supplied by the caller, which lets main.py bind it to
+`st.session_state` so that metrics survive Streamlit reruns, while other callers can use a throwaway dict.
+Updates are guarded by a lock because pipeline steps may run concurrently (see DagExecutor).
+
+In Simple Terms:
+PipelineMetrics is a tally sheet. Every time the pipeline does something worth measuring it adds a tick or a
+stopwatch reading, and the sidebar can show the totals so we can see where time goes.
+
+Methods:
+- increment: Adds to a named counter.
+- record_timing: Adds a duration (seconds) to a named timing series.
+- timer: Context manager that times a block and records it.
+- record_breakdown: Keeps the latest breakdown (e.g. prompt tokens per section) under a name.
+- snapshot: Returns a copy of all counters, timing aggregates and breakdowns.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PipelineMetrics:
+    def __init__(self, store=None):
+        self.store = store if store is not None else {}
+        self.store.setdefault('counters', {})
+        self.store.setdefault('timings', {})
+        self.store.setdefault('breakdowns', {})
+        # Kept in the store so every PipelineMetrics bound to the same session dict shares one lock
+        self._lock = self.store.setdefault('lock', threading.Lock())
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            counters = self.store['counters']
+            counters[name] = counters.get(name, 0) + amount
+
+    def get_counter(self, name):
+        return self.store['counters'].get(name, 0)
+
+    def record_timing(self, name, seconds):
+        with self._lock:
+            timing = self.store['timings'].setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0, 'last': 0.0})
+            timing['count'] += 1
+            timing['total'] += seconds
+            timing['max'] = max(timing['max'], seconds)
+            timing['last'] = seconds
+
+    def get_timing(self, name):
+        return self.store['timings'].get(name)
+
+    def record_breakdown(self, name, breakdown):
+        with self._lock:
+            self.store['breakdowns'][name] = dict(breakdown)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_timing(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': dict(self.store['counters']),
+                'timings': {name: dict(values) for name, values in self.store['timings'].items()},
+                'breakdowns': {name: dict(values) for name, values in self.store['breakdowns'].items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self.store['counters'].clear()
+            self.store['timings'].clear()
+            self.store['breakdowns'].clear()
@@ -0,0 +1,119 @@
+# utils/intent_classifier.py
+
+"""
+🏷️ IntentClassifier Class - Cached Front Door to AgentOne
+----------------------------------------------------------
+Technical Overview:
+IntentClassifier is the single place where a turn gets classified. Unambiguous data requests are answered by
+the deterministic FastPathRouter when its confidence reaches the router's threshold, unless the user is
+answering a risk-profile question the previous turn asked. Otherwise it consults
+the semantic ClassificationCache, unless the turn is context dependent, and falls back to `AgentOne.evaluate_input` on a
+miss. The LLM response is parsed with `parse_agent_response`, and context-free classifications are written
+back to the cache. Per-session counters record fast-path hits and fallbacks as well as cache hits, misses
+and bypasses. Each hit also records the
+latency it saved, estimated as the session's average AgentOne latency minus the lookup time.
+
+In Simple Terms:
+Simple requests like "price chart AAPL 1y" are recognized instantly by a lookup. For the rest, before
+asking AgentOne what the user wants, the classifier checks whether it has already seen a request like this one. If so it answers straight away; otherwise it asks AgentOne and remembers the answer.
+
+Methods:
+- route: Returns the fast-path classification as (raw text, dictionary, 'fast_path'), or None.
+- classify: Returns (raw evaluation text, parsed evaluation dictionary, source).
+"""
+
+import json
+import time
+
+from utils.instrumentation import PipelineMetrics
+from utils.response_parsing import parse_agent_response
+from utils.tracing import trace_span
+
+
+class IntentClassifier:
+    def __init__(self, agent_one, cache=None, metrics=None, router=None):
+        self.agent_one = agent_one
+        self.cache = cache
+        self.router = router
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+
+    def _average_llm_latency(self):
+        timing = self.metrics.get_timing('agent_one.evaluate_input')
+        if not timing or not timing['count']:
+            return None
+        return timing['total'] / timing['count']
+
+    def route(self, user_input, awaiting_answer=False):
+        """
+        Tries the fast-path router only. It needs no conversation summary, so callers can learn the intent
+        before the summary is ready. A turn answering a risk-profile question (`awaiting_answer`) is left to
+        AgentOne: "My horizon is 5 years" is a profile answer, whatever the words alone suggest. Everything else
+        is up to the router's confidence and ticker checks.
+
+        Returns:
+            tuple or None: (evaluation_response, evaluation_dict, 'fast_path') when the router is confident.
+        """
+        if self.router is None:
+            return None
+        if awaiting_answer:
+            self.metrics.increment('fast_path.skipped')
+            return None
+
+        with self.metrics.timer('fast_path.route'), trace_span('fast_path.route', 'classify') as span:
+            routed, confidence = self.router.route(user_input)
+            hit = routed is not None and confidence >= self.router.confidence_threshold
+            if span is not None:
+                span.attributes.update(hit=hit, confidence=confidence)
+        if hit:
+            self.metrics.increment('fast_path.hits')
+            return json.dumps(routed), routed, 'fast_path'
+        self.metrics.increment('fast_path.fallbacks')
+        return None
+
+    def classify(self, user_input, conversation_summary=None, awaiting_answer=False, fast_path=True):
+        """
+        Classifies the user input. Pass fast_path=False when `route` has already been tried for this input, and
+        awaiting_answer=True when the previous turn asked the user a question the input likely answers.
+
+        Returns:
+            tuple: (evaluation_response, evaluation_dict, source) where source is 'fast_path', 'cache' or 'agent_one'.
+        """
+        if fast_path:
+            routed = self.route(user_input, awaiting_answer)
+            if routed is not None:
+                return routed
+
+        use_cache = (
+            self.cache is not None
+            and self.cache.available is not False
+            and not self.cache.is_context_dependent(user_input, awaiting_answer)
+        )
+
+        if use_cache:
+            start = time.perf_counter()
+            with trace_span('classification_cache.lookup', 'cache') as span:
+                cached = self.cache.lookup(user_input)
+                if span is not None:
+                    span.attributes['hit'] = bool(cached)
+            lookup_seconds = time.perf_counter() - start
+            if cached:
+                self.metrics.increment('classification_cache.hits')
+                average_llm_latency = self._average_llm_latency()
+                if average_llm_latency is not None:
+                    self.metrics.record_timing('classification_cache.latency_saved', max(average_llm_latency - lookup_seconds, 0.0))
+                return json.dumps(cached), cached, 'cache'
+            self.metrics.increment('classification_cache.misses')
+        elif self.cache is not None and self.cache.available is not False:
+            self.metrics.increment('classification_cache.bypassed')
+
+        with self.metrics.timer('agent_one.evaluate_input'), trace_span('AgentOne.evaluate_input', 'agent'):
+            evaluation_response = self.agent_one.evaluate_input(
+                user_input,
+                conversation_summary=conversation_summary
+            )
+        evaluation_dict = parse_agent_response(evaluation_response)
+
+        if use_cache and evaluation_dict:
+            self.cache.store(user_input, evaluation_dict)
+
+        return evaluation_response, evaluation_dict, 'agent_one'
@@ -0,0 +1,87 @@
+# utils/intent_dispatcher.py
+
+"""
+🧭 IntentDispatcher Class - Declarative Routing of AgentOne Classifications
+---------------------------------------------------------------------------
+Technical Overview:
+AgentOne returns a small dictionary such as {'investment_advice': ['R']} or {'price_chart': ['AAPL', '1y']}.
+The IntentDispatcher holds an ordered registry of intents. Each intent is registered with a matcher that
+inspects the parsed dictionary and a handler that performs the work for that intent. `dispatch` walks the
+registry once, runs the first handler whose matcher accepts the dictionary, and falls back to a default
+handler when nothing matches. Because every intent is known up front, the pipeline classifies exactly once
+per turn. Each dispatch records a hit count and the handler latency in PipelineMetrics, and runs the handler
+inside a 'handler' trace span.
+
+In Simple Terms:
+The IntentDispatcher is a switchboard. AgentOne says what kind of request the user made, and the switchboard
+connects it to the right handler, counting how often each line is used and how long each call takes.
+
+Methods:
+- register: Adds an intent with its matcher and handler (registration order is matching order).
+- set_default: Sets the handler used when no registered intent matches.
+- match: Returns the name of the intent that would handle a given evaluation dictionary.
+- dispatch: Runs the matching handler and records hit count and latency.
+- intent_key: Helper that builds a matcher for "key present in the dictionary".
+- intent_value: Helper that builds a matcher for "key present and contains a value".
+"""
+
+import time
+
+from utils.instrumentation import PipelineMetrics
+from utils.tracing import trace_span
+
+DEFAULT_INTENT = 'default'
+
+
+def intent_key(key):
+    """Matcher that accepts any evaluation dictionary containing `key`."""
+    return lambda evaluation_dict: key in evaluation_dict
+
+
+def intent_value(key, value):
+    """Matcher that accepts evaluation dictionaries where `value` is in evaluation_dict[key]."""
+    def matcher(evaluation_dict):
+        return key in evaluation_dict and value in (evaluation_dict[key] or [])
+    return matcher
+
+
+class IntentDispatcher:
+    def __init__(self, metrics=None):
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+        self._intents = []
+        self._default_handler = None
+
+    def register(self, name, matcher, handler):
+        self._intents.append((name, matcher, handler))
+        return handler
+
+    def set_default(self, handler):
+        self._default_handler = handler
+        return handler
+
+    @property
+    def intents(self):
+        return [name for name, _, _ in self._intents]
+
+    def match(self, evaluation_dict):
+        for name, matcher, handler in self._intents:
+            if matcher(evaluation_dict):
+                return name, handler
+        return DEFAULT_INTENT, self._default_handler
+
+    def dispatch(self, evaluation_dict, *args, **kwargs):
+        """
+        Runs the handler of the first intent whose matcher accepts `evaluation_dict`.
+        Extra positional and keyword arguments are passed through to the handler.
+        """
+        name, handler = self.match(evaluation_dict)
+        if handler is None:
+            return None
+
+        self.metrics.increment(f"intent.{name}.hits")
+        start = time.perf_counter()
+        try:
+            with trace_span(f"handler.{name}", 'handler'):
+                return handler(*args, **kwargs)
+        finally:
+            self.metrics.record_timing(f"intent.{name}", time.perf_counter() - start)
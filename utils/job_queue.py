@@ -0,0 +1,270 @@
+# utils/job_queue.py
+
+"""
+🧵 JobQueue Class - Background Jobs for Long-Running Work
+---------------------------------------------------------
+Technical Overview:
+Some work takes far longer than a turn should. The research report, for example, loads the companies CSV,
+writes it to SQLite and makes three Yahoo Finance calls per company. Run inside the Streamlit script, it
+blocked the session, and a rerun killed it halfway. JobQueue runs such work on a process-wide pool of
+worker threads instead:
+- A job kind is registered once with the function that does the work: `func(params, progress)` returns a
+  JSON-serialisable result and may call `progress(fraction, message)` as it goes.
+- `submit(kind, params)` returns a job ID straight away. Identical jobs (same kind and parameters) are
+  de-duplicated: while one is queued or running, submitting it again returns the same ID. With `max_age`, a
+  job that finished successfully within that many seconds is reused as well.
+- Jobs, their progress and their results are persisted in SQLite (JOB_DB_PATH). So a client can poll a job
+  by ID (`get`, or `wait` with a progress callback) from any rerun, session or request. A job whose process
+  has exited while it was queued or running is reported as failed. Jobs record their process by PID and by a
+  token drawn when the module is imported, so a restarted process that was given the same PID does not
+  mistake the jobs it never ran for its own.
+
+The work keeps running when the script that submitted it is stopped by a rerun. The next rerun finds the job
+by its ID and picks up the result. Counts of submitted, de-duplicated and reused jobs are returned by `stats`,
+and sessions also count them in their PipelineMetrics (`jobs.*`). If the database cannot be opened, jobs are
+kept in an in-memory database for the life of the process.
+
+In Simple Terms:
+Slow work is handed to helpers in the background, with a ticket number. AVA can check the ticket to see how
+far along the work is and collect the result when it is done, even after the page reloads. If the same work
+is already being done, nobody starts it a second time.
+
+Classes and Functions:
+- JobQueue: SQLite-backed job store with a worker pool, progress reporting and de-duplication.
+- job_key: Hash identifying identical jobs.
+- get_job_queue: Returns the process-wide JobQueue.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_DB_PATH = 'data/jobs.sqlite'
+DEFAULT_WORKERS = 2
+PROGRESS_INTERVAL = 0.5  # seconds between progress writes to the database
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+FINISHED = (DONE, FAILED)
+
+# Identifies this process among all processes that ever used the database (PIDs are reused)
+_PROCESS_TOKEN = uuid.uuid4().hex
+
+
+def job_key(kind, params):
+    """Hash of a job's kind and parameters; jobs with the same key do the same work."""
+    payload = json.dumps([kind, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class JobQueue:
+    def __init__(self, path=JOB_DB_PATH, workers=DEFAULT_WORKERS):
+        self.path = path
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._kinds = {}
+        self._active = {}    # job key -> ID of the queued or running job
+        self._finished = {}  # job ID -> Event set when the job finishes (jobs of this process)
+        self._executor = None
+        self._stats = {'submitted': 0, 'deduplicated': 0, 'reused': 0}
+
+        directory = os.path.dirname(path)
+        if directory and path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, kind TEXT, key TEXT, params TEXT, status TEXT, progress REAL, message TEXT,"
+            " result TEXT, error TEXT, pid INTEGER, owner TEXT, created REAL, started REAL, finished REAL)"
+        )
+        try:
+            # Databases created before jobs recorded their process token
+            self._db.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        except sqlite3.OperationalError:
+            pass
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, finished)")
+        self._db.commit()
+
+    # -------------------------------------------------------------------------
+    # Submitting
+    # -------------------------------------------------------------------------
+
+    def register(self, kind, func):
+        """Registers the function running jobs of `kind`: `func(params, progress)` returns the result."""
+        with self._lock:
+            self._kinds[kind] = func
+
+    def submit(self, kind, params=None, max_age=0, metrics=None):
+        """
+        Queues a job and returns its ID. An identical queued or running job is returned instead, as is an
+        identical job that finished successfully less than `max_age` seconds ago.
+        """
+        params = params or {}
+        key = job_key(kind, params)
+        with self._lock:
+            if kind not in self._kinds:
+                raise KeyError(f"Unknown job kind: {kind}")
+
+            job_id = self._active.get(key)
+            if job_id is not None:
+                outcome = 'deduplicated'
+            else:
+                job_id = self._recent_result(key, max_age) if max_age else None
+                outcome = 'reused' if job_id is not None else 'submitted'
+
+            if outcome == 'submitted':
+                job_id = uuid.uuid4().hex
+                self._db.execute(
+                    "INSERT INTO jobs (id, kind, key, params, status, progress, message, pid, owner, created)"
+                    " VALUES (?, ?, ?, ?, ?, 0, '', ?, ?, ?)",
+                    (job_id, kind, key, json.dumps(params, default=str), QUEUED, os.getpid(), _PROCESS_TOKEN,
+                     time.time())
+                )
+                self._db.commit()
+                self._active[key] = job_id
+                self._finished[job_id] = threading.Event()
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ava-job')
+                self._executor.submit(self._run, job_id, self._kinds[kind], key, params)
+            self._stats[outcome] += 1
+
+        if metrics is not None:
+            metrics.increment(f'jobs.{outcome}')
+        return job_id
+
+    def _recent_result(self, key, max_age):
+        # Called with the lock held
+        row = self._db.execute(
+            "SELECT id FROM jobs WHERE key = ? AND status = ? AND finished >= ? ORDER BY finished DESC LIMIT 1",
+            (key, DONE, time.time() - max_age)
+        ).fetchone()
+        return row[0] if row else None
+
+    # -------------------------------------------------------------------------
+    # Running
+    # -------------------------------------------------------------------------
+
+    def _update(self, job_id, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            self._db.commit()
+
+    def _run(self, job_id, func, key, params):
+        self._update(job_id, status=RUNNING, started=time.time())
+        last_write = [0.0]
+
+        def progress(fraction, message=''):
+            now = time.monotonic()
+            if now - last_write[0] >= PROGRESS_INTERVAL or fraction >= 1:
+                last_write[0] = now
+                self._update(job_id, progress=min(max(float(fraction), 0.0), 1.0), message=str(message))
+
+        try:
+            result = func(params, progress)
+            self._update(job_id, status=DONE, progress=1.0, result=json.dumps(result, default=str),
+                         finished=time.time())
+        except Exception as e:
+            self._update(job_id, status=FAILED, error=f"{type(e).__name__}: {e}", finished=time.time())
+        finally:
+            with self._lock:
+                self._active.pop(key, None)
+                finished = self._finished.pop(job_id, None)
+            if finished is not None:
+                finished.set()
+
+    # -------------------------------------------------------------------------
+    # Polling
+    # -------------------------------------------------------------------------
+
+    def get(self, job_id):
+        """
+        Returns the job as a dictionary ('id', 'kind', 'status', 'progress', 'message', 'result', 'error',
+        'created', 'started', 'finished'), or None if the ID is unknown.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, kind, status, progress, message, result, error, pid, owner, created, started, finished"
+                " FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(('id', 'kind', 'status', 'progress', 'message', 'result', 'error', 'pid', 'owner',
+                        'created', 'started', 'finished'), row))
+        pid, owner = job.pop('pid'), job.pop('owner')
+        orphaned = owner != _PROCESS_TOKEN and (pid == os.getpid() or not _process_alive(pid))
+        if job['status'] not in FINISHED and orphaned:
+            # Its worker went away with the process that ran it (a PID equal to ours belonged to an earlier one)
+            job.update(status=FAILED, error="Interrupted: the process running the job has exited")
+            self._update(job_id, status=FAILED, error=job['error'], finished=time.time())
+        job['result'] = json.loads(job['result']) if job['result'] is not None else None
+        return job
+
+    def wait(self, job_id, timeout=None, on_progress=None, poll_interval=0.25):
+        """
+        Waits until the job finishes or `timeout` seconds have passed, calling `on_progress(job)` whenever its
+        progress changes. Returns the job (finished or not), or None if the ID is unknown.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            finished = self._finished.get(job_id)
+        seen = None
+        while True:
+            job = self.get(job_id)
+            if job is None or job['status'] in FINISHED:
+                return job
+            if on_progress is not None and (job['status'], job['progress'], job['message']) != seen:
+                seen = (job['status'], job['progress'], job['message'])
+                on_progress(job)
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return job
+            interval = poll_interval if remaining is None else min(poll_interval, remaining)
+            if finished is not None:
+                finished.wait(interval)
+            else:
+                # Submitted by another process: poll the database
+                time.sleep(interval)
+
+    def stats(self):
+        """Returns the submitted/de-duplicated/reused counts, active jobs and jobs stored per status."""
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            return dict(self._stats, active=len(self._active), workers=self.workers,
+                        **{status: counts.get(status, 0) for status in (QUEUED, RUNNING, DONE, FAILED)})
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+_shared_queue = None
+_shared_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Process-wide job queue (persisted in JOB_DB_PATH, or in memory if that cannot be opened)."""
+    global _shared_queue
+    with _shared_queue_lock:
+        if _shared_queue is None:
+            try:
+                _shared_queue = JobQueue()
+            except (sqlite3.Error, OSError):
+                _shared_queue = JobQueue(':memory:')
+        return _shared_queue
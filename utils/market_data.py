@@ -0,0 +1,214 @@
+# utils/market_data.py
+
+"""
+📡 MarketDataCache & MarketDataPrefetcher - Shared yfinance Fetches and Speculative Prefetch
+--------------------------------------------------------------------------------------------
+Technical Overview:
+Data intents used to fetch from yfinance only after AgentOne had classified the turn, so for a request like
+"how has NVDA done vs AMD this year?" the model call and the price history download ran one after the other.
+
+MarketDataCache is a process-wide, thread-safe cache of the two yfinance calls the managers make:
+`Ticker.history(period)` and `Ticker.info`. Entries are keyed ('history', TICKER, period) and
+('info', TICKER). They expire after a TTL (prices move, so histories expire sooner than company info), and
+the least recently used entries are evicted beyond `max_entries`. A fetch that is already in flight is
+shared instead of repeated, so a handler that asks for data a prefetch is still downloading simply waits for
+that download. Failed fetches are not cached. Cached DataFrames and dictionaries are shared between callers
+and must be treated as read-only.
+
+MarketDataPrefetcher starts the likely fetches while classification runs. It scans the raw input with the
+fast-path router's lexicon (tickers and company names from the local equity files, plus periods) and submits
+fetches to a small background pool: histories for chart, comparison or period wording, `info` for metric or
+fundamentals wording, both when the input gives no hint. Once the turn is classified, `settle` compares the
+prefetched keys with the keys the chosen handler needs. The handler itself reads through the cache, so the
+confirmed fetches are handed over without extra plumbing. Unneeded fetches that have not started yet are
+cancelled, and the rest are kept in the cache for later turns. The outcome is recorded in PipelineMetrics:
+- `prefetch.started`: fetches submitted;
+- `prefetch.hits`: needed keys that were prefetched;
+- `prefetch.missed`: needed keys that were not prefetched;
+- `prefetch.wasted`: prefetched keys the turn did not need.
+The hit rate is hits / (hits + missed); wasted / started is the share of speculative work thrown away.
+
+In Simple Terms:
+While AgentOne is still working out what the user wants, AVA already starts downloading the stock data the
+question seems to be about. If the guess was right, the chart appears sooner; if it was wrong, the download
+is kept for a while in case it is needed later. AVA counts how often the guess pays off.
+
+Classes and Functions:
+- MarketDataCache: TTL/LRU cache of yfinance histories and info with in-flight sharing.
+- MarketDataPrefetcher: Starts speculative fetches for an input (`start`) and scores them (`settle`).
+- get_market_data_cache: Returns the process-wide MarketDataCache.
+"""
+
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from utils.instrumentation import PipelineMetrics
+from utils.tracing import annotate_span, trace_span
+
+HISTORY_TTL = 300  # seconds
+INFO_TTL = 900  # seconds
+MAX_ENTRIES = 256
+MAX_PREFETCH_TICKERS = 4
+DEFAULT_PERIOD = '1mo'
+
+# Shared by all sessions; yfinance fetches are I/O bound
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='ava-prefetch')
+
+
+class MarketDataCache:
+    def __init__(self, history_ttl=HISTORY_TTL, info_ttl=INFO_TTL, max_entries=MAX_ENTRIES):
+        self.history_ttl = history_ttl
+        self.info_ttl = info_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> {'future': Future, 'expires': monotonic time, set once the fetch has finished}
+        self._entries = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'evictions': 0}
+
+    @staticmethod
+    def history_key(ticker, period):
+        return ('history', ticker.upper(), period)
+
+    @staticmethod
+    def info_key(ticker):
+        return ('info', ticker.upper())
+
+    def history(self, ticker, period=DEFAULT_PERIOD):
+        """`yf.Ticker(ticker).history(period=period)`, cached (read-only DataFrame)."""
+        def fetch():
+            import yfinance as yf
+            return yf.Ticker(ticker).history(period=period)
+        return self._get(self.history_key(ticker, period), self.history_ttl, fetch)
+
+    def info(self, ticker):
+        """`yf.Ticker(ticker).info`, cached (read-only dictionary)."""
+        def fetch():
+            import yfinance as yf
+            return yf.Ticker(ticker).info
+        return self._get(self.info_key(ticker), self.info_ttl, fetch)
+
+    def fetch(self, key):
+        """Fetches a cache key as built by `history_key` or `info_key`."""
+        return self.history(key[1], key[2]) if key[0] == 'history' else self.info(key[1])
+
+    def _get(self, key, ttl, fetch):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['expires'] is not None and entry['expires'] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats['coalesced' if entry['expires'] is None else 'hits'] += 1
+                owner = False
+            else:
+                entry = self._entries[key] = {'future': Future(), 'expires': None}
+                self._stats['misses'] += 1
+                owner = True
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._stats['evictions'] += 1
+
+        if not owner:
+            annotate_span(market_data_cache='coalesced' if entry['expires'] is None else 'hit')
+            return entry['future'].result()
+
+        annotate_span(market_data_cache='miss')
+        try:
+            with trace_span(f"yfinance.{key[0]}", 'data', ticker=key[1]):
+                value = fetch()
+        except Exception as e:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            entry['future'].set_exception(e)
+            raise
+        with self._lock:
+            entry['expires'] = time.monotonic() + ttl
+        entry['future'].set_result(value)
+        return value
+
+    def stats(self):
+        """Returns {'entries', 'hits', 'misses', 'coalesced', 'evictions'}."""
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class MarketDataPrefetcher:
+    def __init__(self, cache=None, router=None, metrics=None, max_tickers=MAX_PREFETCH_TICKERS):
+        self.cache = cache if cache is not None else get_market_data_cache()
+        self.router = router
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+        self.max_tickers = max_tickers
+
+    def _guess_keys(self, user_input):
+        mentions = self.router.mentions(user_input)
+        tickers = mentions['tickers'][:self.max_tickers]
+        period = mentions['period'] or DEFAULT_PERIOD
+        wants_history = mentions['chart'] or not mentions['metrics']
+        wants_info = mentions['metrics'] or not mentions['chart']
+        keys = []
+        for ticker in tickers:
+            if wants_history:
+                keys.append(self.cache.history_key(ticker, period))
+            if wants_info:
+                keys.append(self.cache.info_key(ticker))
+        return keys
+
+    def _prefetch(self, key):
+        with trace_span('prefetch', 'data', key="/".join(key)):
+            return self.cache.fetch(key)
+
+    def start(self, user_input):
+        """
+        Submits the fetches the input seems to need. Returns {cache key: Future} (empty when no ticker or
+        company is mentioned), to be passed to `settle` once the turn is classified.
+        """
+        if self.router is None:
+            return {}
+        with trace_span('prefetch.start', 'data') as span:
+            keys = self._guess_keys(user_input)
+            if span is not None:
+                span.attributes['keys'] = len(keys)
+        # Each fetch runs with the caller's context, so its spans land in the current turn
+        prefetched = {key: _executor.submit(contextvars.copy_context().run, self._prefetch, key) for key in keys}
+        self.metrics.increment('prefetch.started', len(prefetched))
+        return prefetched
+
+    def settle(self, prefetched, needed_keys):
+        """
+        Scores the prefetch against the cache keys the turn's handler needs and cancels unneeded fetches that
+        have not started. Returns the number of needed keys that were prefetched.
+        """
+        needed = set(needed_keys)
+        hits = needed & set(prefetched)
+        wasted = [key for key in prefetched if key not in needed]
+        for key in wasted:
+            # Started fetches finish into the cache and may serve a later turn
+            prefetched[key].cancel()
+        self.metrics.increment('prefetch.hits', len(hits))
+        self.metrics.increment('prefetch.missed', len(needed - hits))
+        self.metrics.increment('prefetch.wasted', len(wasted))
+        annotate_span(prefetch_hits=len(hits), prefetch_missed=len(needed - hits), prefetch_wasted=len(wasted))
+        return len(hits)
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_market_data_cache():
+    """Process-wide market data cache (shared by all sessions)."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = MarketDataCache()
+        return _shared_cache
@@ -0,0 +1,240 @@
+# utils/model_benchmark.py
+
+"""
+🏎️ ModelBenchmark Class - Per-Role Latency and Validity Benchmarks for Model Auto-Selection
+-------------------------------------------------------------------------------------------
+Technical Overview:
+Which model suits an agent depends on the agent's job. AgentOne must return a parseable classification
+dictionary quickly. AgentTwo must produce a JSON risk profile. The summarizer, which shares AgentZero's model,
+must condense text. ModelBenchmark runs a fixed probe set per role through the real agents (real mandates,
+prompt assembly and output caps) against each candidate model and records per model and role:
+- p50/p95 latency of the agent call;
+- output token throughput (output tokens per second of call time);
+- validity: the share of probes whose output is usable (`parse_agent_response` yields a dictionary with a
+  known intent for AgentOne, a risk profile with the expected keys for AgentTwo, a non-empty summary shorter
+  than its input for the summarizer).
+
+Results are saved as JSON (BENCHMARK_RESULTS_PATH). The model selection's "auto" option reads them: for each
+role, `pick_model` chooses the fastest model (lowest p50, then p95) whose validity meets the threshold.
+Run the benchmark with `_helpers/model_benchmark.py`.
+
+In Simple Terms:
+This is a small driving test for each model and each job. Every model answers the same practice questions,
+and AVA notes how fast it was and whether the answers were usable. "Auto" then picks the quickest model that
+passed the test for each agent.
+
+Classes and Functions:
+- ModelBenchmark: Runs the probes for a set of models and roles.
+- save_results / load_results: Write and read the benchmark results file.
+- pick_model: The fastest valid model for a role, or None.
+"""
+
+import json
+import math
+import os
+import time
+
+from utils.response_parsing import parse_agent_response
+
+AUTO_MODEL = 'auto'
+BENCHMARK_RESULTS_PATH = 'data/model_benchmarks.json'
+MIN_VALIDITY = 0.9
+
+# Agent selected in the model selection -> benchmarked role (AgentZero's model also runs the summarizer)
+ROLE_FOR_AGENT = {
+    'agent_zero': 'agent_summarizer',
+    'agent_one': 'agent_one',
+    'agent_two': 'agent_two',
+}
+
+KNOWN_INTENTS = {'investment_advice', 'fundamentals', 'price_chart', 'compare_price_chart', 'radar_chart',
+                 'pe_div_yield_table'}
+RISK_PROFILE_KEYS = {'risk_ability', 'risk_willingness', 'time_horizon'}
+
+_RISK_CONVERSATIONS = [
+    [
+        {"role": "assistant", "content": "How long do you plan to stay invested, and how would you react to a 20% drop?"},
+        {"role": "user", "content": "I'm 32, investing for retirement in 30 years. A 20% drop wouldn't make me sell."},
+    ],
+    [
+        {"role": "assistant", "content": "What is your investment goal and time horizon?"},
+        {"role": "user", "content": "I need the money for a house deposit in 2 years and I can't afford losses."},
+    ],
+    [
+        {"role": "assistant", "content": "Do you have other income and an emergency fund?"},
+        {"role": "user", "content": "Stable salary, 6 months of savings set aside. I'm fairly cautious but "
+                                    "could accept some ups and downs over 10 years."},
+    ],
+]
+
+# Fixed probe set per role
+PROBES = {
+    'agent_one': [
+        "Show me the price chart of AAPL over 1y",
+        "Compare the prices of NVDA and AMD over 6mo",
+        "What is the PE ratio of Tesla?",
+        "Radar chart of PE and dividend yield for AAPL, MSFT and GOOGL",
+        "Show me a table of PE and dividend yield for technology stocks",
+        "Which stocks would you recommend I invest in?",
+        "I'm 45 and saving for retirement over the next 20 years.",
+        "Hi, how are you today?",
+    ],
+    'agent_two': _RISK_CONVERSATIONS,
+    'agent_summarizer': [
+        _RISK_CONVERSATIONS[0] + [
+            {"role": "assistant", "content": "Thanks. Given your long horizon, a growth-oriented allocation with "
+                                             "broad equity index funds could suit you. Would you like examples?"},
+            {"role": "user", "content": "Yes, and show me how the S&P 500 did over the last five years."},
+        ],
+        _RISK_CONVERSATIONS[1] + [
+            {"role": "assistant", "content": "With a two-year horizon and no room for losses, capital preservation "
+                                             "matters most: high-yield savings, short-term bonds or money market funds."},
+            {"role": "user", "content": "What yields do short-term treasury funds offer at the moment?"},
+        ],
+        _RISK_CONVERSATIONS[2],
+    ],
+}
+
+
+def _percentile(values, percentile):
+    """Nearest-rank percentile (0-1) of `values`."""
+    ordered = sorted(values)
+    rank = min(max(math.ceil(percentile * len(ordered)), 1), len(ordered))
+    return ordered[rank - 1]
+
+
+def _agent_one_valid(output, probe):
+    parsed = parse_agent_response(output)
+    return isinstance(parsed, dict) and bool(KNOWN_INTENTS & set(parsed))
+
+
+def _agent_two_valid(output, probe):
+    parsed = parse_agent_response(output)
+    return isinstance(parsed, dict) and RISK_PROFILE_KEYS <= set(parsed)
+
+
+def _summary_valid(output, probe):
+    from agents.agent_summarizer import AgentSummarizer
+    return bool(output and output.strip()) and len(output) < len(AgentSummarizer.format_messages(probe))
+
+
+def _roles():
+    """role -> (agent class, call(agent, probe), validity(output, probe)); imported lazily (agents load models)."""
+    from agents.agent_one import AgentOne
+    from agents.agent_two import AgentTwo
+    from agents.agent_summarizer import AgentSummarizer
+    return {
+        'agent_one': (AgentOne, lambda agent, probe: agent.evaluate_input(probe), _agent_one_valid),
+        'agent_two': (AgentTwo, lambda agent, probe: agent.generate_risk_profile(probe), _agent_two_valid),
+        'agent_summarizer': (
+            AgentSummarizer,
+            lambda agent, probe: agent.summarize_conversation(probe, num_messages=len(probe)),
+            _summary_valid
+        ),
+    }
+
+
+class ModelBenchmark:
+    def __init__(self, probes=None, repeats=1):
+        self.probes = probes if probes is not None else PROBES
+        self.repeats = repeats
+
+    def run_role(self, role, model_name, api_key=None):
+        """
+        Runs the role's probes `repeats` times against one model.
+
+        Returns:
+            dict: 'runs', 'p50_ms', 'p95_ms', 'tokens_per_s', 'validity' and 'errors' (None values when every
+                  call failed).
+        """
+        agent_class, call, is_valid = _roles()[role]
+        agent = agent_class(model_name, api_key)
+        # Every probe must reach the model
+        agent.response_cache = None
+        latencies, output_tokens, valid, errors = [], 0, 0, []
+        for _ in range(self.repeats):
+            for probe in self.probes[role]:
+                agent.last_usage = {}
+                start = time.perf_counter()
+                try:
+                    output = call(agent, probe)
+                except Exception as e:
+                    errors.append(f"{type(e).__name__}: {e}")
+                    continue
+                latencies.append(time.perf_counter() - start)
+                output_tokens += agent.last_usage.get('output') or 0
+                valid += bool(is_valid(output, probe))
+
+        runs = self.repeats * len(self.probes[role])
+        return {
+            'runs': runs,
+            'p50_ms': round(1000 * _percentile(latencies, 0.5), 1) if latencies else None,
+            'p95_ms': round(1000 * _percentile(latencies, 0.95), 1) if latencies else None,
+            'tokens_per_s': round(output_tokens / sum(latencies), 1) if latencies and sum(latencies) else None,
+            'validity': round(valid / runs, 3) if runs else 0.0,
+            'errors': errors[:5],
+        }
+
+    def run(self, models, api_key_for_model, roles=None, progress=None):
+        """
+        Benchmarks every model for every role (all roles by default).
+
+        Args:
+            models (list): Candidate model names.
+            api_key_for_model (callable): Returns the API key for a model name (or None).
+            roles (list): Roles to run (keys of PROBES).
+            progress (callable): Optional callback receiving (role, model, result) after each run.
+
+        Returns:
+            dict: {role: {model: result}} plus a 'generated_at' timestamp.
+        """
+        results = {'generated_at': time.time()}
+        for role in roles or list(self.probes):
+            results[role] = {}
+            for model_name in models:
+                result = self.run_role(role, model_name, api_key_for_model(model_name))
+                results[role][model_name] = result
+                if progress is not None:
+                    progress(role, model_name, result)
+        return results
+
+
+def save_results(results, path=BENCHMARK_RESULTS_PATH):
+    """Merges `results` into the results file (newer runs replace a model's earlier result for a role)."""
+    merged = load_results(path) or {}
+    for role, by_model in results.items():
+        if isinstance(by_model, dict):
+            merged.setdefault(role, {}).update(by_model)
+        else:
+            merged[role] = by_model
+    with open(path, 'w') as f:
+        json.dump(merged, f, indent=2)
+    return path
+
+
+def load_results(path=BENCHMARK_RESULTS_PATH):
+    """Returns the saved benchmark results, or None if the file is missing or unreadable."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def pick_model(results, role, candidates, min_validity=MIN_VALIDITY):
+    """
+    The fastest candidate (lowest p50 latency, then p95) whose validity for `role` reaches `min_validity`.
+
+    Returns:
+        tuple or None: (model name, its result) or None when no benchmarked candidate qualifies.
+    """
+    by_model = (results or {}).get(role) or {}
+    qualified = [
+        (model, result) for model, result in by_model.items()
+        if model in candidates and result.get('p50_ms') is not None and result.get('validity', 0) >= min_validity
+    ]
+    if not qualified:
+        return None
+    return min(qualified, key=lambda item: (item[1]['p50_ms'], item[1]['p95_ms']))
@@ -4,7 +4,7 @@
 📈 PriceChartManager Class - Fetching and Displaying Price Charts for Stocks
 ---------------------------------------------------------------------------
 Technical Overview:
-The PriceChartManager class retrieves historical price data for a specific stock ticker over a specified period. It uses the yfinance API to fetch the data and returns it in a format suitable for rendering as a chart in Streamlit.
+The PriceChartManager class retrieves historical price data for a specific stock ticker over a specified period. It uses the yfinance API to fetch the data and returns it in a format suitable for rendering as a chart in Streamlit. Histories are read through the process-wide MarketDataCache (see `utils.market_data`), so data prefetched while the turn was classified is reused; cached DataFrames are never modified.
 
 In Simple Terms:
 PriceChartManager is like a tool that gets the stock price history so we can show it as a chart to the user when they ask for it.
@@ -13,15 +13,23 @@ Methods:
 - get_price_data: Fetches historical price data using yfinance.
 - prepare_chart: Returns the data ready for Streamlit to render.
 """
-import yfinance as yf
 import pandas as pd
 
+from utils.market_data import get_market_data_cache
+from utils.tracing import traced
+
+# Periods accepted by yfinance's history() and used in AgentOne's price chart classifications
+KNOWN_PERIODS = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '5y', 'max']
+
 class PriceChartManager:
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else get_market_data_cache()
+
+    @traced('data')
     def get_price_data(self, ticker_symbol, period='1mo'):
         try:
-            # Fetch the historical data
-            stock = yf.Ticker(ticker_symbol)
-            historical_data = stock.history(period=period)
+            # Fetch the historical data (cached, shared: do not modify)
+            historical_data = self.cache.history(ticker_symbol, period)
 
             # Check if data exists
             if historical_data.empty:
@@ -35,6 +43,7 @@ class PriceChartManager:
         except Exception as e:
             return None, None, f"An error occurred while fetching data for {ticker_symbol}: {e}"
 
+    @traced('data')
     def get_comparative_price_data(self, ticker_symbols, period='1mo'):
         if not ticker_symbols or len(ticker_symbols) < 2:
             return None, "Please provide two or more stock tickers to compare."
@@ -43,18 +52,18 @@ class PriceChartManager:
 
         for ticker in ticker_symbols:
             try:
-                stock = yf.Ticker(ticker)
-                historical_data = stock.history(period=period)
+                historical_data = self.cache.history(ticker, period)
                 if historical_data.empty:
                     return None, f"No data found for {ticker} over the period {period}."
 
                 # Calculate relative performance
                 # Normalize the 'Close' prices to start at 100, reflecting relative performance vs. the first day.
+                # The cached history is shared, so the series is computed without adding a column to it.
                 start_price = historical_data['Close'].iloc[0]
-                historical_data['Relative_Performance'] = (historical_data['Close'] / start_price) * 100
+                relative_performance = (historical_data['Close'] / start_price) * 100
 
                 # Add this relative performance series to the combined dataframe
-                combined_data[ticker.upper()] = historical_data['Relative_Performance']
+                combined_data[ticker.upper()] = relative_performance
 
             except Exception as e:
                 return None, f"An error occurred while fetching data for {ticker}: {e}"
@@ -1,11 +1,18 @@
 # utils/radar_chart_manager.py
 
-import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
 import math
 
+from utils.market_data import get_market_data_cache
+from utils.tracing import traced
+
 class RadarChartManager:
+    def __init__(self, cache=None):
+        # yfinance info is read through the process-wide cache (and may have been prefetched)
+        self.cache = cache if cache is not None else get_market_data_cache()
+
+    @traced('data')
     def get_metric_data(self, tickers, metrics):
         """
         Retrieve multiple metrics for each ticker using yfinance.
@@ -25,8 +32,7 @@ class RadarChartManager:
             # Initialize per-ticker dict
             data[ticker.upper()] = {}
             try:
-                stock = yf.Ticker(ticker)
-                info = stock.info
+                info = self.cache.info(ticker)
 
                 for metric in metrics:
                     val = info.get(metric, None)
@@ -60,6 +66,7 @@ class RadarChartManager:
         return data, warning_message
 
 
+    @traced('render')
     def create_radar_chart(self, data, metrics, normalize=False):
         """
         Creates a radar chart from `data`, where
@@ -9,6 +9,9 @@ from Yahoo Finance via the YFinance API. The generate_research_summary method co
 data points into a detailed research summary, while the summarize_report method provides a concise 
 overview using an LLM. This setup allows the app to deliver informed, data-driven insights to users.
 
+The research summary is slow (three Yahoo Finance calls per company), so the app runs it as a background
+job (`RESEARCH_JOB`, see utils/job_queue.py) that reports its progress per company.
+
 In Simple Terms:
 The ResearchManager is like the app’s financial data researcher. It reads a list of companies, picks the 
 strongest ones, and gathers extra details from Yahoo Finance. Then it makes a summary of these details, 
@@ -16,23 +19,53 @@ so the app can give users well-researched investment advice without overwhelming
 information.
 
 Attributes:
-- None specific to this class; it relies on session state for configurations and API key.
+- output: The TurnOutput progress is rendered to (a spinner while the report is summarized).
 
 Methods:
 - generate_research_summary: Compiles a comprehensive report on selected companies, including 
-  financial metrics and company information from Yahoo Finance.
+  financial metrics and company information from Yahoo Finance. Progress is reported to an 
+  optional `progress(fraction, message)` callback.
+- run_research_job: Job function of RESEARCH_JOB.
 - summarize_report: Converts the research summary into a concise, user-friendly report using an LLM 
-  to ensure clarity and relevance in user interactions.
+  to ensure clarity and relevance in user interactions. The report text is truncated to the model's 
+  token budget (companies listed last are cut first). Identical reports are answered from the 
+  persistent response cache.
 '''
 
 import os
-import streamlit as st
 from llmware.resources import CustomTable
 from llmware.web_services import YFinance
 
+from agents.client_registry import client_registry
+from agents.providers import complete, load_prompter, provider_for_model
+from utils.response_cache import get_response_cache, response_key
+from utils.token_budget import PromptSection, TokenBudget
+from utils.tracing import annotate_span, traced
+
+# Background job kind of the research summary, and how long a finished one is reused (seconds)
+RESEARCH_JOB = 'research_summary'
+RESEARCH_MAX_AGE = 15 * 60
+
+
+def run_research_job(params, progress):
+    """Runs the research summary as a background job."""
+    return ResearchManager().generate_research_summary(params.get('local_library_path', "data"), progress=progress)
+
+
 class ResearchManager:
-    def generate_research_summary(self, local_library_path="data"):
+    def __init__(self, output=None):
+        # The summarizing spinner is rendered through the turn's output (see engine.output)
+        if output is None:
+            from engine.output import TurnOutput  # the engine package builds on this module
+            output = TurnOutput()
+        self.output = output
+
+    @traced('data')
+    def generate_research_summary(self, local_library_path="data", progress=None):
         """Processes a CSV of companies and retrieves financial data from Yahoo Finance."""
+        if progress is not None:
+            progress(0.0, "Loading companies")
+
         # Path to the CSV file
         fp = os.path.join(os.getcwd(), local_library_path)
         fn = "companies.csv"
@@ -65,8 +98,10 @@ class ResearchManager:
         research_summary = {}
 
 
-        for row in filtered_companies:
+        for index, row in enumerate(filtered_companies):
             company_name = row['name']
+            if progress is not None:
+                progress(index / len(filtered_companies), f"Fetching {company_name}")
             ticker = row['ticker']
             f_score = row.get('f_score', 'N/A')
             research_summary[company_name] = {'f_score': f_score}
@@ -100,9 +135,12 @@ class ResearchManager:
                 # ]
             })
 
+        if progress is not None:
+            progress(1.0, f"Fetched {len(filtered_companies)} companies")
         return research_summary
 
-    def summarize_report(self, research_summary, agent_zero_model, agent_zero_api_key):
+    @traced('llm')
+    def summarize_report(self, research_summary, agent_zero_model, agent_zero_api_key, metrics=None):
         # Convert research_summary to text
         report_text = ""
         for company, details in research_summary.items():
@@ -111,14 +149,49 @@ class ResearchManager:
                 report_text += f"{key}: {value}\n"
             report_text += "\n"
 
-        # Load the model for summarization
-        from llmware.prompts import Prompt
-        prompter = Prompt().load_model(agent_zero_model, api_key=agent_zero_api_key)
-
         # Summarize the report
-        with st.spinner('Summarizing the report...'):
-            summary_prompt = f"Please provide a concise summary of the following research report:\n\n{report_text}"
-            response = prompter.prompt_main(summary_prompt)
-            report_summary_text = response['llm_response']
+        with self.output.spinner('Summarizing the report...'):
+            instruction = "Please provide a concise summary of the following research report:\n\n"
+            budget = TokenBudget(agent_zero_model, 'ResearchManager', metrics=metrics)
+            sections, _ = budget.fit(instruction, [PromptSection('research_report', report_text)])
+            summary_prompt = f"{instruction}{''.join(sections)}"
+            annotate_span(payload_bytes=len(summary_prompt.encode('utf-8')))
+
+            def record_usage(usage):
+                # Like AgentBase: on the call's span (per-turn totals) and in the session's counters
+                usage = usage or {}
+                annotate_span(input_tokens=usage.get('input'), output_tokens=usage.get('output'),
+                              cached_tokens=usage.get('cached'))
+                if metrics is not None:
+                    for field in ('input', 'output', 'cached'):
+                        if usage.get(field):
+                            metrics.increment(f"llm.ResearchManager.{field}_tokens", usage[field])
+
+            def generate():
+                if provider_for_model(agent_zero_model) is not None:
+                    # Pooled keep-alive connection on the async client layer
+                    text, usage = complete(agent_zero_model, agent_zero_api_key, summary_prompt)
+                    record_usage(usage)
+                    return text.strip(), usage
+                # Reuse the already loaded model for summarization
+                prompter = client_registry.get_or_create(
+                    'prompt',
+                    agent_zero_model,
+                    agent_zero_api_key,
+                    lambda: load_prompter(agent_zero_model, agent_zero_api_key)
+                )
+                with client_registry.lock_for(prompter):
+                    response = prompter.prompt_main(summary_prompt)
+                record_usage(response.get('usage'))
+                return response['llm_response'].strip(), response.get('usage')
+
+            # The same research report is summarized on every investment advice turn
+            response_cache = get_response_cache()
+            if response_cache is None:
+                report_summary_text, _ = generate()
+            else:
+                report_summary_text = response_cache.get_or_compute(
+                    response_key(agent_zero_model, summary_prompt), agent_zero_model, generate, metrics=metrics
+                )
 
         return report_summary_text.strip()
@@ -0,0 +1,261 @@
+# utils/response_cache.py
+
+"""
+🗄️ ResponseCache Class - Persistent Exact-Match Cache of LLM Responses
+----------------------------------------------------------------------
+Technical Overview:
+Identical prompts reach the models again and again. The same research report is summarized for every
+investment advice turn, the same reports summary is requested turn after turn, and different users open
+with the same questions. ResponseCache stores model responses in SQLite (RESPONSE_CACHE_PATH), so a response
+outlives reruns, sessions and restarts. The key is a SHA-256 hash of the model, the output cap and the full
+prompt (system prefix and user part), so only an exactly identical request is answered from the cache.
+
+Entries expire after `ttl` seconds. When the stored responses exceed `max_entries` or `max_bytes`, the least
+recently used ones are evicted. Concurrent identical requests are coalesced: the first caller makes the
+provider call, and callers arriving while it is in flight wait for its result (threads block on a future,
+coroutines await it), so only one call per key is in flight. A failed call is not cached and the error
+reaches every waiting caller. Neither is a response another model answered (a hedged request won by an
+alternate model), which is handed to the waiting callers but not stored under the requested model's key.
+
+Process-wide hits, misses, coalesced requests and evictions, plus the number of entries and the bytes
+stored, are returned by `stats`; sessions also count hits and misses in their PipelineMetrics
+(`response_cache.*`). Set `AVA_RESPONSE_CACHE=off` to disable the cache. If the database cannot be opened
+the cache is disabled rather than failing the turn.
+
+In Simple Terms:
+If AVA has already asked a model exactly the same question, it reuses the answer instead of asking again,
+even after a restart. If two people ask the same thing at the same moment, only one question is sent.
+
+Classes and Functions:
+- ResponseCache: SQLite-backed response store with TTL, LRU eviction and request coalescing
+  (`get_or_compute` for threads, `aget_or_compute` for coroutines).
+- response_key: Hash identifying a request.
+- get_response_cache: Returns the process-wide ResponseCache (None when disabled or unavailable).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from utils.tracing import annotate_span
+
+RESPONSE_CACHE_PATH = 'data/llm_response_cache.sqlite'
+RESPONSE_CACHE_ENV = 'AVA_RESPONSE_CACHE'
+DEFAULT_TTL = 24 * 3600  # seconds
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def response_key(model_name, prompt, system=None, max_tokens=None, kind='complete'):
+    """Hash of everything that shapes a response: request kind, model, output cap and the full prompt."""
+    payload = json.dumps([kind, model_name, max_tokens, system or "", prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path=RESPONSE_CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'evictions': 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT, response TEXT, usage TEXT,"
+            " bytes INTEGER, created REAL, last_access REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self._db.commit()
+
+    # -------------------------------------------------------------------------
+    # Storage
+    # -------------------------------------------------------------------------
+
+    def get(self, key):
+        """Returns the stored response text for `key`, or None if missing or expired."""
+        with self._lock:
+            return self._get(key)
+
+    def _get(self, key):
+        # Called with the lock held
+        now = time.time()
+        row = self._db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] + self.ttl <= now:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+            return None
+        self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        self._db.commit()
+        return row[0]
+
+    def put(self, key, model_name, response, usage=None):
+        """
+        Stores a response, then evicts expired and least recently used entries beyond the bounds. A response
+        that another model answered (usage['model'], e.g. a hedge won by an alternate model) is not stored,
+        since the key names `model_name`.
+        """
+        answered_by = (usage or {}).get('model')
+        if answered_by is not None and answered_by != model_name:
+            return
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, usage, bytes, created, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model_name, response, json.dumps(usage or {}), size, now, now)
+            )
+            self._evict(now)
+            self._db.commit()
+
+    def _evict(self, now):
+        # Called with the lock held
+        expired = self._db.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl,)).rowcount
+        count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM responses").fetchone()
+        evicted = 0
+        if count > self.max_entries or total > self.max_bytes:
+            for key, size in self._db.execute(
+                    "SELECT key, bytes FROM responses ORDER BY last_access ASC").fetchall():
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                count, total, evicted = count - 1, total - size, evicted + 1
+        self._stats['evictions'] += expired + evicted
+
+    # -------------------------------------------------------------------------
+    # Lookups with request coalescing
+    # -------------------------------------------------------------------------
+
+    def _claim(self, key):
+        """
+        Returns ('hit', response), ('wait', future of the in-flight request) or ('owner', future to resolve).
+        The lookup and the claim happen under one lock: a request resolved in between would otherwise leave
+        the key neither stored nor in flight for this caller, and it would make a second provider call.
+        """
+        with self._lock:
+            response = self._get(key)
+            if response is not None:
+                self._stats['hits'] += 1
+                return 'hit', response
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._stats['coalesced'] += 1
+                return 'wait', future
+            self._stats['misses'] += 1
+            future = self._in_flight[key] = Future()
+            return 'owner', future
+
+    def _resolve(self, key, model_name, future, response=None, usage=None, error=None):
+        if error is None:
+            self.put(key, model_name, response, usage)
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if error is None:
+            future.set_result(response)
+        else:
+            future.set_exception(error)
+
+    @staticmethod
+    def _count(metrics, state):
+        outcome = {'hit': 'hits', 'wait': 'coalesced', 'owner': 'misses'}[state]
+        if metrics is not None:
+            metrics.increment(f"response_cache.{outcome}")
+        annotate_span(response_cache=state if state != 'owner' else 'miss')
+
+    def lookup(self, key, metrics=None):
+        """`get` with hit/miss accounting, for callers that do not coalesce (e.g. streamed responses)."""
+        response = self.get(key)
+        with self._lock:
+            self._stats['hits' if response is not None else 'misses'] += 1
+        self._count(metrics, 'hit' if response is not None else 'owner')
+        return response
+
+    def get_or_compute(self, key, model_name, compute, metrics=None):
+        """
+        Returns the cached response for `key`, or calls `compute()` (which returns (text, usage)) once for
+        all concurrent callers and caches its text.
+        """
+        state, value = self._claim(key)
+        self._count(metrics, state)
+        if state == 'hit':
+            return value
+        if state == 'wait':
+            return value.result()
+        try:
+            response, usage = compute()
+        except BaseException as e:
+            self._resolve(key, model_name, value, error=e)
+            raise
+        self._resolve(key, model_name, value, response, usage)
+        return response
+
+    async def aget_or_compute(self, key, model_name, compute, metrics=None):
+        """Coroutine version of `get_or_compute`; `compute()` returns an awaitable of (text, usage)."""
+        state, value = self._claim(key)
+        self._count(metrics, state)
+        if state == 'hit':
+            return value
+        if state == 'wait':
+            return await asyncio.wrap_future(value)
+        try:
+            response, usage = await compute()
+        except BaseException as e:
+            self._resolve(key, model_name, value, error=e)
+            raise
+        self._resolve(key, model_name, value, response, usage)
+        return response
+
+    # -------------------------------------------------------------------------
+    # Statistics
+    # -------------------------------------------------------------------------
+
+    def stats(self):
+        """Returns {'entries', 'bytes', 'hits', 'misses', 'coalesced', 'evictions', 'in_flight'}."""
+        with self._lock:
+            entries, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM responses").fetchone()
+            return dict(self._stats, entries=entries, bytes=total, in_flight=len(self._in_flight))
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+
+_shared_cache = None
+_shared_cache_failed = False
+_shared_cache_lock = threading.Lock()
+
+
+def response_cache_enabled():
+    return os.environ.get(RESPONSE_CACHE_ENV, '').strip().lower() not in ('off', '0', 'false', 'no')
+
+
+def get_response_cache():
+    """Process-wide response cache, or None when disabled (AVA_RESPONSE_CACHE=off) or unavailable."""
+    global _shared_cache, _shared_cache_failed
+    if not response_cache_enabled():
+        return None
+    with _shared_cache_lock:
+        if _shared_cache is None and not _shared_cache_failed:
+            try:
+                _shared_cache = ResponseCache()
+            except (sqlite3.Error, OSError):
+                _shared_cache_failed = True
+        return _shared_cache
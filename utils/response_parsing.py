@@ -0,0 +1,130 @@
+# utils/response_parsing.py
+
+import re
+import json
+import ast
+
+# -----------------------------------------------------------------------------
+# Incremental recognition of the first complete dictionary in a (streamed) response
+# -----------------------------------------------------------------------------
+
+def _literal_dict(candidate):
+    """Parses `candidate` as a Python literal or JSON; returns the dictionary, or None if it is not one."""
+    try:
+        value = ast.literal_eval(candidate)
+    except (SyntaxError, ValueError):
+        try:
+            value = json.loads(candidate)
+        except (json.JSONDecodeError, ValueError):
+            return None
+    return value if isinstance(value, dict) else None
+
+
+class IncrementalDictParser:
+    """
+    Finds the first complete top-level dictionary in text that arrives in chunks.
+
+    Braces are matched as the chunks come in (braces inside quoted strings are ignored), so the dictionary
+    is recognized the moment its closing brace arrives. Whatever the model writes after it is not needed,
+    and the caller can cancel the rest of the generation. A balanced candidate that does not parse is
+    skipped and the scan continues after its opening brace.
+
+    Attributes:
+        text: Everything fed so far.
+        result: The parsed dictionary, or None until one is complete.
+        end: Index in `text` just past the dictionary's closing brace.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.result = None
+        self.end = None
+        self._pos = 0
+        self._start = None
+        self._depth = 0
+        self._quote = None
+        self._escaped = False
+
+    def feed(self, chunk):
+        """Adds a chunk; returns the dictionary once the first complete one has arrived, else None."""
+        if self.result is not None:
+            return self.result
+        self.text += chunk
+        while self._pos < len(self.text):
+            char = self.text[self._pos]
+            self._pos += 1
+            if self._start is None:
+                if char == '{':
+                    self._start, self._depth = self._pos - 1, 1
+                continue
+            if self._quote is not None:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == self._quote:
+                    self._quote = None
+                continue
+            if char in ('"', "'"):
+                self._quote = char
+            elif char == '{':
+                self._depth += 1
+            elif char == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    parsed = _literal_dict(self.text[self._start:self._pos])
+                    if parsed is not None:
+                        self.result, self.end = parsed, self._pos
+                        return parsed
+                    # Not a dictionary after all: rescan from just after its opening brace
+                    self._pos, self._start = self._start + 1, None
+        return None
+
+    @property
+    def consumed_text(self):
+        """The text up to the end of the recognized dictionary (all text while none is complete)."""
+        return self.text[:self.end] if self.end is not None else self.text
+
+
+# -----------------------------------------------------------------------------
+# Utility function to robustly parse a dictionary from the agent's response
+# -----------------------------------------------------------------------------
+
+def parse_agent_response(response_text: str):
+    """
+    Attempts to extract the first dictionary-like substring from response_text
+    and parse it into a Python dictionary.
+
+    1. Looks for the first complete top-level dictionary (balanced braces, see IncrementalDictParser),
+       so text or stray braces after it cannot break parsing.
+    2. Otherwise uses regex to find a curly-braced substring (from the first '{' to the final '}')
+    3. Tries ast.literal_eval (handles Python dict syntax, single quotes).
+    4. Tries json.loads (handles JSON syntax, double quotes) if the above fails.
+    5. Returns an empty dictionary if no parse is successful.
+    """
+    parser = IncrementalDictParser()
+    if parser.feed(response_text) is not None:
+        return parser.result
+
+    # Regex to capture everything from the first '{' to the final '}'
+    match = re.search(r"(\{[\s\S]*\})", response_text)
+    if not match:
+        # No curly-braced content found
+        return {}
+
+    extracted = match.group(1).strip()
+
+    # Try ast.literal_eval
+    try:
+        return ast.literal_eval(extracted)
+    except (SyntaxError, ValueError):
+        pass
+
+    # Try JSON
+    try:
+        return json.loads(extracted)
+    except (json.JSONDecodeError, ValueError):
+        pass
+
+    # If both attempts fail, return empty
+    return {}
@@ -4,19 +4,79 @@ RiskProfileManager – Generates and parses user-specific risk profiles using Ag
 This class requests a risk profile from AgentTwo based on conversation history and 
 parses the response into a usable dictionary. This helps tailor investment advice 
 to each user's risk tolerance.
+
+Once a profile exists it is kept as structured slots (RISK_PROFILE_SLOTS) and updated 
+incrementally: AgentTwo only sees the current slots and the messages since the last 
+update, returns the fields that changed, and the delta is merged into the slots. 
+A full re-profile from the whole conversation happens only on explicit request.
+
+Parsing problems are reported as warnings through the TurnOutput passed in (`output`), so they 
+reach the Streamlit page or the API client alike.
 """
 
 import re
-import streamlit as st
 import json
 
+from utils.tracing import traced
+
+# Profile slot -> allowed values (None: free text)
+RISK_PROFILE_SLOTS = {
+    'risk_ability': ('low', 'medium', 'high'),
+    'risk_willingness': ('low', 'medium', 'high'),
+    'time_horizon': ('short', 'medium', 'long'),
+    'other_notes': None,
+}
+
 class RiskProfileManager:
+    def __init__(self, output=None):
+        # Warnings and errors are rendered through the turn's output (see engine.output)
+        if output is None:
+            from engine.output import TurnOutput  # the engine package builds on this module
+            output = TurnOutput()
+        self.output = output
+
+    @traced('agent')
     def generate_risk_profile(self, conversation_history, agent_two):
         """
         Generates a risk profile JSON string from the conversation history using AgentTwo.
         """
         return agent_two.generate_risk_profile(conversation_history)
 
+    @traced('agent')
+    def update_risk_profile(self, current_profile, new_messages, agent_two):
+        """
+        Updates a profile from the messages since its last update, using AgentTwo's delta.
+
+        Returns:
+            tuple: (raw delta from AgentTwo, merged profile dictionary)
+        """
+        raw_delta = agent_two.update_risk_profile(current_profile, new_messages)
+        delta = self.parse_risk_profile_report(raw_delta) if raw_delta.strip() not in ('', '{}') else {}
+        return raw_delta, self.merge_risk_profile(current_profile, delta)
+
+    @staticmethod
+    def merge_risk_profile(current_profile, delta):
+        """
+        Merges a delta into a copy of the profile. Enumerated slots only take their allowed values, new notes
+        are appended to the existing ones, and other fields are copied as they are.
+        """
+        merged = dict(current_profile)
+        for key, value in delta.items():
+            if value in (None, ''):
+                continue
+            allowed = RISK_PROFILE_SLOTS.get(key)
+            if allowed is not None:
+                value = str(value).strip().lower()
+                if value in allowed:
+                    merged[key] = value
+            elif key == 'other_notes':
+                notes = merged.get('other_notes') or ''
+                if str(value) not in notes:
+                    merged[key] = f"{notes} {value}".strip()
+            else:
+                merged[key] = value
+        return merged
+
     def parse_risk_profile_report(self, raw_report: str) -> dict:
         """
         Parses the raw JSON string returned by AgentTwo into a Python dictionary by:
@@ -32,7 +92,7 @@ class RiskProfileManager:
         # Extract JSON between the first '{' and the last '}'
         match = re.search(r"(\{[\s\S]*\})", cleaned)
         if not match:
-            st.warning("No JSON object found in AgentTwo's response.")
+            self.output.warning("No JSON object found in AgentTwo's response.")
             return {}
 
         json_str = match.group(1)
@@ -41,5 +101,5 @@ class RiskProfileManager:
         try:
             return json.loads(json_str)
         except json.JSONDecodeError as e:
-            st.warning(f"Failed to parse risk profile JSON: {e}")
+            self.output.warning(f"Failed to parse risk profile JSON: {e}")
             return {}
@@ -1,7 +1,40 @@
-import yfinance as yf
-import streamlit as st
+from utils.market_data import get_market_data_cache
+from utils.tracing import traced
 
 class FundamentalsManager:
+    # Map user-friendly strings to the actual yfinance info keys
+    # Customize or expand this dictionary as needed.
+    FUNDAMENTALS_MAP = {
+        "pe": "trailingPE",
+        "p/e": "trailingPE",
+        "currentprice": "currentPrice",
+        "price": "currentPrice",
+        "marketcap": "marketCap",
+        "market cap": "marketCap",
+        "ps": "priceToSalesTrailing12Months",
+        "price to sales": "priceToSalesTrailing12Months",
+        "ebitda": "ebitda",
+        "revenuegrowth": "revenueGrowth",
+        "revenue growth": "revenueGrowth",
+        "grossmargins": "grossMargins",
+        "gross margins": "grossMargins",
+        "fiftytwoweekhigh": "fiftyTwoWeekHigh",
+        "52 week high": "fiftyTwoWeekHigh",
+        "52 week low": "fiftyTwoWeekLow",
+        "fiftytwoweeklow": "fiftyTwoWeekLow",
+        "forwardpe": "forwardPE",
+        "forward pe": "forwardPE",
+        "volume": "volume"
+    }
+
+    def __init__(self, output=None):
+        # Fetch errors are rendered through the turn's output (see engine.output)
+        if output is None:
+            from engine.output import TurnOutput  # the engine package builds on this module
+            output = TurnOutput()
+        self.output = output
+
+    @traced('data')
     def generate_fundamentals_report(self, ticker_symbol, fundamentals_type=None):
         """
         Generates a fundamentals report for a single stock.
@@ -14,8 +47,8 @@ class FundamentalsManager:
         we return the full fundamentals report.
         """
         try:
-            stock = yf.Ticker(ticker_symbol)
-            info = stock.info
+            # Read through the process-wide cache (the info may have been prefetched)
+            info = get_market_data_cache().info(ticker_symbol)
 
             # If the user requested specific fundamentals, handle them:
             if fundamentals_type:
@@ -23,29 +56,7 @@ class FundamentalsManager:
                 requested_fundamentals = [f.strip().lower() for f in fundamentals_type.split(",")]
 
                 # 2) Map user-friendly strings to the actual yfinance info keys
-                #    Customize or expand this dictionary as needed.
-                fundamentals_map = {
-                    "pe": "trailingPE",
-                    "p/e": "trailingPE",
-                    "currentprice": "currentPrice",
-                    "price": "currentPrice",
-                    "marketcap": "marketCap",
-                    "market cap": "marketCap",
-                    "ps": "priceToSalesTrailing12Months",
-                    "price to sales": "priceToSalesTrailing12Months",
-                    "ebitda": "ebitda",
-                    "revenuegrowth": "revenueGrowth",
-                    "revenue growth": "revenueGrowth",
-                    "grossmargins": "grossMargins",
-                    "gross margins": "grossMargins",
-                    "fiftytwoweekhigh": "fiftyTwoWeekHigh",
-                    "52 week high": "fiftyTwoWeekHigh",
-                    "52 week low": "fiftyTwoWeekLow",
-                    "fiftytwoweeklow": "fiftyTwoWeekLow",
-                    "forwardpe": "forwardPE",
-                    "forward pe": "forwardPE",
-                    "volume": "volume"
-                }
+                fundamentals_map = self.FUNDAMENTALS_MAP
 
                 # 3) Build a list of successfully matched items and any unmatched
                 matched_fundamentals = []
@@ -75,7 +86,7 @@ class FundamentalsManager:
                 return self._generate_full_report(info, ticker_symbol)
 
         except Exception as e:
-            st.error(f"An error occurred while fetching data for {ticker_symbol}: {e}")
+            self.output.error(f"An error occurred while fetching data for {ticker_symbol}: {e}")
             return None
 
     def _build_custom_report(self, info, ticker_symbol, matched_fundamentals, unmatched_fundamentals):
@@ -0,0 +1,171 @@
+# utils/token_budget.py
+
+"""
+📐 TokenBudget Class - Prompt Size Control from Model Context Windows
+--------------------------------------------------------------------
+Technical Overview:
+Prompts used to be built with no size control. AgentZero's context sections, AgentTwo's full conversation
+transcript and the research report sent for summarization all grew with the session until requests became
+slow or were rejected. TokenBudget gives each agent an input budget derived from the selected model's context
+window, as recorded in `models_list.csv`. The budget is the agent's share of the window, minus the tokens
+reserved for the response.
+
+A prompt is described as the mandate, a list of PromptSections and a closing line. Each section has a name,
+a priority and the end to keep when it is compacted. Tokens are counted offline per section (see
+`utils.token_counter`). The mandate and the closing, which holds the user input, are never trimmed. When the
+prompt is over budget, optional sections are compacted in order of increasing priority: a section is
+truncated to what still fits, keeping its most useful end (e.g. the latest messages of a transcript), or
+dropped entirely when too little room is left for it to be useful. The per-section token breakdown of every
+prompt is recorded in PipelineMetrics (as the agent's breakdown for the turn), and trimmed tokens are counted
+under `budget.<agent>.trimmed_tokens`.
+
+Note: in `models_list.csv`, generative models have no `embedding_dims`, so their context window appears
+in that column; both columns are read.
+
+In Simple Terms:
+Every model can only read so much at once. TokenBudget measures each part of a prompt and, if the whole thing
+is too long, shortens or leaves out the least important parts first, so requests stay fast and are never
+rejected for being too long.
+
+Classes and Functions:
+- PromptSection: A named prompt section with a priority (higher is kept longer) and the end to keep.
+- context_window: Context window of a model according to models_list.csv.
+- TokenBudget.fit: Returns the section texts that fit the budget, and the token breakdown.
+"""
+
+import csv
+from collections import namedtuple
+from functools import lru_cache
+
+from utils.token_counter import count_tokens, truncate_to_tokens
+
+MODELS_LIST_PATH = 'models_list.csv'
+DEFAULT_CONTEXT_WINDOW = 4096
+# Tokens kept free for the response (agents pass the provider's max_tokens)
+DEFAULT_OUTPUT_RESERVE = 1024
+
+# Share of the context window each agent may use for its prompt (the rest is headroom)
+AGENT_BUDGET_SHARES = {
+    'AgentZero': 0.9,
+    'AgentTwo': 0.9,
+    'ResearchManager': 0.75,
+}
+DEFAULT_BUDGET_SHARE = 0.9
+
+# Sections that would end up smaller than this are dropped rather than truncated
+MIN_SECTION_TOKENS = 48
+
+
+class PromptSection(namedtuple('PromptSection', ['name', 'text', 'priority', 'keep', 'header', 'footer'])):
+    """
+    Prompt section; higher priority sections are trimmed last, `keep` is 'head' or 'tail'. The header and
+    footer frame the text and are kept as long as the section is kept at all.
+    """
+    __slots__ = ()
+
+    def __new__(cls, name, text, priority=0, keep='head', header="", footer=""):
+        return super().__new__(cls, name, text, priority, keep, header, footer)
+
+    def render(self, text=None):
+        text = self.text if text is None else text
+        return f"{self.header}{text}{self.footer}" if text else ""
+
+
+@lru_cache(maxsize=4)
+def load_context_windows(path=MODELS_LIST_PATH):
+    """Returns {model_name: context_window} for every model in models_list.csv with a usable window."""
+    windows = {}
+    try:
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                for column in ('context_window', 'embedding_dims'):
+                    value = (row.get(column) or '').strip()
+                    if value.isdigit():
+                        windows[row['model_name']] = int(value)
+                        break
+    except OSError:
+        pass
+    return windows
+
+
+def context_window(model_name, default=DEFAULT_CONTEXT_WINDOW):
+    return load_context_windows().get(model_name, default)
+
+
+class TokenBudget:
+    def __init__(self, model_name, agent_name, output_reserve=DEFAULT_OUTPUT_RESERVE, share=None, metrics=None):
+        self.model_name = model_name
+        self.agent_name = agent_name
+        self.output_reserve = output_reserve
+        self.share = share if share is not None else AGENT_BUDGET_SHARES.get(agent_name, DEFAULT_BUDGET_SHARE)
+        self.metrics = metrics
+        self.last_breakdown = {}
+
+    @property
+    def input_budget(self):
+        window = context_window(self.model_name)
+        return max(int(window * self.share) - self.output_reserve, MIN_SECTION_TOKENS)
+
+    def fit(self, mandate, sections, closing=""):
+        """
+        Fits the prompt into the input budget.
+
+        Args:
+            mandate (str): Static mandate (never trimmed).
+            sections (iterable): PromptSections or plain strings (plain strings are never trimmed); None
+                entries and empty sections are skipped.
+            closing (str): Closing line(s) with the user input (never trimmed).
+
+        Returns:
+            tuple: (list of section texts in their original order, breakdown dictionary)
+        """
+        sections = [
+            section if isinstance(section, PromptSection) else PromptSection('other', section, priority=None)
+            for section in sections if section and (not isinstance(section, PromptSection) or section.text)
+        ]
+        texts = [section.render() for section in sections]
+        tokens = [count_tokens(text, self.model_name) for text in texts]
+        fixed_tokens = count_tokens(mandate, self.model_name) + count_tokens(closing, self.model_name)
+
+        budget = self.input_budget
+        original_total = fixed_tokens + sum(tokens)
+        overflow = original_total - budget
+        trimmed = []
+
+        # Lowest priority first; among equals, the earliest section first
+        order = sorted(
+            (index for index, section in enumerate(sections) if section.priority is not None),
+            key=lambda index: (sections[index].priority, index)
+        )
+        for index in order:
+            if overflow <= 0:
+                break
+            section = sections[index]
+            frame_tokens = tokens[index] - count_tokens(section.text, self.model_name)
+            allowed = tokens[index] - overflow - frame_tokens
+            if allowed >= MIN_SECTION_TOKENS:
+                texts[index] = section.render(truncate_to_tokens(section.text, allowed, self.model_name, keep=section.keep))
+            else:
+                texts[index] = ""
+            new_tokens = count_tokens(texts[index], self.model_name)
+            overflow -= tokens[index] - new_tokens
+            trimmed.append(section.name)
+            tokens[index] = new_tokens
+
+        breakdown = {'mandate + input': fixed_tokens}
+        for section, section_tokens in zip(sections, tokens):
+            breakdown[section.name] = breakdown.get(section.name, 0) + section_tokens
+        breakdown['total'] = fixed_tokens + sum(tokens)
+        breakdown['budget'] = budget
+        self._record(breakdown, trimmed, original_total - breakdown['total'])
+
+        return [text for text in texts if text], breakdown
+
+    def _record(self, breakdown, trimmed, trimmed_tokens):
+        self.last_breakdown = breakdown
+        if self.metrics is None:
+            return
+        self.metrics.record_breakdown(f"tokens.{self.agent_name}", breakdown)
+        if trimmed:
+            self.metrics.increment(f"budget.{self.agent_name}.trimmed_sections", len(trimmed))
+            self.metrics.increment(f"budget.{self.agent_name}.trimmed_tokens", trimmed_tokens)
@@ -0,0 +1,64 @@
+# utils/token_counter.py
+
+"""
+🔢 Token Counting Helpers
+------------------------
+Offline token estimates for prompt text. When `tiktoken` is installed the model's encoding (or cl100k_base)
+is used; otherwise a character-based heuristic (~4 characters per token) is applied, which is close enough
+for thresholds and budgets.
+
+Functions:
+- count_tokens: Returns the (estimated) number of tokens in a text.
+- truncate_to_tokens: Shortens a text to a token budget, keeping its beginning or its end.
+"""
+
+from functools import lru_cache
+
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=16)
+def _get_encoding(model_name):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    try:
+        return tiktoken.encoding_for_model(model_name) if model_name else tiktoken.get_encoding("cl100k_base")
+    except (KeyError, ValueError):
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text, model_name=None):
+    """Returns the (estimated) number of tokens in `text`."""
+    if not text:
+        return 0
+
+    encoding = _get_encoding(model_name)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text, max_tokens, model_name=None, keep='head', marker="[...]"):
+    """
+    Shortens `text` to at most `max_tokens` tokens (including `marker`), keeping the beginning
+    (keep='head') or the end (keep='tail') of the text.
+    """
+    if not text or count_tokens(text, model_name) <= max_tokens:
+        return text
+
+    budget = max(max_tokens - count_tokens(marker, model_name), 0)
+    encoding = _get_encoding(model_name)
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        kept = encoding.decode(tokens[:budget] if keep == 'head' else tokens[len(tokens) - budget:])
+    else:
+        chars = budget * CHARS_PER_TOKEN
+        kept = text[:chars] if keep == 'head' else text[len(text) - chars:]
+
+    if not budget:
+        return marker
+    return f"{kept}{marker}" if keep == 'head' else f"{marker}{kept}"
@@ -0,0 +1,233 @@
+# utils/tracing.py
+
+"""
+🔍 Tracer Class - Per-Turn Nested Spans for Agent Calls, Data Fetches and Rendering
+------------------------------------------------------------------------------------
+Technical Overview:
+PipelineMetrics aggregates timings across a session, but it cannot say where one particular slow turn went:
+AgentOne, the summarizer, the yfinance loops, reading the PE table or rendering a Plotly chart. The Tracer
+records every turn as a tree of spans. A span has a name, a category ('llm', 'data', 'render', 'handler', ...),
+its start time and duration, the thread it ran on, and attributes such as token counts, cache hit/miss and
+payload size in bytes.
+
+The active tracer and the current span live in context variables, so code anywhere in the pipeline opens a
+span with `trace_span(...)` or the `@traced(...)` decorator without receiving a tracer argument. Outside a
+traced turn both are no-ops. DagExecutor copies the context into its worker threads, so spans opened
+concurrently still nest under the step that started them. `annotate_span` adds attributes to the current span
+(AgentBase uses it to attach token usage to model-call spans), and `Span.total` adds such an attribute up over
+a turn.
+
+Finished turns are kept in session-scoped storage (the most recent `max_traces`). They can be exported in the
+Chrome trace event format, which chrome://tracing and Perfetto open directly, or as plain nested JSON.
+
+In Simple Terms:
+The tracer is a stopwatch with a notebook. For every message it writes down each step AVA took, how long it
+took, how many tokens it used and whether a cache helped, so a slow answer can be pinned on the exact step.
+
+Classes and Functions:
+- Span: One step of a turn, with its attributes and nested spans (`total` sums an attribute over them).
+- Tracer: Records turns (`turn`), keeps recent traces and exports them (`to_chrome_trace`, `export`).
+- trace_span: Context manager opening a nested span under the current one.
+- traced: Decorator wrapping a function or method in a span (records the result's payload size).
+- annotate_span: Adds attributes to the current span.
+- payload_size: Best-effort size in bytes of a text, DataFrame or JSON-serialisable value.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+_current_tracer = contextvars.ContextVar('ava_tracer', default=None)
+_current_span = contextvars.ContextVar('ava_span', default=None)
+
+
+def payload_size(value):
+    """Best-effort size of `value` in bytes (None when it cannot be sized cheaply)."""
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, tuple):
+        # e.g. (data, latest_price, error) results: size of the parts that can be sized
+        sizes = [payload_size(item) for item in value]
+        return sum(size for size in sizes if size is not None)
+    memory_usage = getattr(value, 'memory_usage', None)
+    if callable(memory_usage):
+        try:
+            usage = memory_usage(deep=True)
+            return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+        except Exception:
+            return None
+    try:
+        return len(json.dumps(value, default=str).encode('utf-8'))
+    except (TypeError, ValueError):
+        return None
+
+
+class Span:
+    __slots__ = ('name', 'category', 'start', 'end', 'thread', 'attributes', 'children')
+
+    def __init__(self, name, category, start, attributes=None):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.end = None
+        self.thread = threading.current_thread().name
+        self.attributes = dict(attributes or {})
+        self.children = []
+
+    @property
+    def duration(self):
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def total(self, attribute):
+        """Sum of a numeric attribute (e.g. 'input_tokens') over this span and the spans nested in it."""
+        value = self.attributes.get(attribute)
+        own = value if isinstance(value, (int, float)) else 0
+        return own + sum(child.total(attribute) for child in self.children)
+
+    def to_dict(self, origin):
+        return {
+            'name': self.name,
+            'category': self.category,
+            'start_ms': round(1000 * (self.start - origin), 3),
+            'duration_ms': round(1000 * self.duration, 3),
+            'thread': self.thread,
+            'attributes': self.attributes,
+            'children': [child.to_dict(origin) for child in self.children],
+        }
+
+
+class Tracer:
+    def __init__(self, store=None, max_traces=20):
+        # Session-scoped list of finished traces (nested dictionaries), oldest first
+        self.store = store if store is not None else []
+        self.max_traces = max_traces
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def turn(self, name, **attributes):
+        """Records everything inside the block as one trace rooted at a 'turn' span."""
+        root = Span(name, 'turn', time.perf_counter(), attributes)
+        tracer_token = _current_tracer.set(self)
+        span_token = _current_span.set(root)
+        try:
+            yield root
+        finally:
+            root.end = time.perf_counter()
+            _current_span.reset(span_token)
+            _current_tracer.reset(tracer_token)
+            with self._lock:
+                self.store.append(root.to_dict(root.start))
+                del self.store[:-self.max_traces]
+
+    def _add_child(self, parent, span):
+        with self._lock:
+            parent.children.append(span)
+
+    @property
+    def traces(self):
+        return list(self.store)
+
+    # -------------------------------------------------------------------------
+    # Export
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def to_chrome_trace(traces):
+        """Converts traces to the Chrome trace event format (complete 'X' events, microseconds)."""
+        events, thread_ids = [], {}
+        offset_ms = 0.0
+        for trace in traces:
+            stack = [trace]
+            while stack:
+                span = stack.pop()
+                tid = thread_ids.setdefault(span['thread'], len(thread_ids) + 1)
+                events.append({
+                    'name': span['name'],
+                    'cat': span['category'],
+                    'ph': 'X',
+                    'ts': round(1000 * (offset_ms + span['start_ms']), 1),
+                    'dur': round(1000 * span['duration_ms'], 1),
+                    'pid': 1,
+                    'tid': tid,
+                    'args': span['attributes'],
+                })
+                stack.extend(span['children'])
+            # Lay consecutive turns out one after the other
+            offset_ms += trace['duration_ms'] + 1.0
+        for thread_name, tid in thread_ids.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': thread_name}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path, chrome=True):
+        """Writes all stored traces to `path` (Chrome trace format, or nested JSON with chrome=False)."""
+        traces = self.traces
+        payload = self.to_chrome_trace(traces) if chrome else traces
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(payload, f, default=str)
+        return path
+
+
+@contextmanager
+def trace_span(name, category='step', **attributes):
+    """
+    Opens a span under the current span of the active turn. Yields the Span (or None outside a traced turn);
+    use `annotate_span` or `span.attributes` to attach results.
+    """
+    tracer = _current_tracer.get()
+    parent = _current_span.get()
+    if tracer is None or parent is None:
+        yield None
+        return
+
+    span = Span(name, category, time.perf_counter(), attributes)
+    tracer._add_child(parent, span)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except Exception as e:
+        span.attributes['error'] = type(e).__name__
+        raise
+    finally:
+        span.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+def annotate_span(**attributes):
+    """Adds attributes to the current span (no-op outside a traced turn). None values are skipped."""
+    span = _current_span.get()
+    if span is not None and _current_tracer.get() is not None:
+        span.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+
+def traced(category='step', name=None):
+    """
+    Decorator wrapping a function in a span named after its qualified name (or `name`). The size of the
+    return value is recorded as `result_bytes`.
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_tracer.get() is None:
+                return func(*args, **kwargs)
+            with trace_span(span_name, category) as span:
+                result = func(*args, **kwargs)
+                if span is not None:
+                    size = payload_size(result)
+                    if size is not None:
+                        span.attributes['result_bytes'] = size
+                return result
+        return wrapper
+    return decorator
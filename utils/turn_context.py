@@ -0,0 +1,152 @@
+# utils/turn_context.py
+
+"""
+🧵 TurnContext Class - Per-Turn Memoized Summaries
+-------------------------------------------------
+Technical Overview:
+A single user turn used to ask AgentSummarizer for the same conversation and report summaries several
+times: once in main.py before classification, again after a handler added a report, and again inside
+ConversationManager. TurnContext is created once per turn and threaded through the intent handlers,
+ConversationManager and AgentZero. It memoizes summaries keyed on a hash of exactly the messages or reports
+that would be summarized, so each distinct summary costs at most one LLM call per turn. Every avoided call is
+counted in PipelineMetrics (`summarizer.saved_calls`) next to the calls that were actually made.
+Summaries may be requested from concurrent pipeline steps (see DagExecutor). Each memo key has its own lock,
+so a second request for the same summary waits for the first, while the conversation and reports summaries
+(and other agents' calls and data fetches) run in parallel.
+
+In Simple Terms:
+TurnContext is the turn's scratchpad. The first time someone asks for a summary it is written down; anyone
+asking again during the same turn gets the note instead of a new trip to the model.
+
+Attributes:
+- conversation_history: The session's conversation history (list of role/content dicts).
+- report_summaries: The session's list of report texts.
+- conversation_summary: The latest conversation summary computed this turn (or None).
+- reports_summary: The latest reports summary computed this turn (or None).
+- rolling_state: Running-summary state used in incremental mode; None selects the windowed summary.
+- market_data: Data fetched ahead of the intent handler this turn, keyed by request (see main.py).
+- precomputed: Summaries prepared in idle time before the turn (see ContextPrecomputer); a precomputed
+  conversation summary is used as is, and a precomputed reports summary seeds the memo for its report window.
+
+Methods:
+- summarize_conversation: Returns the (memoized) summary of the recent conversation window, or the
+  incrementally updated running summary when rolling_state is set.
+- summarize_reports: Returns the (memoized) summary of the recent reports, or None if there are none.
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+from utils.instrumentation import PipelineMetrics
+from utils.tracing import trace_span
+
+
+def content_hash(items):
+    """Stable hash of a list of JSON-serialisable items (messages or report strings)."""
+    payload = json.dumps(items, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TurnContext:
+    def __init__(self, agent_summarizer, conversation_history, report_summaries=None,
+                 num_messages=3, num_reports=3, metrics=None, rolling_state=None, summary_token_threshold=200,
+                 precomputed=None):
+        self.agent_summarizer = agent_summarizer
+        self.conversation_history = conversation_history
+        self.report_summaries = report_summaries if report_summaries is not None else []
+        self.num_messages = num_messages
+        self.num_reports = num_reports
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+        # Running-summary state for incremental mode (None selects the windowed summary)
+        self.rolling_state = rolling_state
+        self.summary_token_threshold = summary_token_threshold
+
+        self.conversation_summary = None
+        self.reports_summary = None
+        self.market_data = {}
+        self._memo = {}
+        # One lock per memo key: identical summaries are computed once, different ones concurrently
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+        self._precomputed_conversation = None
+        if precomputed:
+            self._precomputed_conversation = precomputed.get('conversation_summary')
+            if precomputed.get('reports_summary') is not None:
+                window = self.report_summaries[-self.num_reports:]
+                self._memo[('reports', content_hash(window))] = precomputed['reports_summary']
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _memoized(self, kind, items, compute):
+        """`compute()` returns (summary, input tokens of its model call, 0 if it made none)."""
+        key = (kind, content_hash(items))
+        with self._key_lock(key), trace_span(f"summarize.{kind}", 'summary') as span:
+            if key in self._memo:
+                self.metrics.increment('summarizer.saved_calls')
+                if span is not None:
+                    span.attributes['memo_hit'] = True
+                return self._memo[key]
+
+            start = time.perf_counter()
+            result, input_tokens = compute()
+            if input_tokens:
+                self.metrics.record_timing(f"summarizer.{kind}", time.perf_counter() - start)
+                self.metrics.increment('summarizer.calls')
+                self.metrics.increment('summarizer.input_tokens', input_tokens)
+            else:
+                # Incremental mode decided the new messages were too small to summarize
+                self.metrics.increment('summarizer.skipped')
+            self._memo[key] = result
+            return result
+
+    def summarize_conversation(self):
+        if self._precomputed_conversation is not None:
+            self.metrics.increment('summarizer.precomputed')
+            self.conversation_summary = self._precomputed_conversation
+            return self.conversation_summary
+
+        if self.rolling_state is not None:
+            return self._summarize_conversation_incrementally()
+
+        window = self.conversation_history[-self.num_messages * 2:]
+        self.conversation_summary = self._memoized(
+            'conversation',
+            window,
+            lambda: self.agent_summarizer.summarize_conversation(
+                window, num_messages=self.num_messages, with_tokens=True
+            )
+        )
+        return self.conversation_summary
+
+    def _summarize_conversation_incrementally(self):
+        high_water_mark = self.rolling_state.get('high_water_mark', 0)
+        new_messages = self.conversation_history[high_water_mark:]
+        self.conversation_summary = self._memoized(
+            'conversation',
+            [high_water_mark, self.rolling_state.get('summary'), new_messages],
+            lambda: self.agent_summarizer.update_rolling_summary(
+                self.conversation_history,
+                self.rolling_state,
+                token_threshold=self.summary_token_threshold,
+                with_tokens=True
+            )
+        )
+        return self.conversation_summary
+
+    def summarize_reports(self):
+        if not self.report_summaries:
+            self.reports_summary = None
+            return None
+
+        window = self.report_summaries[-self.num_reports:]
+        self.reports_summary = self._memoized(
+            'reports',
+            window,
+            lambda: self.agent_summarizer.summarize_reports(window, num_reports=self.num_reports, with_tokens=True)
+        )
+        return self.reports_summary